@@ -1,25 +1,53 @@
 from django.contrib import admin
-from .models import UserScore, GameSession, MultiplayerSession
+from .models import ScoreEntry, GameSession, BestScore, UserProfile, MultiplayerSession, MultiplayerPlayer, MultiplayerAnswer, ArchivedMultiplayerSession
 
-@admin.register(UserScore)
-class UserScoreAdmin(admin.ModelAdmin):
-    list_display = ['id', 'user_id', 'display_name', 'score', 'difficulty', 'created_at']
+@admin.register(ScoreEntry)
+class ScoreEntryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user_id', 'score', 'difficulty', 'total_questions', 'created_at']
     list_filter = ['difficulty', 'created_at']
-    search_fields = ['user_id', 'display_name']
+    search_fields = ['user_id']
 
 @admin.register(GameSession)
 class GameSessionAdmin(admin.ModelAdmin):
-    list_display = ['id', 'user_id', 'display_name', 'score', 'difficulty', 'total_questions', 'created_at']
-    list_filter = ['difficulty', 'created_at']
-    search_fields = ['user_id', 'display_name']
+    list_display = ['id', 'user_id', 'status', 'score', 'difficulty', 'total_questions', 'created_at']
+    list_filter = ['status', 'difficulty', 'created_at']
+    search_fields = ['user_id']
+
+@admin.register(BestScore)
+class BestScoreAdmin(admin.ModelAdmin):
+    list_display = ['user_id', 'difficulty_scope', 'timeframe', 'period_start', 'score', 'achieved_at']
+    list_filter = ['timeframe', 'difficulty_scope', 'period_start']
+    search_fields = ['user_id']
+
+@admin.register(UserProfile)
+class UserProfileAdmin(admin.ModelAdmin):
+    list_display = ['uid', 'display_name', 'source', 'fetched_at']
+    list_filter = ['source']
+    search_fields = ['uid', 'display_name']
 
 @admin.register(MultiplayerSession)
 class MultiplayerSessionAdmin(admin.ModelAdmin):
     list_display = ['join_code', 'session_id', 'status', 'difficulty', 'number_of_players', 'current_players_count', 'created_at', 'start_time']
     list_filter = ['status', 'difficulty', 'created_at']
-    search_fields = ['join_code', 'session_id', 'players']
+    search_fields = ['join_code', 'session_id', 'player_rows__user_id']
     readonly_fields = ['session_id', 'join_code', 'created_at', 'finished_at']
     
     def current_players_count(self, obj):
-        return f"{len(obj.players)}/{obj.number_of_players}"
-    current_players_count.short_description = 'Players'
\ No newline at end of file
+        return f"{obj.player_count}/{obj.number_of_players}"
+    current_players_count.short_description = 'Players'
+
+@admin.register(MultiplayerPlayer)
+class MultiplayerPlayerAdmin(admin.ModelAdmin):
+    list_display = ['user_id', 'session', 'score', 'joined_at', 'submitted_at']
+    search_fields = ['user_id', 'session__join_code']
+
+@admin.register(MultiplayerAnswer)
+class MultiplayerAnswerAdmin(admin.ModelAdmin):
+    list_display = ['user_id', 'session', 'question_index', 'correct', 'answered_at']
+    search_fields = ['user_id', 'session__join_code']
+
+@admin.register(ArchivedMultiplayerSession)
+class ArchivedMultiplayerSessionAdmin(admin.ModelAdmin):
+    list_display = ['session_id', 'status', 'difficulty', 'number_of_players', 'finished_at', 'archived_at']
+    list_filter = ['status', 'difficulty']
+    search_fields = ['session_id']
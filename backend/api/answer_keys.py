@@ -0,0 +1,84 @@
+# backend/api/answer_keys.py
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import GameSession
+
+CACHE_KEY = "game:answer-key:{session_id}"
+_MISSING = object()
+
+
+def build_answer_key(questions):
+    """
+    Compact answer key for the questions returned by StartGameView.
+
+    One entry per question index: [correct option index, incorrect option indices
+    in the order hints remove them]. Questions without shuffled answers get None.
+    """
+    key = []
+    for q in questions:
+        options = q.get("shuffled_answers")
+        if not options or q.get("correct_answer") not in options:
+            key.append(None)
+            continue
+        correct = options.index(q["correct_answer"])
+        elimination_order = [i for i in range(len(options)) if i != correct]
+        random.shuffle(elimination_order)
+        key.append([correct, elimination_order])
+    return key
+
+
+class AnswerKeyStore:
+    """
+    Server-held answer keys for single-player games.
+
+    Keys are written once with the GameSession row and kept in the Django cache for
+    the life of the game, so hints are served without a database read. The
+    GameSession.answer_key column is the fallback after eviction or on another
+    worker with a separate cache.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+
+    def _ttl(self):
+        return settings.GAME_SESSION_TOKEN_TTL_SECONDS if self.ttl is None else self.ttl
+
+    def put(self, session_id, answer_key):
+        cache.set(CACHE_KEY.format(session_id=session_id), answer_key, self._ttl())
+
+    def get(self, session_id):
+        """Return the answer key for `session_id`, or None if the session has none."""
+        cache_key = CACHE_KEY.format(session_id=session_id)
+        answer_key = cache.get(cache_key, _MISSING)
+        if answer_key is _MISSING:
+            # Fallback: Read the column and repopulate the cache
+            row = GameSession.objects.filter(id=session_id).values_list("answer_key").first()
+            if row is None:
+                return None  # unknown session: nothing to cache
+            answer_key = row[0]
+            cache.set(cache_key, answer_key, self._ttl())
+        return answer_key
+
+    def hint(self, session_id, question_index, eliminated=0):
+        """
+        Return the option index to remove for a question, or None.
+
+        `eliminated` is how many options the client already removed for this question;
+        each further hint takes the next index from the precomputed order.
+        """
+        answer_key = self.get(session_id)
+        if not answer_key or not 0 <= question_index < len(answer_key) or answer_key[question_index] is None:
+            return None
+        elimination_order = answer_key[question_index][1]
+        if not 0 <= eliminated < len(elimination_order):
+            return None
+        return elimination_order[eliminated]
+
+    def discard(self, session_id):
+        cache.delete(CACHE_KEY.format(session_id=session_id))
+
+
+answer_keys = AnswerKeyStore()
@@ -0,0 +1,315 @@
+# backend/api/answers.py
+import atexit
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .display_names import display_names
+from .multiplayer import MultiplayerError
+from .models import MultiplayerAnswer, MultiplayerPlayer, MultiplayerSession
+from .realtime import get_hub
+
+logger = logging.getLogger(__name__)
+
+START_REASONS = {"waiting": "not_started"}  # session status -> MultiplayerError reason when answering
+
+
+def with_names(data):
+    """Add display names to rendered standings (names are cached in memory; outside the buffer lock)."""
+    names = display_names.resolve_many([entry["user_id"] for entry in data["standings"]])
+    for entry in data["standings"]:
+        entry["display_name"] = names.get(entry["user_id"]) or "Player"
+    return data
+
+
+def live_channel(session_id):
+    """Hub key the live standings of a session are published under (next to its session snapshots)."""
+    return f"{session_id}:live"
+
+
+class Room:
+    """Live tallies of one session: who answered what, per player and per question."""
+
+    __slots__ = ("session_id", "status", "ends_at", "players", "answered", "tallies", "questions", "dirty")
+
+    def __init__(self, session_id, status, total_questions, players, ends_at=None):
+        self.session_id = str(session_id)
+        self.status = status
+        self.ends_at = ends_at  # answers from then on are rejected (the reaper's force-finish deadline)
+        self.players = players
+        self.answered = set()  # (user_id, question_index)
+        self.tallies = {}  # user_id -> [answered, correct, time the correct count last went up]
+        self.questions = [[0, 0] for _ in range(total_questions)]  # per question: [answered, correct]
+        self.dirty = False
+
+    def add(self, uid, question_index, correct, answered_at):
+        self.answered.add((uid, question_index))
+        tally = self.tallies.setdefault(uid, [0, 0, answered_at])
+        tally[0] += 1
+        self.questions[question_index][0] += 1
+        if correct:
+            tally[1] += 1
+            tally[2] = answered_at
+            self.questions[question_index][1] += 1
+        self.dirty = True
+
+    def render(self, limit):
+        """Live standings: the `limit` players with most correct answers (earliest first on ties)."""
+        # Optimization: A bounded heap instead of sorting the whole room on every broadcast
+        top = heapq.nsmallest(limit, self.tallies.items(), key=lambda item: (-item[1][1], item[1][2], item[0]))
+        return {
+            "session_id": self.session_id,
+            "status": self.status,
+            "standings": [
+                {"user_id": uid, "position": position, "correct": tally[1], "answered": tally[0]}
+                for position, (uid, tally) in enumerate(top, start=1)
+            ],
+            "standings_truncated": len(self.tallies) > limit,
+            "players_answering": len(self.tallies),
+            "questions": [{"answered": answered, "correct": correct} for answered, correct in self.questions],
+        }
+
+
+class AnswerBuffer:
+    """
+    Per-question multiplayer answers, buffered in memory and written in batches.
+
+    Each session's roster and tallies are loaded once per process (three queries)
+    and kept here, so recording an answer checks the player, drops repeats and
+    updates the live standings without touching the database. Answers collect in
+    one pending list that is written with a single bulk INSERT when it reaches
+    `batch_size`, or every `flush_interval` seconds by a daemon thread, which also
+    publishes the standings of every room that changed since the last flush. A
+    burst of a whole room answering the same question therefore costs one write
+    and one broadcast, not one of each per answer.
+
+    Like InProcessHub, the tallies are per process: with several workers, route a
+    session's answers and live streams to one of them. Each flush re-reads the
+    status of the rooms held here and closes those finished elsewhere (another
+    worker or the reaper); answers after a game's deadline are rejected even before
+    that. Answers still pending when a worker dies are lost; the final score always
+    comes from the submit endpoint.
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None, max_rooms=10000, background=True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_rooms = max_rooms
+        self.background = background
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one writer at a time keeps batches in order
+        self._rooms = OrderedDict()  # session_id -> Room (active sessions, least recently used first)
+        self._pending = []
+        self._stats = {"accepted": 0, "duplicates": 0, "written": 0, "batches": 0, "write_failures": 0, "dropped": 0}
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _batch_size(self):
+        return self.batch_size or settings.MULTIPLAYER_ANSWER_BATCH_SIZE
+
+    def _flush_interval(self):
+        return self.flush_interval or settings.MULTIPLAYER_ANSWER_FLUSH_SECONDS
+
+    def start(self):
+        """Start the background flush thread (idempotent; skipped when background=False)."""
+        if not self.background or self._thread is not None:
+            return
+        with self._flush_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="multiplayer-answer-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.wait(self._flush_interval()):
+            try:
+                self.flush()
+            except Exception:
+                logger.error("Multiplayer answer flush failed", exc_info=True)
+            finally:
+                close_old_connections()
+
+    def _load_room(self, session_id):
+        session = (
+            MultiplayerSession.objects.filter(session_id=session_id)
+            .values("status", "total_questions", "start_time", "created_at")
+            .first()
+        )
+        if session is None:
+            raise MultiplayerError("not_found")
+        players = set(MultiplayerPlayer.objects.filter(session_id=session_id).values_list("user_id", flat=True))
+        # Same deadline the reaper force-finishes active games at (api/reaper.py)
+        ends_at = (session["start_time"] or session["created_at"]) + timedelta(seconds=settings.MULTIPLAYER_GAME_TTL_SECONDS)
+        room = Room(session_id, session["status"], session["total_questions"], players, ends_at)
+        answers = MultiplayerAnswer.objects.filter(session_id=session_id).order_by("answered_at")
+        for uid, question_index, correct, answered_at in answers.values_list(
+            "user_id", "question_index", "correct", "answered_at"
+        ):
+            if question_index < len(room.questions):
+                room.add(uid, question_index, correct, answered_at)
+        return room
+
+    def _room(self, session_id):
+        session_id = str(session_id)
+        with self._lock:
+            room = self._rooms.get(session_id)
+            if room is not None:
+                self._rooms.move_to_end(session_id)
+                return room
+        # Fallback: First answer for this session in this process - read it once, outside the lock
+        room = self._load_room(session_id)
+        if room.status != "active":
+            return room  # nothing will be recorded, so nothing to keep
+        with self._lock:
+            room = self._rooms.setdefault(session_id, room)
+            while len(self._rooms) > self.max_rooms:
+                self._rooms.popitem(last=False)
+        return room
+
+    def record(self, session_id, uid, question_index, correct, answered_at=None):
+        """
+        Record `uid`'s answer to `question_index`. Returns (accepted, (answered, correct) so far).
+
+        A repeated answer is not accepted and changes nothing. Raises MultiplayerError
+        (not_found, not_player, not_started, finished, expired, invalid_question).
+        """
+        self.start()
+        room = self._room(session_id)
+        answered_at = answered_at or timezone.now()
+        with self._lock:
+            if room.status != "active":
+                raise MultiplayerError(START_REASONS.get(room.status, room.status))
+            if room.ends_at is not None and answered_at >= room.ends_at:
+                raise MultiplayerError("finished")
+            if uid not in room.players:
+                raise MultiplayerError("not_player")
+            if not 0 <= question_index < len(room.questions):
+                raise MultiplayerError("invalid_question")
+            if (uid, question_index) in room.answered:
+                self._stats["duplicates"] += 1
+                tally = room.tallies[uid]
+                return False, (tally[0], tally[1])
+            room.add(uid, question_index, correct, answered_at)
+            self._pending.append(
+                MultiplayerAnswer(
+                    session_id=room.session_id,
+                    user_id=uid,
+                    question_index=question_index,
+                    correct=correct,
+                    answered_at=answered_at,
+                )
+            )
+            self._stats["accepted"] += 1
+            tally = room.tallies[uid]
+            full = len(self._pending) >= self._batch_size()
+        if full:
+            self.write()
+        return True, (tally[0], tally[1])
+
+    def write(self):
+        """Write every pending answer in one bulk INSERT. Returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                # ignore_conflicts: an answer another worker already stored is simply skipped
+                MultiplayerAnswer.objects.bulk_create(batch, batch_size=self._batch_size(), ignore_conflicts=True)
+            except Exception:
+                logger.error(f"Could not write {len(batch)} multiplayer answers", exc_info=True)
+                with self._lock:
+                    # Fallback: Keep them for the next flush, up to a bound so a dead database cannot exhaust memory
+                    self._pending[:0] = batch
+                    overflow = len(self._pending) - 10 * self._batch_size()
+                    if overflow > 0:
+                        del self._pending[:overflow]
+                        self._stats["dropped"] += overflow
+                    self._stats["write_failures"] += 1
+                return 0
+            with self._lock:
+                self._stats["written"] += len(batch)
+                self._stats["batches"] += 1
+            return len(batch)
+
+    def broadcast(self):
+        """Publish the live standings of every room that changed since the last broadcast."""
+        limit = settings.MULTIPLAYER_SNAPSHOT_PLAYERS
+        with self._lock:
+            changed = [room for room in self._rooms.values() if room.dirty]
+            snapshots = []
+            for room in changed:
+                room.dirty = False
+                snapshots.append((room.session_id, room.render(limit)))
+        hub = get_hub()
+        for session_id, data in snapshots:
+            hub.publish(live_channel(session_id), with_names(data))
+        return len(snapshots)
+
+    def refresh(self):
+        """
+        Close the rooms whose session is no longer active in the database (finished on
+        another worker, or by the reaper, or archived). Returns how many were closed.
+        """
+        with self._lock:
+            ids = list(self._rooms)
+        statuses = {}
+        for start in range(0, len(ids), 500):
+            chunk = MultiplayerSession.objects.filter(pk__in=ids[start:start + 500]).values_list("session_id", "status")
+            statuses.update((str(session_id), session_status) for session_id, session_status in chunk)
+        closed = 0
+        for session_id in ids:
+            session_status = statuses.get(session_id, "finished")
+            if session_status != "active":
+                self.close(session_id, session_status)
+                closed += 1
+        return closed
+
+    def flush(self):
+        """Write pending answers, close finished rooms, then broadcast changed standings (what the daemon thread runs)."""
+        written = self.write()
+        self.refresh()
+        self.broadcast()
+        return written
+
+    def live(self, session_id):
+        """Current live standings of a session (for a stream opened before any broadcast), or None."""
+        try:
+            room = self._room(session_id)
+        except MultiplayerError:
+            return None
+        with self._lock:
+            data = room.render(settings.MULTIPLAYER_SNAPSHOT_PLAYERS)
+        return with_names(data)
+
+    def close(self, session_id, status):
+        """
+        The session finished or expired: store its pending answers, publish its final
+        standings (ending live streams) and forget it. Later answers are rejected.
+        """
+        session_id = str(session_id)
+        self.write()
+        with self._lock:
+            room = self._rooms.pop(session_id, None)
+            if room is None:
+                return
+            room.status = status
+            data = room.render(settings.MULTIPLAYER_SNAPSHOT_PLAYERS)
+        get_hub().publish(live_channel(session_id), with_names(data))
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, "pending": len(self._pending), "rooms": len(self._rooms)}
+
+
+answer_buffer = AnswerBuffer()
@@ -0,0 +1,106 @@
+# backend/api/auth_backends.py
+import logging
+import threading
+from functools import partial
+
+from django.conf import settings
+
+from .firebase import get_auth, initialize_firebase
+from .signing_keys import SigningKeyManager, fetch_certificates
+
+logger = logging.getLogger(__name__)
+
+
+class FirebaseAuthBackend:
+    """
+    Production backend: Firebase ID tokens and user records.
+
+    Signatures are checked against Google's signing keys held in memory (see
+    SigningKeyManager); revocation checks and user lookups use the Admin SDK,
+    which is imported and initialized on first use (see api.firebase).
+    """
+
+    def __init__(self):
+        self.signing_keys = SigningKeyManager(
+            partial(fetch_certificates, settings.FIREBASE_CERTS_URL),
+            refresh_margin=settings.FIREBASE_KEY_REFRESH_MARGIN_SECONDS,
+        )
+
+    def is_ready(self):
+        return initialize_firebase() is not None
+
+    def verify_id_token(self, id_token, check_revoked=False):
+        if check_revoked:
+            # Revocation checks need the Admin SDK's user lookup
+            return get_auth().verify_id_token(id_token, check_revoked=True)
+        project_id = settings.FIREBASE_PROJECT_ID or initialize_firebase().project_id
+        return self.signing_keys.verify(id_token, project_id)
+
+    def get_display_names(self, uids):
+        """Return {uid: display_name} for the users that exist, in one get_users call (max 100 uids)."""
+        firebase_auth = get_auth()
+        result = firebase_auth.get_users([firebase_auth.UidIdentifier(uid) for uid in uids])
+        return {user.uid: getattr(user, "display_name", None) for user in result.users}
+
+
+class LocalAuthBackend:
+    """
+    Offline backend for tests and load generation: locally signed tokens, in-memory users.
+
+    Tokens have Firebase's claim shape and go through the same SigningKeyManager
+    verification as production. Set FIREBASE_LOCAL_KEY_PATH so that the
+    mint_local_tokens command and the server share a signing key.
+    """
+
+    def __init__(self):
+        from .local_firebase import LOCAL_PROJECT_ID, LocalFirebase, LocalUserStore
+
+        project_id = settings.FIREBASE_PROJECT_ID or LOCAL_PROJECT_ID
+        if settings.FIREBASE_LOCAL_KEY_PATH:
+            self.firebase = LocalFirebase.from_key_file(settings.FIREBASE_LOCAL_KEY_PATH, project_id=project_id)
+        else:
+            self.firebase = LocalFirebase(project_id=project_id)
+        self.users = LocalUserStore()
+        self.signing_keys = SigningKeyManager(
+            self.firebase.certificates,
+            refresh_margin=settings.FIREBASE_KEY_REFRESH_MARGIN_SECONDS,
+        )
+        logger.warning("Using the local Firebase auth backend - tokens are signed by this server, not Google")
+
+    def is_ready(self):
+        return True
+
+    def verify_id_token(self, id_token, check_revoked=False):
+        claims = self.signing_keys.verify(id_token, self.firebase.project_id)
+        self.users.remember(claims["uid"], display_name=claims.get("name"), email=claims.get("email"))
+        return claims
+
+    def mint_token(self, uid, name=None, **kwargs):
+        """Create (or update) a user and return an ID token for it."""
+        self.users.remember(uid, display_name=name, email=kwargs.get("email"))
+        return self.firebase.mint_token(uid, name=name, **kwargs)
+
+    def get_display_names(self, uids):
+        found, _ = self.users.get_users(uids)
+        return {user.uid: user.display_name for user in found}
+
+
+AUTH_BACKENDS = {
+    "firebase": FirebaseAuthBackend,
+    "local": LocalAuthBackend,
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_auth_backend():
+    """Return the backend named by FIREBASE_AUTH_BACKEND (one shared instance per name)."""
+    name = settings.FIREBASE_AUTH_BACKEND
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                backend = _backends[name] = AUTH_BACKENDS[name]()
+    return backend
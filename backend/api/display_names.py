@@ -0,0 +1,199 @@
+# backend/api/display_names.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from .auth_backends import get_auth_backend
+from .models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+GET_USERS_BATCH_SIZE = 100  # Firebase get_users limit
+
+
+class DisplayNameDirectory:
+    """Resolves Firebase uids to display names for leaderboards and multiplayer views.
+
+    Lookups go through an in-process LRU, then the UserProfile table (the single
+    source of display names), and only then Firebase, using the get_users batch
+    API (up to 100 uids per call). Unknown users and users without a display name
+    are cached as None (negative caching) so they are not fetched again on every
+    request.
+
+    Authentication hands over the `name` claim of each verified token (`learn`),
+    which is memory only: the claim is kept in-process and used in place of a
+    Firebase call when a view resolves that user, which also persists it (source
+    "token") in the same batched write. Names chosen by the user
+    never expire from the table and are never overwritten by a token or Firebase
+    name. The LRU holds entries for `local_ttl` seconds, which bounds how long
+    other processes show an old name after a rename.
+    """
+
+    def __init__(self, ttl=3600, negative_ttl=600, local_ttl=60, max_entries=10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.local_ttl = local_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # uid -> (display_name, expires_at)
+        self._claims = OrderedDict()  # uid -> token `name` claim, not yet persisted
+
+    def resolve(self, uid):
+        """Return the display name for one uid, or None if unknown."""
+        return self.resolve_many([uid]).get(uid)
+
+    def resolve_many(self, uids):
+        """Return {uid: display_name or None} for every uid, with at most one query and one Firebase call per 100 misses."""
+        result = {}
+        missing = []
+        for uid in dict.fromkeys(uids):
+            hit, name = self._lookup(uid)
+            if hit:
+                result[uid] = name
+            else:
+                missing.append(uid)
+        if not missing:
+            return result
+
+        # Persistent table: one query for every uid the LRU did not have
+        now = timezone.now()
+        stored = UserProfile.objects.filter(uid__in=missing).values_list("uid", "display_name", "source", "fetched_at")
+        for uid, name, source, fetched_at in stored:
+            window = self.ttl if name else self.negative_ttl
+            if source == "user" or fetched_at >= now - timedelta(seconds=window):
+                result[uid] = name
+                self.remember(uid, name)
+        missing = [uid for uid in missing if uid not in result]
+
+        # Names from the users' own tokens: no Firebase call, persisted with this request's write
+        with self._lock:
+            claimed = {uid: self._claims.pop(uid) for uid in missing if uid in self._claims}
+        if claimed:
+            self._store(claimed, source="token")
+            result.update(claimed)
+            missing = [uid for uid in missing if uid not in result]
+
+        if missing:
+            fetched = self._fetch_from_firebase(missing)
+            if fetched:
+                self._store(fetched)
+            result.update(fetched)
+        for uid in missing:
+            result.setdefault(uid, None)
+        return result
+
+    def rename(self, uid, display_name):
+        """Store a user-chosen display name. One row is written however many scores the user has."""
+        # Single INSERT ... ON CONFLICT DO UPDATE statement
+        UserProfile.objects.bulk_create(
+            [UserProfile(uid=uid, display_name=display_name, source="user", fetched_at=timezone.now())],
+            update_conflicts=True,
+            unique_fields=["uid"],
+            update_fields=["display_name", "source", "fetched_at"],
+        )
+        self.remember(uid, display_name)
+
+    def learn(self, uid, display_name):
+        """
+        Take note of the `name` claim of a verified token and return the name to show for `uid`.
+
+        Memory only (it runs on every authenticated request): a name already in the
+        LRU, which may be one the user chose, wins. Otherwise the claim is kept for
+        the next resolve_many, which checks the table for a user-chosen name first.
+        """
+        hit, name = self._lookup(uid)
+        if hit and name is not None:
+            return name
+        with self._lock:
+            self._claims[uid] = display_name
+            self._claims.move_to_end(uid)
+            while len(self._claims) > self.max_entries:
+                self._claims.popitem(last=False)
+        return display_name
+
+    def remember(self, uid, display_name):
+        """Cache a resolved display name in the LRU."""
+        ttl = min(self.local_ttl, self.ttl if display_name else self.negative_ttl)
+        with self._lock:
+            self._entries[uid] = (display_name, self._clock() + ttl)
+            self._entries.move_to_end(uid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._claims.clear()
+
+    def _lookup(self, uid):
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is None:
+                return False, None
+            if self._clock() >= entry[1]:
+                del self._entries[uid]
+                return False, None
+            self._entries.move_to_end(uid)
+            return True, entry[0]
+
+    def _fetch_from_firebase(self, uids):
+        """Fetch names in batches of 100 via the auth backend's get_users. Failed batches are not cached."""
+        backend = get_auth_backend()
+        if not backend.is_ready():
+            return {}
+        names = {}
+        for i in range(0, len(uids), GET_USERS_BATCH_SIZE):
+            batch = uids[i:i + GET_USERS_BATCH_SIZE]
+            try:
+                names.update(backend.get_display_names(batch))
+            except Exception as e:
+                # Fallback: Leave these uids unresolved (None) without caching the failure
+                logger.debug(f"Could not fetch display names for {len(batch)} users: {str(e)}")
+                continue
+            for uid in batch:
+                names.setdefault(uid, None)  # not_found -> negative cache
+        return names
+
+    def _upsert(self, names, source="firebase"):
+        """Insert missing rows and update the stored ones, except names the user chose (source "user")."""
+        now = timezone.now()
+        UserProfile.objects.bulk_create(
+            [UserProfile(uid=uid, display_name=name, source=source, fetched_at=now) for uid, name in names.items()],
+            ignore_conflicts=True,
+        )
+        # Conditional on the source in the statement itself, so a rename landing
+        # meanwhile (e.g. while Firebase was being called) is never overwritten
+        UserProfile.objects.filter(uid__in=list(names)).exclude(source="user").update(
+            display_name=models.Case(
+                *[models.When(uid=uid, then=models.Value(name)) for uid, name in names.items()],
+                output_field=models.CharField(),
+            ),
+            source=source,
+            fetched_at=now,
+        )
+
+    def _store(self, names, source="firebase"):
+        try:
+            self._upsert(names, source=source)
+            # A user-chosen name wins over the one just fetched
+            names.update(
+                UserProfile.objects.filter(uid__in=list(names), source="user").values_list("uid", "display_name")
+            )
+        except Exception as e:
+            # Non-fatal - the LRU still has the names
+            logger.warning(f"Could not persist display names: {str(e)}")
+        for uid, name in names.items():
+            self.remember(uid, name)
+
+display_names = DisplayNameDirectory(
+    ttl=settings.DISPLAY_NAME_TTL_SECONDS,
+    negative_ttl=settings.DISPLAY_NAME_NEGATIVE_TTL_SECONDS,
+    local_ttl=settings.DISPLAY_NAME_LOCAL_TTL_SECONDS,
+)
@@ -1,22 +1,54 @@
 # backend/api/firebase.py
-import os
+"""The one place Firebase Admin is imported and initialized.
+
+Nothing here runs at import time: `firebase_admin` (and its google-cloud
+dependencies) is imported and the app initialized on the first call to
+`initialize_firebase()` or `get_auth()`, i.e. on the first request that needs
+Firebase. Workers that never handle such a request never pay for it.
+"""
 import json
+import logging
+import os
+import threading
 from pathlib import Path
 
-try:
-    import firebase_admin
-    from firebase_admin import credentials
-except ImportError:
-    firebase_admin = None
-    credentials = None
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_initialized = False
+_app = None
+
 
 def initialize_firebase():
-    """Initialize Firebase Admin for Django backend (safe to call multiple times).
-    
+    """Initialize Firebase Admin on first use (thread-safe, safe to call multiple times).
+
     Returns the Firebase app if successful, None if Firebase is not available or
     credentials are not found. This allows the app to start even without Firebase.
+    The outcome is remembered, so a missing configuration costs one attempt per process.
     """
-    if firebase_admin is None or credentials is None:
+    global _initialized, _app
+    if _initialized:
+        return _app
+    with _lock:
+        if not _initialized:
+            _app = _initialize()
+            _initialized = True
+    return _app
+
+
+def get_auth():
+    """Return the `firebase_admin.auth` module once the app is initialized, else None."""
+    if initialize_firebase() is None:
+        return None
+    from firebase_admin import auth
+    return auth
+
+
+def _initialize():
+    try:
+        import firebase_admin
+        from firebase_admin import credentials
+    except ImportError:
         return None
 
     if firebase_admin._apps:
@@ -31,7 +63,7 @@ def initialize_firebase():
             return firebase_admin.initialize_app(cred)
         except Exception as e:
             # Log error but don't crash - allow app to start without Firebase
-            print(f"Warning: Failed to initialize Firebase from FIREBASE_SERVICE_ACCOUNT_JSON: {e}")
+            logger.warning(f"Failed to initialize Firebase from FIREBASE_SERVICE_ACCOUNT_JSON: {e}")
             return None
 
     # Option B: Path to key file (check multiple locations)
@@ -47,19 +79,16 @@ def initialize_firebase():
             if path.exists():
                 key_path = str(path)
                 break
-    
+
     if key_path and os.path.exists(key_path):
         try:
             cred = credentials.Certificate(key_path)
             return firebase_admin.initialize_app(cred)
         except Exception as e:
-            print(f"Warning: Failed to initialize Firebase from {key_path}: {e}")
+            logger.warning(f"Failed to initialize Firebase from {key_path}: {e}")
             return None
 
     # Don't raise error - just return None to allow app to start
-    print("Warning: Firebase Admin could NOT initialize. "
-          "Set FIREBASE_SERVICE_ACCOUNT_JSON or SERVICE_ACCOUNT_KEY_PATH.")
+    logger.warning("Firebase Admin could NOT initialize. "
+                   "Set FIREBASE_SERVICE_ACCOUNT_JSON or SERVICE_ACCOUNT_KEY_PATH.")
     return None
-
-# Initialize immediately (but gracefully handle failures)
-initialize_firebase()
@@ -1,36 +1,39 @@
 from types import SimpleNamespace
+from django.conf import settings
 from rest_framework import authentication, exceptions
 
-try:
-    import firebase_admin
-    from firebase_admin import auth as firebase_auth
-except Exception:  # firebase_admin may not be installed/configured in local dev
-    firebase_admin = None
-    firebase_auth = None
+from .auth_backends import get_auth_backend
+from .display_names import display_names
+from .token_cache import VerifiedTokenCache
 
-# Initialize Firebase (gracefully handles missing credentials)
-from .firebase import initialize_firebase
-initialize_firebase()
+# Decoded claims of recently verified tokens, so repeat requests (e.g. multiplayer
+# polling) skip the signature check until the token expires
+token_cache = VerifiedTokenCache(
+    max_entries=settings.FIREBASE_TOKEN_CACHE_SIZE,
+    revocation_check_interval=settings.FIREBASE_TOKEN_REVOCATION_CHECK_SECONDS,
+)
 
 
 class FirebaseAuthentication(authentication.BaseAuthentication):
     """DRF authentication class that verifies Firebase ID tokens.
 
     Notes:
-    - Requires `firebase-admin` to be installed and initialized in the running
-      environment. Initialization can be done in your project startup with
-      `firebase_admin.initialize_app(...)` using credentials.
+    - Requires `firebase-admin` to be installed; the app is initialized lazily
+      on the first authenticated request (see `api.firebase`).
     - On successful verification returns a lightweight `user` object with
       attributes: `is_authenticated`, `uid`, and `display_name`.
+    - Verified claims are cached per token (see `token_cache`); set
+      FIREBASE_TOKEN_REVOCATION_CHECK_SECONDS to re-check revocation periodically.
+    - Tokens are verified by the backend named in FIREBASE_AUTH_BACKEND (see
+      `auth_backends`): "firebase" checks signatures against Google's keys held
+      in memory; "local" accepts tokens signed by the offline stand-in.
     """
 
     def authenticate(self, request):
-        # If Firebase Admin SDK is not available, return None (can't authenticate)
-        if firebase_admin is None or firebase_auth is None:
-            return None
-
-        # Check if Firebase is initialized
-        if not firebase_admin._apps:
+        # If the auth backend is not available (e.g. Firebase Admin SDK not installed
+        # or initialized), return None (can't authenticate)
+        backend = get_auth_backend()
+        if not backend.is_ready():
             return None
 
         auth_header = request.META.get("HTTP_AUTHORIZATION", "")
@@ -43,17 +46,21 @@ class FirebaseAuthentication(authentication.BaseAuthentication):
 
         id_token = parts[1]
         try:
-            # verify_id_token throws on failure
-            decoded = firebase_auth.verify_id_token(id_token)
+            # Cached claims are reused until the token's exp; verification throws on failure
+            decoded = token_cache.get(id_token)
+            if decoded is None:
+                decoded = backend.verify_id_token(
+                    id_token, check_revoked=bool(token_cache.revocation_check_interval)
+                )
+                token_cache.put(id_token, decoded)
             uid = decoded.get("uid")
 
-            display_name = None
-            try:
-                user_record = firebase_auth.get_user(uid)
-                display_name = getattr(user_record, "display_name", None)
-            except Exception:
-                # Non-fatal — display name is optional
-                display_name = None
+            # Display name is optional: the token's `name` claim is handed to the display-name
+            # directory in memory (no query here; a view resolving this user persists it and
+            # never calls Firebase). Without a claim, views resolve the name when they need it
+            display_name = decoded.get("name")
+            if display_name:
+                display_name = display_names.learn(uid, display_name)
 
             user = SimpleNamespace()
             user.is_authenticated = True
@@ -76,3 +83,18 @@ class FirebaseAuthentication(authentication.BaseAuthentication):
             elif "invalid" in error_msg.lower():
                 error_msg = "Invalid Firebase token."
             raise exceptions.AuthenticationFailed(f"Invalid Firebase token: {error_msg}") from exc
+
+
+class LazyAuthenticationMixin:
+    """APIView mixin that defers authentication until the view reads `request.user` or `request.auth`.
+
+    DRF authenticates every request up front in `APIView.initial()`, so public
+    views paid for token verification whenever the frontend sent its
+    Authorization header. With this mixin a view that never looks at the caller
+    does no token work at all, and an invalid token no longer fails a request
+    that does not need one. Views that need no identity whatsoever can opt out
+    explicitly with `authentication_classes = []`.
+    """
+
+    def perform_authentication(self, request):
+        pass
@@ -0,0 +1,120 @@
+# backend/api/join_codes.py
+import hashlib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import JoinCodeCounter, MultiplayerSession
+from .snapshots import snapshots
+
+# 32 symbols: A-Z and 2-9 without the easily confused 0, O, I and 1
+ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+CODE_LENGTH = 6
+SPACE = len(ALPHABET) ** CODE_LENGTH  # 2**30 codes
+_MASK = SPACE - 1
+COUNTER_NAME = "join_code"
+MAX_ATTEMPTS = 20  # codes tried before giving up (each miss means a code still in use)
+
+
+class CodePermutation:
+    """
+    Keyed bijection on [0, 32**6), so consecutive counter values give unrelated codes.
+
+    Odd multiplications modulo 2**30 and right xorshifts are each invertible,
+    so no two counter values share a code until the counter wraps around.
+    """
+
+    def __init__(self, secret):
+        digest = hashlib.sha256(f"join-codes:{secret}".encode()).digest()
+        words = [int.from_bytes(digest[i:i + 4], "big") & _MASK for i in range(0, 20, 4)]
+        self.multipliers = [word | 1 for word in words[:3]]
+        self.offsets = words[3:]
+
+    def __call__(self, value):
+        x = value & _MASK
+        x = (x * self.multipliers[0] + self.offsets[0]) & _MASK
+        x ^= x >> 15
+        x = (x * self.multipliers[1] + self.offsets[1]) & _MASK
+        x ^= x >> 13
+        x = (x * self.multipliers[2]) & _MASK
+        x ^= x >> 16
+        return x
+
+
+def encode(value):
+    """The 6-character code for a value in [0, 32**6)."""
+    chars = []
+    for _ in range(CODE_LENGTH):
+        value, digit = divmod(value, len(ALPHABET))
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+class JoinCodeAllocator:
+    """
+    Hands out join codes from a permuted counter over the whole 32**6 code space.
+
+    Each worker reserves a block of counter values with one UPDATE on
+    JoinCodeCounter and allocates from memory after that, so allocating a code
+    normally costs no query at all. Uniqueness is left to the join_code unique
+    constraint: a code that is still taken (after the counter wraps, or when
+    a rolled-back reservation is handed out again) fails the INSERT, is
+    reclaimed if its session is finished or an expired lobby, and otherwise
+    skipped.
+    """
+
+    def __init__(self, block_size=None, secret=None):
+        self.block_size = block_size
+        self.secret = secret
+        self._lock = threading.Lock()
+        self._permutation = None
+        self._next = self._end = 0
+
+    def allocate(self):
+        """Return the next join code (one counter UPDATE per block, no reads)."""
+        with self._lock:
+            if self._permutation is None:
+                self._permutation = CodePermutation(self.secret or settings.SECRET_KEY)
+            if self._next >= self._end:
+                block_size = self.block_size or settings.JOIN_CODE_BLOCK_SIZE
+                self._next = JoinCodeCounter.reserve(COUNTER_NAME, block_size)
+                self._end = self._next + block_size
+            value = self._next
+            self._next += 1
+        return encode(self._permutation(value % SPACE))
+
+    def reclaim(self, code):
+        """Take `code` away from a finished session or an expired lobby. Returns True if it was freed."""
+        expired = timezone.now() - timedelta(seconds=settings.MULTIPLAYER_LOBBY_TTL_SECONDS)
+        freed = bool(
+            MultiplayerSession.objects.filter(join_code=code)
+            .filter(Q(status__in=["finished", "expired"]) | Q(status="waiting", created_at__lt=expired))
+            .update(join_code=None)
+        )
+        if freed:
+            snapshots.forget_codes([code])  # the old session's by-code snapshot goes with its code
+        return freed
+
+    def create_session(self, **fields):
+        """Create a MultiplayerSession with a fresh join code, retrying on a code that is still in use."""
+        code = self.allocate()
+        for _ in range(MAX_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    return MultiplayerSession.objects.create(join_code=code, **fields)
+            except IntegrityError:
+                if not self.reclaim(code):
+                    code = self.allocate()
+        raise RuntimeError("Could not allocate a free join code")
+
+    def reset(self):
+        """Drop the reserved block (tests)."""
+        with self._lock:
+            self._next = self._end = 0
+
+
+join_codes = JoinCodeAllocator()
@@ -0,0 +1,113 @@
+# backend/api/leaderboard.py
+import heapq
+import threading
+import time
+
+from django.core.cache import cache
+
+from .models import ScoreEntry
+
+TOP_K = 5
+CACHE_TTL_SECONDS = 60  # bounds staleness if ledger rows are ever deleted by hand
+SHARED_KEY = "leaderboard:topk-threshold:{difficulty}"
+
+
+class TopKCache:
+    """
+    Per-difficulty top-K heap used to decide whether a new score placed.
+
+    The score ledger is append-only, so the k-th best score for a difficulty can
+    only go up. Any threshold a worker has observed is therefore never above the
+    real one, which keeps the check correct across processes: a score at or below
+    a known threshold cannot place and is ruled out with one comparison.
+
+    A score that places is pushed into the local heap (heappushpop), which ranks
+    it and raises the shared threshold in the Django cache without a query. The
+    heap only sees this process's writes, so it is reloaded from the database
+    (one ORDER BY ... LIMIT K query) when it is missing or older than `ttl`, or
+    when another worker has published a higher threshold than it holds.
+    """
+
+    def __init__(self, k=TOP_K, ttl=CACHE_TTL_SECONDS):
+        self.k = k
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._heaps = {}  # difficulty -> (min-heap of (score, -created_ts, id), loaded_at)
+
+    def rank_of(self, entry):
+        """Return the 1-based rank of `entry` if it is in the top K for its difficulty, else None."""
+        if self._ruled_out(entry.difficulty, entry.score):
+            return None
+        rank = self._push(entry)
+        if rank is not None:
+            return rank
+
+        top = list(
+            ScoreEntry.objects.filter(difficulty=entry.difficulty)
+            .order_by("-score", "created_at")
+            .values_list("id", "score", "created_at")[: self.k]
+        )
+        self._store(entry.difficulty, top)
+        for idx, (entry_id, _, _) in enumerate(top, start=1):
+            if entry_id == entry.id:
+                return idx
+        return None
+
+    def threshold(self, difficulty):
+        """Return the best known k-th score for `difficulty`, or None while fewer than K scores are known."""
+        with self._lock:
+            cached = self._heaps.get(difficulty)
+            if cached and time.monotonic() - cached[1] < self.ttl and len(cached[0]) >= self.k:
+                return cached[0][0][0]
+        return None
+
+    def invalidate(self, difficulty=None):
+        """Forget cached thresholds (needed only if ledger rows are deleted)."""
+        with self._lock:
+            if difficulty is None:
+                self._heaps.clear()
+            else:
+                self._heaps.pop(difficulty, None)
+        difficulties = [difficulty] if difficulty else ["easy", "medium", "hard"]
+        cache.delete_many([SHARED_KEY.format(difficulty=d) for d in difficulties])
+
+    def _ruled_out(self, difficulty, score):
+        # Ties rank by created_at, so a new score equal to the k-th best does not place
+        local = self.threshold(difficulty)
+        if local is not None and score <= local:
+            return True
+        shared = cache.get(SHARED_KEY.format(difficulty=difficulty))
+        return shared is not None and score <= shared
+
+    def _push(self, entry):
+        """Rank a placing `entry` in the local heap and keep the heap current. None if the heap cannot be trusted."""
+        shared = cache.get(SHARED_KEY.format(difficulty=entry.difficulty))
+        item = (entry.score, -entry.created_at.timestamp(), entry.id)
+        with self._lock:
+            cached = self._heaps.get(entry.difficulty)
+            if cached is None or time.monotonic() - cached[1] >= self.ttl or len(cached[0]) < self.k:
+                return None
+            heap = cached[0]
+            if shared is not None and shared > heap[0][0]:
+                return None  # another worker placed scores this heap has not seen
+            heapq.heappushpop(heap, item)
+            rank = 1 + sum(1 for other in heap if other > item)
+            threshold = heap[0][0]
+        self._publish(entry.difficulty, threshold, shared)
+        return rank
+
+    def _publish(self, difficulty, threshold, shared=None):
+        # Any observed k-th score is a valid lower bound for every worker; never lower a published one
+        if shared is None or threshold > shared:
+            cache.set(SHARED_KEY.format(difficulty=difficulty), threshold, timeout=self.ttl)
+
+    def _store(self, difficulty, top):
+        heap = [(score, -created_at.timestamp(), entry_id) for entry_id, score, created_at in top]
+        heapq.heapify(heap)
+        with self._lock:
+            self._heaps[difficulty] = (heap, time.monotonic())
+        if len(heap) >= self.k:
+            self._publish(difficulty, heap[0][0], cache.get(SHARED_KEY.format(difficulty=difficulty)))
+
+
+top_k_cache = TopKCache()
@@ -0,0 +1,174 @@
+# backend/api/local_firebase.py
+import datetime
+import hashlib
+import os
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+try:
+    import jwt
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+except Exception:  # PyJWT/cryptography ship with firebase-admin; may be missing in local dev
+    jwt = None
+
+TOKEN_LIFETIME = 3600
+LOCAL_PROJECT_ID = "braintease-local"
+
+
+class UserNotFoundError(LookupError):
+    pass
+
+
+class LocalUserStore:
+    """
+    In-memory stand-in for Firebase's user records.
+
+    Mirrors the parts of firebase_admin.auth the backend uses: get_user() and a
+    batched get_users(). Users are created explicitly or learned from the claims
+    of verified local tokens, so a server process knows every user a load
+    generator minted a token for once that token has been used.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = {}  # uid -> record
+
+    def create_user(self, uid=None, display_name=None, email=None):
+        record = SimpleNamespace(uid=uid or uuid.uuid4().hex[:28], display_name=display_name, email=email)
+        with self._lock:
+            self._users[record.uid] = record
+        return record
+
+    def remember(self, uid, display_name=None, email=None):
+        """Create or update a user from token claims."""
+        with self._lock:
+            record = self._users.get(uid)
+            if record is None:
+                self._users[uid] = SimpleNamespace(uid=uid, display_name=display_name, email=email)
+            elif display_name:
+                record.display_name = display_name
+
+    def get_user(self, uid):
+        with self._lock:
+            try:
+                return self._users[uid]
+            except KeyError:
+                raise UserNotFoundError(f"No user record found for the provided user ID: {uid}") from None
+
+    def get_users(self, uids):
+        """Return (found records, uids not found), like firebase_admin.auth.get_users."""
+        found, not_found = [], []
+        with self._lock:
+            for uid in uids:
+                record = self._users.get(uid)
+                if record is None:
+                    not_found.append(uid)
+                else:
+                    found.append(record)
+        return found, not_found
+
+    def __len__(self):
+        return len(self._users)
+
+
+class LocalFirebase:
+    """
+    Offline stand-in for Firebase's token signing.
+
+    Holds RSA signing keys with matching self-signed x509 certificates, publishes
+    them in the same {kid: PEM} shape as Google's certificate endpoint, and mints
+    RS256 ID tokens with Firebase's claim layout. Intended for tests and load
+    generation only - never configure it in production.
+
+    Key ids are derived from the public key, so processes sharing a key file
+    (see from_key_file) mint and verify interchangeable tokens.
+    """
+
+    def __init__(self, project_id=LOCAL_PROJECT_ID, cert_max_age=3600, private_key=None):
+        if jwt is None:
+            raise RuntimeError("PyJWT and cryptography are required for the local Firebase stand-in")
+        self.project_id = project_id
+        self.cert_max_age = cert_max_age
+        self._lock = threading.Lock()
+        self._keys = {}  # kid -> (private key, certificate PEM)
+        self._current_kid = None
+        self.rotate(private_key=private_key)
+
+    @classmethod
+    def from_key_file(cls, path, **kwargs):
+        """Load the signing key from `path`, creating the file on first use."""
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                private_key = serialization.load_pem_private_key(f.read(), password=None)
+        else:
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+            pem = private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(pem)
+        return cls(private_key=private_key, **kwargs)
+
+    def rotate(self, keep_previous=True, private_key=None):
+        """Start signing with a new key; the previous certificate stays published unless told otherwise."""
+        private_key = private_key or rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.system.gserviceaccount.com")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        certificate = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(private_key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=7))
+            .sign(private_key, hashes.SHA256())
+        )
+        pem = certificate.public_bytes(serialization.Encoding.PEM).decode("utf-8")
+        public_der = private_key.public_key().public_bytes(
+            serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        kid = hashlib.sha256(public_der).hexdigest()[:40]
+        with self._lock:
+            if not keep_previous:
+                self._keys.clear()
+            self._keys[kid] = (private_key, pem)
+            self._current_kid = kid
+        return kid
+
+    def certificates(self):
+        """Return ({kid: PEM certificate}, max_age) - the SigningKeyManager fetch contract."""
+        with self._lock:
+            return {kid: pem for kid, (_, pem) in self._keys.items()}, self.cert_max_age
+
+    def mint_token(self, uid, name=None, email=None, lifetime=TOKEN_LIFETIME, **extra_claims):
+        """Sign an ID token for `uid` with the current key."""
+        now = int(time.time())
+        claims = {
+            "iss": f"https://securetoken.google.com/{self.project_id}",
+            "aud": self.project_id,
+            "auth_time": now,
+            "user_id": uid,
+            "sub": uid,
+            "iat": now,
+            "exp": now + lifetime,
+            "firebase": {"identities": {}, "sign_in_provider": "custom"},
+        }
+        if name:
+            claims["name"] = name
+        if email:
+            claims["email"] = email
+            claims["email_verified"] = True
+        claims.update(extra_claims)
+        with self._lock:
+            kid = self._current_kid
+            private_key = self._keys[kid][0]
+        return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
@@ -0,0 +1,205 @@
+import json
+import queue
+import random
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection, transaction
+
+from api import multiplayer
+from api.join_codes import join_codes
+from api.models import MultiplayerPlayer, MultiplayerSession
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_concurrently(tasks, threads):
+    """
+    Run callables on `threads` worker threads. Returns (seconds, latencies_ms, errors).
+
+    Each worker uses its own database connection and closes it when done.
+    """
+    pending = queue.Queue()
+    for task in tasks:
+        pending.put(task)
+    latencies = []
+    errors = Counter()
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            while True:
+                try:
+                    task = pending.get_nowait()
+                except queue.Empty:
+                    return
+                started = time.perf_counter()
+                try:
+                    task()
+                    error = None
+                except multiplayer.MultiplayerError as e:
+                    error = e.reason
+                except DatabaseError as e:
+                    error = type(e).__name__
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    if error:
+                        errors[error] += 1
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - started, latencies, errors
+
+
+def phase_summary(name, operations, seconds, latencies, errors, conflicts):
+    return {
+        "phase": name,
+        "operations": operations,
+        "seconds": round(seconds, 3),
+        "ops_per_second": round(operations / seconds, 1) if seconds else None,
+        "p50_ms": round(percentile(latencies, 0.50), 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99), 2) if latencies else None,
+        "max_ms": round(max(latencies), 2) if latencies else None,
+        "cas_conflicts": conflicts,
+        "errors": dict(errors),
+    }
+
+
+def verify(sessions, expected_scores):
+    """
+    Check every benchmark session against its player rows. Returns a list of problems.
+
+    `expected_scores` holds the submits that succeeded. A lost update shows up as
+    a counter that disagrees with the rows, a missing score, a wrong status or
+    winner list, or a version that does not equal 1 + joins + submits.
+    """
+    problems = []
+    for session in MultiplayerSession.objects.filter(pk__in=[s.pk for s in sessions]):
+        rows = list(session.player_rows.all())
+        scores = {row.user_id: row.score for row in rows if row.submitted}
+        expected = expected_scores[session.pk]
+        expected_version = 1 + (len(rows) - 1) + len(scores)
+        finished = len(scores) == len(rows)
+        if session.player_count != len(rows):
+            problems.append(f"{session.join_code}: player_count {session.player_count}, rows {len(rows)}")
+        if session.submitted_count != len(scores):
+            problems.append(f"{session.join_code}: submitted_count {session.submitted_count}, submitted rows {len(scores)}")
+        if scores != expected:
+            problems.append(f"{session.join_code}: scores {scores} != submitted {expected}")
+        if session.version != expected_version:
+            problems.append(f"{session.join_code}: version {session.version}, expected {expected_version}")
+        if (session.status == "finished") != finished or (
+            finished and sorted(session.winners) != sorted(MultiplayerSession.compute_winners(expected))
+        ):
+            problems.append(f"{session.join_code}: status {session.status}, winners {session.winners}")
+    return problems
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks concurrent multiplayer joins and submits against the configured database "
+        "and verifies that no update was lost (benchmark sessions are deleted afterwards)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=20, help="Number of sessions")
+        parser.add_argument("--players", type=int, default=10, help="Players per session (including the host)")
+        parser.add_argument("--threads", type=int, default=16, help="Concurrent worker threads")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for scores and ordering")
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark sessions")
+        parser.add_argument("--json", action="store_true", help="Print the summary as JSON (for metrics)")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        players = max(2, options["players"])
+        run_id = f"bench-{rng.getrandbits(32):08x}"
+
+        sessions = []
+        for i in range(options["sessions"]):
+            with transaction.atomic():
+                session = join_codes.create_session(
+                    board_seed=run_id,
+                    number_of_players=players,
+                    player_count=1,
+                )
+                MultiplayerPlayer.objects.create(session=session, user_id=f"{run_id}-{i}-0")
+            sessions.append(session)
+
+        try:
+            # Every player joins twice, interleaved with everyone else: the second join must be a no-op
+            joins = [
+                (lambda code=session.join_code, uid=f"{run_id}-{i}-{p}": multiplayer.join_session(code, uid))
+                for i, session in enumerate(sessions)
+                for p in range(1, players)
+                for _ in range(2)
+            ]
+            rng.shuffle(joins)
+            before = multiplayer.conflicts.value
+            seconds, latencies, errors = run_concurrently(joins, options["threads"])
+            join_phase = phase_summary(
+                "join", len(joins), seconds, latencies, errors, multiplayer.conflicts.value - before
+            )
+
+            expected_scores = {session.pk: {} for session in sessions}
+
+            def submit(pk, uid, score):
+                multiplayer.submit_score(pk, uid, score)
+                expected_scores[pk][uid] = score  # only acknowledged submits must be visible
+
+            submits = [
+                (lambda pk=session.pk, uid=f"{run_id}-{i}-{p}", score=rng.randint(0, 100): submit(pk, uid, score))
+                for i, session in enumerate(sessions)
+                for p in range(players)
+            ]
+            rng.shuffle(submits)
+            before = multiplayer.conflicts.value
+            seconds, latencies, errors = run_concurrently(submits, options["threads"])
+            submit_phase = phase_summary(
+                "submit", len(submits), seconds, latencies, errors, multiplayer.conflicts.value - before
+            )
+
+            problems = verify(sessions, expected_scores)
+        finally:
+            if not options["keep"]:
+                MultiplayerSession.objects.filter(pk__in=[s.pk for s in sessions]).delete()
+
+        summary = {
+            "sessions": len(sessions),
+            "players_per_session": players,
+            "threads": options["threads"],
+            "phases": [join_phase, submit_phase],
+            "lost_updates": len(problems),
+            "problems": problems[:20],
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(summary))
+            return
+        self.stdout.write(
+            f"{summary['sessions']} sessions x {players} players on {summary['threads']} threads"
+        )
+        for phase in summary["phases"]:
+            self.stdout.write(
+                f"  {phase['phase']:<7} {phase['operations']:>6} ops  {phase['ops_per_second']:>8} ops/s  "
+                f"p50 {phase['p50_ms']} ms  p95 {phase['p95_ms']} ms  p99 {phase['p99_ms']} ms  "
+                f"max {phase['max_ms']} ms  CAS retries {phase['cas_conflicts']}  errors {phase['errors'] or 'none'}"
+            )
+        if problems:
+            self.stdout.write(self.style.ERROR(f"{len(problems)} lost or inconsistent updates:"))
+            for problem in summary["problems"]:
+                self.stdout.write(f"  {problem}")
+        else:
+            self.stdout.write(self.style.SUCCESS("No lost updates: every counter, score, winner list and version matches"))
@@ -0,0 +1,111 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api import multiplayer
+from api.answers import AnswerBuffer
+from api.join_codes import join_codes
+from api.models import MultiplayerPlayer, UserProfile
+from api.views import render_multiplayer_session
+
+
+def measure(fn):
+    """Run fn() and return (queries, milliseconds)."""
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - started) * 1000
+    return len(queries), elapsed
+
+
+def event_summary(samples):
+    """Per-event cost over [(queries, ms)]: mean/max queries and mean/max milliseconds."""
+    queries = [sample[0] for sample in samples]
+    millis = [sample[1] for sample in samples]
+    return {
+        "events": len(samples),
+        "queries_mean": round(sum(queries) / len(queries), 2),
+        "queries_max": max(queries),
+        "ms_mean": round(sum(millis) / len(millis), 3),
+        "ms_max": round(max(millis), 3),
+    }
+
+
+def profile_room(size, run_id):
+    """Fill one room of `size` players, submit every score and measure each event."""
+    uids = [f"{run_id}-{size}-{n}" for n in range(size)]
+    # Names are stored locally, so rendering never calls out to Firebase
+    UserProfile.objects.bulk_create(
+        [UserProfile(uid=uid, display_name=uid, source="user", fetched_at=timezone.now()) for uid in uids],
+        ignore_conflicts=True,
+    )
+    session = join_codes.create_session(board_seed=run_id, number_of_players=size, player_count=1)
+    MultiplayerPlayer.objects.create(session=session, user_id=uids[0])
+    try:
+        joins = [measure(lambda uid=uid: multiplayer.join_session(session.join_code, uid)) for uid in uids[1:]]
+        # Every player answers the same question at once; one flush writes and broadcasts the burst
+        answers = AnswerBuffer(batch_size=size + 1, background=False)
+        answers.live(session.pk)  # load the room up front, as the first answer would
+        burst = [measure(lambda uid=uid: answers.record(session.pk, uid, 0, uid.endswith("0"))) for uid in uids]
+        flush = measure(answers.flush)
+        submits = [
+            measure(lambda uid=uid, score=(n * 7919) % 101: multiplayer.submit_score(session.pk, uid, score))
+            for n, uid in enumerate(uids)
+        ]
+        session.refresh_from_db()
+        snapshot = {}
+
+        def render():
+            snapshot["data"] = render_multiplayer_session(session)
+
+        renders = [measure(render) for _ in range(5)]
+        return {
+            "players": size,
+            "join": event_summary(joins),
+            "answer": event_summary(burst),
+            "flush": event_summary([flush]),
+            "submit": event_summary(submits),
+            "snapshot": {**event_summary(renders), "bytes": len(json.dumps(snapshot["data"]))},
+            "finished": session.status == "finished",
+        }
+    finally:
+        session.delete()
+        UserProfile.objects.filter(uid__in=uids).delete()
+
+
+class Command(BaseCommand):
+    help = (
+        "Load profile for multiplayer rooms: queries and time per join, per answer, per answer-burst "
+        "flush, per submit and per pushed snapshot at several room sizes (per-event cost should not "
+        "grow with the room, except the single batched write of a flush)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10,100,500", help="Comma-separated room sizes")
+        parser.add_argument("--json", action="store_true", help="Print the profile as JSON (for metrics)")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers")
+        if any(size < 2 for size in sizes):
+            raise CommandError("Rooms need at least 2 players")
+        run_id = f"profile-{int(time.time())}"
+        profile = [profile_room(size, run_id) for size in sizes]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(profile))
+            return
+        self.stdout.write(f"{'players':>8}  {'event':<8} {'queries':>12} {'ms mean':>9} {'ms max':>9} {'bytes':>7}")
+        for room in profile:
+            for event in ("join", "answer", "flush", "submit", "snapshot"):
+                row = room[event]
+                self.stdout.write(
+                    f"{room['players']:>8}  {event:<8} {row['queries_mean']:>6} / {row['queries_max']:<3} "
+                    f"{row['ms_mean']:>9} {row['ms_max']:>9} {row.get('bytes', ''):>7}"
+                )
@@ -0,0 +1,29 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.reaper import reap
+
+
+class Command(BaseCommand):
+    help = (
+        "Expires multiplayer lobbies that never filled, force-finishes abandoned games and "
+        "archives old finished sessions in batches (run it from cron, e.g. every 5 minutes)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Sessions per batch (default: MULTIPLAYER_REAPER_BATCH_SIZE)")
+        parser.add_argument("--json", action="store_true", help="Print the counts as JSON (for metrics)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = reap(batch_size=options["batch_size"])
+        counts["seconds"] = round(time.perf_counter() - started, 3)
+        if options["json"]:
+            self.stdout.write(json.dumps(counts))
+            return
+        self.stdout.write(
+            f"Expired {counts['expired']} lobbies, finished {counts['finished']} abandoned games, "
+            f"archived {counts['archived']} sessions in {counts['seconds']} s"
+        )
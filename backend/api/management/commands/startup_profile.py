@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker imports before it can serve its first request
+BOOT_SCRIPT = (
+    "import django; django.setup(); "
+    "import {wsgi}; "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+
+def parse_importtime(stderr):
+    """Parse `python -X importtime` output into [(module, self_us, cumulative_us)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, module = line[len("import time:"):].split("|")
+            rows.append((module.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+def summarize(rows, top=15):
+    """Total import time, per top-level package, and the slowest modules (milliseconds)."""
+    packages = defaultdict(int)
+    for module, self_us, _ in rows:
+        packages[module.split(".")[0]] += self_us
+    slowest = sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+    return {
+        "total_import_ms": round(sum(self_us for _, self_us, _ in rows) / 1000, 1),
+        "modules_imported": len(rows),
+        "packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "slowest_modules_ms": [
+            {"module": module, "self": round(self_us / 1000, 1), "cumulative": round(cumulative_us / 1000, 1)}
+            for module, self_us, cumulative_us in slowest
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures worker cold start: boots Django, the WSGI app and the URL conf in a fresh "
+        "interpreter under -X importtime and reports import time per package and module"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=15, help="Number of packages/modules to list")
+        parser.add_argument("--json", action="store_true", help="Print the summary as JSON (for metrics)")
+
+    def handle(self, *args, **options):
+        wsgi_module = settings.WSGI_APPLICATION.rsplit(".", 1)[0]
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "backend.settings"))
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT.format(wsgi=wsgi_module)],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=settings.BASE_DIR,
+        )
+        wall_ms = round((time.perf_counter() - started) * 1000, 1)
+        if proc.returncode != 0:
+            raise CommandError(f"Boot failed:\n{proc.stderr[-2000:]}")
+
+        summary = summarize(parse_importtime(proc.stderr), top=options["top"])
+        summary["wall_ms"] = wall_ms
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary))
+            return
+        self.stdout.write(
+            f"Boot wall time: {wall_ms} ms, imports: {summary['total_import_ms']} ms "
+            f"across {summary['modules_imported']} modules"
+        )
+        self.stdout.write("\nBy package (self time):")
+        for name, ms in summary["packages_ms"].items():
+            self.stdout.write(f"  {ms:>9.1f} ms  {name}")
+        self.stdout.write("\nSlowest modules (cumulative):")
+        for row in summary["slowest_modules_ms"]:
+            self.stdout.write(f"  {row['cumulative']:>9.1f} ms  {row['module']}")
@@ -0,0 +1,235 @@
+# backend/api/matchmaking.py
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .join_codes import join_codes
+from .models import MultiplayerPlayer
+
+logger = logging.getLogger(__name__)
+
+MATCHED_TICKET_TTL_SECONDS = 120  # how long a formed match is kept for its players to pick up
+TIME_TO_MATCH_SAMPLES = 1000  # recent time-to-match samples kept per difficulty (metrics)
+
+
+class Ticket:
+    __slots__ = ("uid", "difficulty", "enqueued_at", "session_id", "matched_at")
+
+    def __init__(self, uid, difficulty, enqueued_at):
+        self.uid = uid
+        self.difficulty = difficulty
+        self.enqueued_at = enqueued_at
+        self.session_id = None
+        self.matched_at = None
+
+
+def create_matched_session(difficulty, uids):
+    """Create an active MultiplayerSession holding `uids` (one transaction: all of them or none)."""
+    now = timezone.now()
+    with transaction.atomic():
+        session = join_codes.create_session(
+            board_seed=str(uuid.uuid4()),
+            difficulty=difficulty,
+            number_of_players=len(uids),
+            player_count=len(uids),
+            total_questions=settings.MATCHMAKING_TOTAL_QUESTIONS,
+            status="active",
+            start_time=now,
+        )
+        MultiplayerPlayer.objects.bulk_create(
+            [MultiplayerPlayer(session=session, user_id=uid, joined_at=now, changed_version=session.version) for uid in uids]
+        )
+    return session
+
+
+class MatchmakingQueue:
+    """
+    Per-difficulty quick-match queues, within one process.
+
+    Each queue is an insertion-ordered dict of tickets, so enqueue, cancel and
+    taking the oldest players are O(1) under one short lock; nothing touches the
+    database until a room is formed. A room forms as soon as `room_size` players
+    wait, or once the oldest has waited `max_wait` seconds and at least
+    `min_players` are queued (checked on every enqueue and status poll).
+
+    Forming pops the players under the lock and creates the session outside it,
+    in one transaction: if that fails every popped ticket goes back to the front
+    of its queue, so a player is either in exactly one session or still queued.
+
+    Players on different workers never meet, so route matchmaking requests to
+    one process (as with the per-process InProcessHub).
+    """
+
+    def __init__(self, room_size=None, min_players=None, max_wait=None, form=create_matched_session, clock=time.monotonic):
+        self.room_size = room_size
+        self.min_players = min_players
+        self.max_wait = max_wait
+        self.form = form
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._queues = {}  # difficulty -> OrderedDict(uid -> Ticket)
+        self._tickets = {}  # uid -> Ticket (queued, being formed, or matched and not yet picked up)
+        self._matched = OrderedDict()  # uid -> Ticket, oldest match first (for expiry)
+        self._forming = set()  # uids popped for a room whose session is being created
+        self._counters = {}  # difficulty -> {"enqueued", "cancelled", "matched", "rooms", "form_failures"}
+        self._time_to_match = {}  # difficulty -> deque of seconds
+
+    def _settings(self):
+        return (
+            self.room_size or settings.MATCHMAKING_ROOM_SIZE,
+            self.min_players or settings.MATCHMAKING_MIN_PLAYERS,
+            self.max_wait if self.max_wait is not None else settings.MATCHMAKING_MAX_WAIT_SECONDS,
+        )
+
+    def _count(self, difficulty, name, amount=1):
+        counters = self._counters.setdefault(
+            difficulty, {"enqueued": 0, "cancelled": 0, "matched": 0, "rooms": 0, "form_failures": 0}
+        )
+        counters[name] += amount
+
+    def enqueue(self, uid, difficulty):
+        """Queue `uid` for a `difficulty` room and return its status (see status())."""
+        with self._lock:
+            ticket = self._tickets.get(uid)
+            if ticket is not None and ticket.session_id is None and ticket.difficulty != difficulty:
+                if uid in self._forming:
+                    difficulty = ticket.difficulty  # already being placed in a room: keep it
+                else:
+                    # Switching difficulty: leave the old queue and join the back of the new one
+                    del self._queues[ticket.difficulty][uid]
+                    ticket = None
+            if ticket is None or ticket.session_id is not None:
+                # New ticket (a player matched earlier is queueing for another game)
+                self._matched.pop(uid, None)
+                ticket = Ticket(uid, difficulty, self.clock())
+                self._tickets[uid] = ticket
+                self._queues.setdefault(difficulty, OrderedDict())[uid] = ticket
+                self._count(difficulty, "enqueued")
+            batch = self._take_room(difficulty)
+        if batch:
+            self._form_room(difficulty, batch)
+        return self.status(uid, form=False)
+
+    def status(self, uid, form=True):
+        """
+        {"status": "queued", "position", "waited_seconds"}, {"status": "matched", "session_id"},
+        or None if `uid` is not queued. Also forms a room whose wait deadline has passed.
+        """
+        with self._lock:
+            self._expire_matches()
+            ticket = self._tickets.get(uid)
+            batch = None
+            if ticket is not None and ticket.session_id is None and form:
+                batch = self._take_room(ticket.difficulty)
+        if batch:
+            self._form_room(ticket.difficulty, batch)
+        with self._lock:
+            ticket = self._tickets.get(uid)
+            if ticket is None:
+                return None
+            if ticket.session_id is not None:
+                return {"status": "matched", "session_id": ticket.session_id, "difficulty": ticket.difficulty}
+            queue = self._queues.get(ticket.difficulty, {})
+            return {
+                "status": "queued",
+                "difficulty": ticket.difficulty,
+                # Position is only computed for small queues; it is informational
+                "position": (list(queue).index(uid) + 1) if uid in queue and len(queue) <= 1000 else None,
+                "queued": len(queue),
+                "waited_seconds": round(self.clock() - ticket.enqueued_at, 1),
+            }
+
+    def cancel(self, uid):
+        """Leave the queue. Returns False if `uid` was not queued (or is already being placed in a room)."""
+        with self._lock:
+            ticket = self._tickets.get(uid)
+            if ticket is None or ticket.session_id is not None or uid in self._forming:
+                return False
+            del self._queues[ticket.difficulty][uid]
+            del self._tickets[uid]
+            self._count(ticket.difficulty, "cancelled")
+            return True
+
+    def _take_room(self, difficulty):
+        """Pop the players for a room if one is due (caller holds the lock)."""
+        queue = self._queues.get(difficulty)
+        if not queue:
+            return None
+        room_size, min_players, max_wait = self._settings()
+        if len(queue) < room_size:
+            oldest = next(iter(queue.values()))
+            if len(queue) < min_players or self.clock() - oldest.enqueued_at < max_wait:
+                return None
+        batch = [queue.popitem(last=False)[1] for _ in range(min(room_size, len(queue)))]
+        self._forming.update(ticket.uid for ticket in batch)
+        return batch
+
+    def _form_room(self, difficulty, batch):
+        """Hand a popped batch to the database; on failure put it back at the front of the queue."""
+        try:
+            session = self.form(difficulty, [ticket.uid for ticket in batch])
+        except Exception:
+            logger.error(f"Matchmaking could not form a {difficulty} room", exc_info=True)
+            with self._lock:
+                queue = self._queues.setdefault(difficulty, OrderedDict())
+                for ticket in reversed(batch):
+                    queue[ticket.uid] = ticket
+                    queue.move_to_end(ticket.uid, last=False)
+                self._forming.difference_update(ticket.uid for ticket in batch)
+                self._count(difficulty, "form_failures")
+            return None
+        now = self.clock()
+        with self._lock:
+            samples = self._time_to_match.setdefault(difficulty, deque(maxlen=TIME_TO_MATCH_SAMPLES))
+            for ticket in batch:
+                ticket.session_id = str(session.session_id)
+                ticket.matched_at = now
+                self._matched[ticket.uid] = ticket
+                samples.append(now - ticket.enqueued_at)
+            self._forming.difference_update(ticket.uid for ticket in batch)
+            self._count(difficulty, "matched", len(batch))
+            self._count(difficulty, "rooms")
+        logger.info(f"Matchmaking formed {difficulty} session {session.session_id} with {len(batch)} players")
+        return session
+
+    def _expire_matches(self):
+        """Forget matches nobody picked up (caller holds the lock; O(1) amortized)."""
+        cutoff = self.clock() - MATCHED_TICKET_TTL_SECONDS
+        while self._matched:
+            uid, ticket = next(iter(self._matched.items()))
+            if ticket.matched_at >= cutoff:
+                break
+            del self._matched[uid]
+            if self._tickets.get(uid) is ticket:
+                del self._tickets[uid]
+
+    def metrics(self):
+        """Queue depth, oldest wait, counters and time-to-match percentiles per difficulty."""
+        now = self.clock()
+        with self._lock:
+            difficulties = set(self._queues) | set(self._counters)
+            result = {}
+            for difficulty in sorted(difficulties):
+                queue = self._queues.get(difficulty) or {}
+                samples = sorted(self._time_to_match.get(difficulty, ()))
+                result[difficulty] = {
+                    "depth": len(queue),
+                    "oldest_wait_seconds": round(now - next(iter(queue.values())).enqueued_at, 3) if queue else 0,
+                    **self._counters.get(difficulty, {}),
+                    "time_to_match_seconds": {
+                        "samples": len(samples),
+                        "p50": round(samples[len(samples) // 2], 3) if samples else None,
+                        "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3) if samples else None,
+                        "max": round(samples[-1], 3) if samples else None,
+                    },
+                }
+            return {"forming": len(self._forming), "matched_unclaimed": len(self._matched), "queues": result}
+
+
+matchmaking = MatchmakingQueue()
@@ -0,0 +1,76 @@
+# Generated by Django 6.0 on 2026-10-19 11:46
+
+import uuid
+from datetime import date, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_best_scores(apps, schema_editor):
+    """Seed BestScore from existing UserScore and GameSession rows."""
+    BestScore = apps.get_model('api', 'BestScore')
+    best = {}
+    for model_name in ('UserScore', 'GameSession'):
+        model = apps.get_model('api', model_name)
+        rows = model.objects.values_list('id', 'user_id', 'display_name', 'difficulty', 'score', 'created_at')
+        for score_id, user_id, display_name, difficulty, score, created_at in rows.iterator(chunk_size=2000):
+            day = timezone.localdate(created_at)
+            periods = (
+                ('daily', day),
+                ('weekly', day - timedelta(days=day.weekday())),
+                ('all_time', date(1970, 1, 1)),
+            )
+            for scope in (difficulty, 'all'):
+                for timeframe, period_start in periods:
+                    key = (user_id, scope, timeframe, period_start)
+                    current = best.get(key)
+                    if current is None or (score, -created_at.timestamp()) > (current[2], -current[4].timestamp()):
+                        best[key] = (display_name, difficulty, score, score_id, created_at)
+    BestScore.objects.bulk_create(
+        (
+            BestScore(
+                user_id=user_id,
+                difficulty_scope=scope,
+                timeframe=timeframe,
+                period_start=period_start,
+                display_name=display_name,
+                difficulty=difficulty,
+                score=score,
+                score_id=score_id,
+                achieved_at=achieved_at,
+            )
+            for (user_id, scope, timeframe, period_start), (display_name, difficulty, score, score_id, achieved_at) in best.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_add_join_code_to_multiplayer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BestScore',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('user_id', models.CharField(max_length=100)),
+                ('display_name', models.CharField(blank=True, help_text="User's display name for leaderboard", max_length=255, null=True)),
+                ('difficulty_scope', models.CharField(max_length=10)),
+                ('timeframe', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('all_time', 'All time')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('score', models.IntegerField()),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], max_length=10)),
+                ('score_id', models.UUIDField()),
+                ('achieved_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['timeframe', 'period_start', 'difficulty_scope', '-score', 'achieved_at'], name='api_bestsco_timefra_1d3493_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user_id', 'difficulty_scope', 'timeframe', 'period_start'), name='unique_best_score_per_period')],
+            },
+        ),
+        migrations.RunPython(backfill_best_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 6.0 on 2026-10-19 11:48
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def _stream_into_ledger(ScoreEntry, rows):
+    """Bulk-insert ledger entries from an iterator of value dicts, BATCH_SIZE rows at a time."""
+    batch = []
+    for row in rows:
+        batch.append(ScoreEntry(**row))
+        if len(batch) >= BATCH_SIZE:
+            ScoreEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        ScoreEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def copy_scores_to_ledger(apps, schema_editor):
+    """
+    Stream UserScore rows and submitted GameSession rows into ScoreEntry.
+
+    Row ids are kept so existing score_id references (BestScore) stay valid.
+    GameSession rows created by StartGameView carry allowed_hints and are in-progress
+    placeholders rather than submitted scores, so they are skipped.
+    """
+    ScoreEntry = apps.get_model('api', 'ScoreEntry')
+    UserScore = apps.get_model('api', 'UserScore')
+    GameSession = apps.get_model('api', 'GameSession')
+
+    _stream_into_ledger(
+        ScoreEntry,
+        UserScore.objects.values(
+            'id', 'user_id', 'display_name', 'difficulty', 'score', 'created_at'
+        ).iterator(chunk_size=BATCH_SIZE),
+    )
+    _stream_into_ledger(
+        ScoreEntry,
+        GameSession.objects.filter(allowed_hints__isnull=True).values(
+            'id', 'user_id', 'display_name', 'difficulty', 'score', 'categories',
+            'correct_count', 'total_questions', 'time_taken_seconds', 'created_at'
+        ).iterator(chunk_size=BATCH_SIZE),
+    )
+
+
+def copy_ledger_to_user_scores(apps, schema_editor):
+    """Reverse: restore ledger entries that did not come from a GameSession as UserScore rows."""
+    ScoreEntry = apps.get_model('api', 'ScoreEntry')
+    UserScore = apps.get_model('api', 'UserScore')
+    GameSession = apps.get_model('api', 'GameSession')
+
+    session_ids = GameSession.objects.values('id')
+    rows = ScoreEntry.objects.exclude(id__in=session_ids).values(
+        'id', 'user_id', 'display_name', 'difficulty', 'score', 'created_at'
+    ).iterator(chunk_size=BATCH_SIZE)
+    batch = []
+    for row in rows:
+        batch.append(UserScore(**row))
+        if len(batch) >= BATCH_SIZE:
+            UserScore.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        UserScore.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_bestscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('user_id', models.CharField(max_length=100)),
+                ('display_name', models.CharField(blank=True, help_text="User's display name for leaderboard", max_length=255, null=True)),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], max_length=10)),
+                ('score', models.IntegerField()),
+                ('categories', models.JSONField(blank=True, null=True)),
+                ('correct_count', models.IntegerField(blank=True, null=True)),
+                ('total_questions', models.IntegerField(blank=True, null=True)),
+                ('time_taken_seconds', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='scoreentry',
+            index=models.Index(fields=['difficulty', '-score', 'created_at'], name='api_scoreen_difficu_9de494_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scoreentry',
+            index=models.Index(fields=['-score', 'created_at'], name='api_scoreen_score_204563_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scoreentry',
+            index=models.Index(fields=['user_id'], name='api_scoreen_user_id_7cd8b3_idx'),
+        ),
+        migrations.RunPython(copy_scores_to_ledger, copy_ledger_to_user_scores),
+        migrations.DeleteModel(
+            name='UserScore',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 11:50
+
+from django.db import migrations, models
+
+
+def mark_submitted_sessions_finished(apps, schema_editor):
+    """Sessions written by the old submit path (no hint limits) already hold a final score."""
+    GameSession = apps.get_model('api', 'GameSession')
+    GameSession.objects.filter(allowed_hints__isnull=True).update(status='finished')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_score_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('finished', 'Finished')], default='active', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='scoreentry',
+            name='session_id',
+            field=models.UUIDField(blank=True, null=True, unique=True),
+        ),
+        migrations.RunPython(mark_submitted_sessions_finished, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0 on 2026-10-19 11:51
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_score_categories(apps, schema_editor):
+    """Create ScoreCategory rows for existing ledger entries, BATCH_SIZE rows at a time."""
+    ScoreEntry = apps.get_model('api', 'ScoreEntry')
+    ScoreCategory = apps.get_model('api', 'ScoreCategory')
+
+    entries = ScoreEntry.objects.exclude(categories__isnull=True).values_list(
+        'id', 'categories', 'difficulty', 'score', 'created_at'
+    )
+    batch = []
+    for entry_id, categories, difficulty, score, created_at in entries.iterator(chunk_size=BATCH_SIZE):
+        if not isinstance(categories, list):
+            continue
+        for category in sorted({str(c).strip() for c in categories if str(c).strip()}):
+            batch.append(ScoreCategory(
+                entry_id=entry_id, category=category, difficulty=difficulty, score=score, created_at=created_at
+            ))
+        if len(batch) >= BATCH_SIZE:
+            ScoreCategory.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        ScoreCategory.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_gamesession_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreCategory',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('category', models.CharField(max_length=100)),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], max_length=10)),
+                ('score', models.IntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_rows', to='api.scoreentry')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', 'difficulty', '-score', 'created_at'], name='api_scoreca_categor_420494_idx'), models.Index(fields=['category', '-score', 'created_at'], name='api_scoreca_categor_142336_idx')],
+                'constraints': [models.UniqueConstraint(fields=('entry', 'category'), name='unique_score_category')],
+            },
+        ),
+        migrations.RunPython(backfill_score_categories, migrations.RunPython.noop),
+    ]
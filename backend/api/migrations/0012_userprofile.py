@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-19 11:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_scorecategory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProfile',
+            fields=[
+                ('uid', models.CharField(max_length=128, primary_key=True, serialize=False)),
+                ('display_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('fetched_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
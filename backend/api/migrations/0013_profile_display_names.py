@@ -0,0 +1,82 @@
+# Generated by Django 6.0 on 2026-10-19 11:58
+
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def _upsert_profiles(UserProfile, names):
+    """Write {uid: display_name} as user-sourced profile rows, BATCH_SIZE rows at a time."""
+    now = timezone.now()
+    items = list(names.items())
+    for i in range(0, len(items), BATCH_SIZE):
+        UserProfile.objects.bulk_create(
+            [UserProfile(uid=uid, display_name=name, source='user', fetched_at=now) for uid, name in items[i:i + BATCH_SIZE]],
+            update_conflicts=True,
+            unique_fields=['uid'],
+            update_fields=['display_name', 'source', 'fetched_at'],
+        )
+
+
+def copy_names_to_profiles(apps, schema_editor):
+    """
+    Move denormalized display names into UserProfile.
+
+    Score rows are streamed in batches and the most recent non-empty name per user
+    wins (renames rewrote every row, so the newest row carries the current name).
+    The rows are marked source='user' so the names leaderboards showed before this
+    migration are kept rather than replaced by a later Firebase refresh.
+    """
+    ScoreEntry = apps.get_model('api', 'ScoreEntry')
+    GameSession = apps.get_model('api', 'GameSession')
+    UserProfile = apps.get_model('api', 'UserProfile')
+
+    latest = {}  # uid -> (created_at, display_name)
+    for Model in (ScoreEntry, GameSession):
+        rows = Model.objects.exclude(display_name__isnull=True).exclude(display_name='').values_list(
+            'user_id', 'display_name', 'created_at'
+        ).iterator(chunk_size=BATCH_SIZE)
+        for uid, name, created_at in rows:
+            if uid not in latest or created_at >= latest[uid][0]:
+                latest[uid] = (created_at, name)
+    _upsert_profiles(UserProfile, {uid: name for uid, (_, name) in latest.items()})
+
+
+def copy_profiles_to_names(apps, schema_editor):
+    """Reverse: write each profile name back onto the user's score, session and best-score rows."""
+    UserProfile = apps.get_model('api', 'UserProfile')
+    models_with_names = [apps.get_model('api', name) for name in ('ScoreEntry', 'GameSession', 'BestScore')]
+
+    rows = UserProfile.objects.exclude(display_name__isnull=True).values_list('uid', 'display_name')
+    for uid, name in rows.iterator(chunk_size=BATCH_SIZE):
+        for Model in models_with_names:
+            Model.objects.filter(user_id=uid).update(display_name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_userprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='source',
+            field=models.CharField(choices=[('firebase', 'Firebase'), ('user', 'User')], default='firebase', max_length=10),
+        ),
+        migrations.RunPython(copy_names_to_profiles, copy_profiles_to_names),
+        migrations.RemoveField(
+            model_name='bestscore',
+            name='display_name',
+        ),
+        migrations.RemoveField(
+            model_name='gamesession',
+            name='display_name',
+        ),
+        migrations.RemoveField(
+            model_name='scoreentry',
+            name='display_name',
+        ),
+    ]
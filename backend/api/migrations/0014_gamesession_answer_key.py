@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_profile_display_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='answer_key',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
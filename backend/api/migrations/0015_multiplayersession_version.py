@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_gamesession_answer_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='multiplayersession',
+            name='player_versions',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='multiplayersession',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
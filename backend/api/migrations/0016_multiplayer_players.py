@@ -0,0 +1,131 @@
+# Generated by Django 6.0 on 2026-10-19 12:21
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH_SIZE = 500
+
+
+def _parse_time(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def copy_players_to_rows(apps, schema_editor):
+    """
+    Move the players/scores JSON blobs into MultiplayerPlayer rows.
+
+    joined_at is spread by a microsecond per position so rows keep the order of
+    the old players list; counters are filled from the copied rows.
+    """
+    MultiplayerSession = apps.get_model('api', 'MultiplayerSession')
+    MultiplayerPlayer = apps.get_model('api', 'MultiplayerPlayer')
+
+    sessions = MultiplayerSession.objects.only(
+        'session_id', 'players', 'scores', 'player_versions', 'version', 'created_at'
+    ).iterator(chunk_size=BATCH_SIZE)
+    for session in sessions:
+        players = list(session.players or [])
+        scores = session.scores or {}
+        versions = session.player_versions or {}
+        rows = []
+        for position, uid in enumerate(dict.fromkeys(players)):
+            result = scores.get(uid)
+            if result is not None and not isinstance(result, dict):
+                result = {"score": result}
+            rows.append(MultiplayerPlayer(
+                session_id=session.session_id,
+                user_id=uid,
+                joined_at=session.created_at + timedelta(microseconds=position),
+                score=result.get("score") if result else None,
+                correct_count=result.get("correct_count") if result else None,
+                time_taken_seconds=result.get("time_taken_seconds") if result else None,
+                submitted_at=(_parse_time(result.get("submitted_at")) or session.created_at) if result else None,
+                changed_version=versions.get(uid, session.version),
+            ))
+        MultiplayerPlayer.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        MultiplayerSession.objects.filter(session_id=session.session_id).update(
+            player_count=len(rows),
+            submitted_count=sum(1 for row in rows if row.submitted_at is not None),
+        )
+
+
+def copy_rows_to_players(apps, schema_editor):
+    """Reverse: rebuild the players/scores/player_versions JSON from the rows."""
+    MultiplayerSession = apps.get_model('api', 'MultiplayerSession')
+    MultiplayerPlayer = apps.get_model('api', 'MultiplayerPlayer')
+
+    for session in MultiplayerSession.objects.only('session_id').iterator(chunk_size=BATCH_SIZE):
+        rows = MultiplayerPlayer.objects.filter(session_id=session.session_id).order_by('joined_at', 'id')
+        players, scores, versions = [], {}, {}
+        for row in rows:
+            players.append(row.user_id)
+            versions[row.user_id] = row.changed_version
+            if row.submitted_at is not None:
+                scores[row.user_id] = {
+                    "score": row.score,
+                    "correct_count": row.correct_count,
+                    "time_taken_seconds": row.time_taken_seconds,
+                    "submitted_at": row.submitted_at.isoformat(),
+                }
+        MultiplayerSession.objects.filter(session_id=session.session_id).update(
+            players=players, scores=scores, player_versions=versions
+        )
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_multiplayersession_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='multiplayersession',
+            name='player_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='multiplayersession',
+            name='submitted_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='MultiplayerPlayer',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('user_id', models.CharField(max_length=100)),
+                ('joined_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('score', models.IntegerField(blank=True, null=True)),
+                ('correct_count', models.IntegerField(blank=True, null=True)),
+                ('time_taken_seconds', models.IntegerField(blank=True, null=True)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('changed_version', models.PositiveIntegerField(default=1)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_rows', to='api.multiplayersession')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('session', 'user_id'), name='unique_player_per_session')],
+            },
+        ),
+        migrations.RunPython(copy_players_to_rows, copy_rows_to_players),
+        migrations.RemoveField(
+            model_name='multiplayersession',
+            name='player_versions',
+        ),
+        migrations.RemoveField(
+            model_name='multiplayersession',
+            name='players',
+        ),
+        migrations.RemoveField(
+            model_name='multiplayersession',
+            name='scores',
+        ),
+    ]
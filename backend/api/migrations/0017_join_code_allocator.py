@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-19 12:28
+
+from django.db import migrations, models
+
+
+def create_counter(apps, schema_editor):
+    apps.get_model("api", "JoinCodeCounter").objects.get_or_create(name="join_code")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_multiplayer_players'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JoinCodeCounter',
+            fields=[
+                ('name', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('next_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_counter, migrations.RunPython.noop),
+    ]
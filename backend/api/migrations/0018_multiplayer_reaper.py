@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-19 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_join_code_allocator'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMultiplayerSession',
+            fields=[
+                ('session_id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('active', 'Active'), ('finished', 'Finished'), ('expired', 'Expired')], max_length=20)),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], max_length=10)),
+                ('total_questions', models.IntegerField()),
+                ('number_of_players', models.IntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('start_time', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('winners', models.JSONField(default=list)),
+                ('players', models.JSONField(default=list)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='multiplayersession',
+            name='status',
+            field=models.CharField(choices=[('waiting', 'Waiting'), ('active', 'Active'), ('finished', 'Finished'), ('expired', 'Expired')], default='waiting', max_length=20),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0 on 2026-10-19 12:32
+
+from django.db import migrations, models
+
+
+def fill_standings(apps, schema_editor):
+    """Seed top_score and the current leaders from the scores already submitted."""
+    MultiplayerSession = apps.get_model("api", "MultiplayerSession")
+    MultiplayerPlayer = apps.get_model("api", "MultiplayerPlayer")
+    for session in MultiplayerSession.objects.filter(submitted_count__gt=0).iterator():
+        submitted = MultiplayerPlayer.objects.filter(session=session, submitted_at__isnull=False)
+        top_score = submitted.aggregate(best=models.Max("score"))["best"]
+        session.top_score = top_score
+        if session.status != "finished":
+            session.winners = list(submitted.filter(score=top_score).values_list("user_id", flat=True))
+        session.save(update_fields=["top_score", "winners"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_multiplayer_reaper'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='multiplayersession',
+            name='top_score',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='multiplayerplayer',
+            index=models.Index(fields=['session', 'joined_at'], name='api_mpplayer_roster_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='multiplayerplayer',
+            index=models.Index(fields=['session', '-score'], name='api_mpplayer_standings_idx'),
+        ),
+        migrations.RunPython(fill_standings, migrations.RunPython.noop),
+    ]
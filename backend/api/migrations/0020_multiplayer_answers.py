@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 12:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_multiplayer_standings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MultiplayerAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.CharField(max_length=100)),
+                ('question_index', models.PositiveSmallIntegerField()),
+                ('correct', models.BooleanField()),
+                ('answered_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='api.multiplayersession')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('session', 'user_id', 'question_index'), name='unique_answer_per_question')],
+            },
+        ),
+    ]
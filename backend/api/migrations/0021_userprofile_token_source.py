@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_multiplayer_answers'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='source',
+            field=models.CharField(choices=[('firebase', 'Firebase'), ('token', 'Token'), ('user', 'User')], default='firebase', max_length=10),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 6.0 on 2026-10-19 13:10
+
+from datetime import date, timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+def rebuild_placeholder_best_scores(apps, schema_editor):
+    """
+    Rebuild the BestScore rows of users whose records point at no ScoreEntry.
+
+    The 0008 backfill also read GameSession rows created by StartGameView, which
+    carry allowed_hints and are zero-score placeholders rather than submitted
+    scores. 0009 left those out of the ledger, so any record they set now points
+    at a missing entry. Each affected user's records are recomputed from their
+    ledger entries (a user who never submitted a score is dropped).
+    """
+    BestScore = apps.get_model('api', 'BestScore')
+    ScoreEntry = apps.get_model('api', 'ScoreEntry')
+
+    user_ids = set(
+        BestScore.objects.exclude(score_id__in=ScoreEntry.objects.values('id'))
+        .values_list('user_id', flat=True).distinct()
+    )
+    if not user_ids:
+        return
+    BestScore.objects.filter(user_id__in=user_ids).delete()
+
+    best = {}
+    rows = ScoreEntry.objects.filter(user_id__in=user_ids).values_list(
+        'id', 'user_id', 'difficulty', 'score', 'created_at'
+    )
+    for score_id, user_id, difficulty, score, created_at in rows.iterator(chunk_size=BATCH_SIZE):
+        day = timezone.localdate(created_at)
+        periods = (
+            ('daily', day),
+            ('weekly', day - timedelta(days=day.weekday())),
+            ('all_time', date(1970, 1, 1)),
+        )
+        for scope in (difficulty, 'all'):
+            for timeframe, period_start in periods:
+                key = (user_id, scope, timeframe, period_start)
+                current = best.get(key)
+                if current is None or (score, -created_at.timestamp()) > (current[1], -current[3].timestamp()):
+                    best[key] = (difficulty, score, score_id, created_at)
+    BestScore.objects.bulk_create(
+        (
+            BestScore(
+                user_id=user_id,
+                difficulty_scope=scope,
+                timeframe=timeframe,
+                period_start=period_start,
+                difficulty=difficulty,
+                score=score,
+                score_id=score_id,
+                achieved_at=achieved_at,
+            )
+            for (user_id, scope, timeframe, period_start), (difficulty, score, score_id, achieved_at) in best.items()
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_userprofile_token_source'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_placeholder_best_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 13:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_rebuild_placeholder_best_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedmultiplayersession',
+            name='questions',
+            field=models.JSONField(default=list),
+        ),
+    ]
@@ -1,7 +1,8 @@
-from django.db import models
+from datetime import date, timedelta
+
+from django.db import models, transaction, IntegrityError, connection
+from django.utils import timezone
 import uuid
-import random
-import string
 
 DIFFICULTY_CHOICES = [
     ("easy", "Easy"),
@@ -9,41 +10,80 @@ DIFFICULTY_CHOICES = [
     ("hard", "Hard"),
 ]
 
+TIMEFRAME_CHOICES = [
+    ("daily", "Daily"),
+    ("weekly", "Weekly"),
+    ("all_time", "All time"),
+]
+
+# Difficulty scope used for a user's best score across every difficulty
+ALL_DIFFICULTIES = "all"
+
+# All-time records share a single fixed period
+ALL_TIME_PERIOD_START = date(1970, 1, 1)
+
+
+def supports_update_returning():
+    """
+    Whether the database accepts UPDATE ... RETURNING: PostgreSQL and SQLite 3.35+.
+
+    connection.features.can_return_columns_from_insert only covers INSERT (MariaDB
+    sets it but rejects UPDATE ... RETURNING), so check the vendor instead.
+    """
+    if connection.vendor == "postgresql":
+        return True
+    if connection.vendor == "sqlite":
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+class ScoreEntry(models.Model):
+    """
+    Append-only ledger of submitted scores.
 
-class UserScore(models.Model):
+    Every leaderboard and top-5 check reads this single table. Display names live
+    in UserProfile and are resolved at read time, so renames never touch score rows.
+    Detail columns are nullable because clients may submit only score and difficulty.
+    """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user_id = models.CharField(max_length=100)  # Firebase UID
-    display_name = models.CharField(max_length=255, blank=True, null=True, help_text="User's display name for leaderboard")
-    score = models.IntegerField()
     difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES)
-    created_at = models.DateTimeField(auto_now_add=True)
+    score = models.IntegerField()
+    categories = models.JSONField(null=True, blank=True)  # list of strings
+    correct_count = models.IntegerField(null=True, blank=True)
+    total_questions = models.IntegerField(null=True, blank=True)
+    time_taken_seconds = models.IntegerField(null=True, blank=True)
+    session_id = models.UUIDField(null=True, blank=True, unique=True)  # GameSession this score finalized, if any
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         indexes = [
-            models.Index(fields=["-score", "created_at", "difficulty"]),
+            models.Index(fields=["difficulty", "-score", "created_at"]),
+            models.Index(fields=["-score", "created_at"]),
+            models.Index(fields=["user_id"]),
         ]
 
     @property
     def submitted_at(self):
         return self.created_at
 
-    def to_response(self, user_display_name: str | None = None, include_message: bool = False):
+    def to_response(self, user_display_name: str | None = None, include_message: bool = True):
         """
-        Convert UserScore to API response format.
-        
-        Optimization: Use stored display_name if available, otherwise use provided parameter.
-        include_message parameter is accepted for compatibility but UserScore doesn't include messages.
+        Convert ScoreEntry to API response format.
+
+        Optimization: Optional message field to reduce response size when not needed.
+        The display name is resolved by the caller (see DisplayNameDirectory).
         """
-        # Use stored display_name if available, otherwise fall back to provided parameter
-        display_name = self.display_name or user_display_name
         response = {
             "score_id": str(self.id),
-            "user_display_name": display_name,
+            "user_display_name": user_display_name,
             "score": self.score,
             "difficulty": self.difficulty,
+            "correct_count": self.correct_count,
+            "total_questions": self.total_questions,
+            "time_taken_seconds": self.time_taken_seconds,
             "submitted_at": self.submitted_at.isoformat(),
         }
-        # UserScore doesn't include message field (only GameSession does)
         if include_message:
             response["message"] = "Score submitted successfully"
         return response
@@ -52,10 +92,51 @@ class UserScore(models.Model):
         return f"{self.user_id} - {self.score}"
 
 
+class ScoreCategory(models.Model):
+    """
+    One row per (score entry, category) for category-filtered leaderboards.
+
+    Score, difficulty and created_at are copied from the entry so a category
+    leaderboard is a single ordered scan of the (category, difficulty, -score) index.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    entry = models.ForeignKey(ScoreEntry, on_delete=models.CASCADE, related_name="category_rows")
+    category = models.CharField(max_length=100)
+    difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES)
+    score = models.IntegerField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["entry", "category"], name="unique_score_category"),
+        ]
+        indexes = [
+            models.Index(fields=["category", "difficulty", "-score", "created_at"]),
+            models.Index(fields=["category", "-score", "created_at"]),
+        ]
+
+    @classmethod
+    def rows_for(cls, entry):
+        """Build (unsaved) category rows for a ledger entry, ignoring blanks and duplicates."""
+        categories = {str(c).strip() for c in (entry.categories or []) if str(c).strip()}
+        return [
+            cls(entry=entry, category=category, difficulty=entry.difficulty, score=entry.score, created_at=entry.created_at)
+            for category in sorted(categories)
+        ]
+
+    def __str__(self):
+        return f"{self.category} - {self.score}"
+
+
+GAME_STATUS_CHOICES = [
+    ("active", "Active"),
+    ("finished", "Finished"),
+]
+
+
 class GameSession(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user_id = models.CharField(max_length=100)
-    display_name = models.CharField(max_length=255, blank=True, null=True, help_text="User's display name for leaderboard")
     difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES)
     categories = models.JSONField()  # list of strings
     score = models.IntegerField()
@@ -64,7 +145,11 @@ class GameSession(models.Model):
     time_taken_seconds = models.IntegerField(null=True, blank=True)
     allowed_hints = models.IntegerField(null=True, blank=True)
     hints_used = models.IntegerField(default=0)
+    # Per question: [correct option index, incorrect option indices in hint order] (see api/answer_keys.py)
+    answer_key = models.JSONField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=GAME_STATUS_CHOICES, default="active")  # score is 0 until finished
     created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         indexes = [
@@ -79,18 +164,44 @@ class GameSession(models.Model):
         if self.total_questions:
             self.allowed_hints = max(1, self.total_questions // 5)
 
+    @classmethod
+    def consume_hint(cls, session_id, user_id):
+        """
+        Use one hint with a single conditional UPDATE and return (hints_used, allowed_hints).
+
+        The increment only applies while hints remain, so concurrent requests cannot
+        overspend the limit or lose an update. Returns None if nothing was updated
+        (unknown session, another user's session, a finished game, or no hints left).
+        """
+        if supports_update_returning():
+            # UPDATE ... RETURNING (SQLite 3.35+, PostgreSQL): one round trip
+            table = connection.ops.quote_name(cls._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} SET hints_used = hints_used + 1 "
+                    "WHERE id = %s AND user_id = %s AND status = %s AND hints_used < allowed_hints "
+                    "RETURNING hints_used, allowed_hints",
+                    [cls._meta.pk.get_db_prep_value(session_id, connection), user_id, "active"],
+                )
+                return cursor.fetchone()
+        # Fallback: same conditional UPDATE, then read the new counters in the same transaction
+        # (the updated row stays locked until commit, so the read sees this request's increment)
+        sessions = cls.objects.filter(id=session_id, user_id=user_id)
+        with transaction.atomic():
+            if not sessions.filter(status="active", hints_used__lt=models.F("allowed_hints")).update(hints_used=models.F("hints_used") + 1):
+                return None
+            return sessions.values_list("hints_used", "allowed_hints").first()
+
     def to_response(self, user_display_name: str | None = None, include_message: bool = True):
         """
         Convert GameSession to API response format.
         
         Optimization: Optional message field to reduce response size when not needed.
-        Uses stored display_name if available, otherwise uses provided parameter.
+        The display name is resolved by the caller (see DisplayNameDirectory).
         """
-        # Use stored display_name if available, otherwise fall back to provided parameter
-        display_name = self.display_name or user_display_name
         response = {
             "score_id": str(self.id),
-            "user_display_name": display_name,
+            "user_display_name": user_display_name,
             "score": self.score,
             "difficulty": self.difficulty,
             "correct_count": self.correct_count,
@@ -109,39 +220,175 @@ class GameSession(models.Model):
         return f"Session {self.id} by {self.user_id}"
 
 
+class BestScore(models.Model):
+    """
+    A user's best score for one difficulty scope and timeframe period.
+
+    Backs the best_per_user leaderboard: there is at most one row per
+    (user_id, difficulty_scope, timeframe, period_start), so ranking users is a
+    single ordered index scan instead of deduplicating score rows in Python.
+    Daily and weekly periods are calendar buckets (TIME_ZONE day, ISO week).
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user_id = models.CharField(max_length=100)
+    difficulty_scope = models.CharField(max_length=10)  # a difficulty or ALL_DIFFICULTIES
+    timeframe = models.CharField(max_length=10, choices=TIMEFRAME_CHOICES)
+    period_start = models.DateField()
+    score = models.IntegerField()
+    difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES)  # difficulty the score was achieved on
+    score_id = models.UUIDField()  # the ScoreEntry that set this record
+    achieved_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user_id", "difficulty_scope", "timeframe", "period_start"],
+                name="unique_best_score_per_period",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["timeframe", "period_start", "difficulty_scope", "-score", "achieved_at"]),
+        ]
+
+    @staticmethod
+    def period_start_for(timeframe, moment=None):
+        """Return the first day of the timeframe period containing `moment` (server time zone)."""
+        day = timezone.localdate(moment)
+        if timeframe == "daily":
+            return day
+        if timeframe == "weekly":
+            return day - timedelta(days=day.weekday())
+        return ALL_TIME_PERIOD_START
+
+    @classmethod
+    def record(cls, user_id, difficulty, score, score_id, achieved_at):
+        """
+        Upsert the user's best scores after a new score is saved.
+
+        The user's current records for the six (scope, timeframe) periods are read
+        in one query, and rows are only written where the new score beats them, so a
+        score that is not a personal best costs that single read and no write.
+        Periods are nested (daily best <= weekly best <= all-time best), so once a
+        score fails to improve the daily record the wider timeframes are skipped.
+        """
+        values = {
+            "score": score,
+            "difficulty": difficulty,
+            "score_id": score_id,
+            "achieved_at": achieved_at,
+        }
+        periods = {timeframe: cls.period_start_for(timeframe, achieved_at) for timeframe, _ in TIMEFRAME_CHOICES}
+        current = {
+            (scope, timeframe): best
+            for scope, timeframe, period_start, best in cls.objects.filter(
+                user_id=user_id,
+                difficulty_scope__in=(difficulty, ALL_DIFFICULTIES),
+                period_start__in=set(periods.values()),
+            ).values_list("difficulty_scope", "timeframe", "period_start", "score")
+            if periods[timeframe] == period_start
+        }
+        for difficulty_scope in (difficulty, ALL_DIFFICULTIES):
+            for timeframe, period_start in periods.items():
+                best = current.get((difficulty_scope, timeframe))
+                if best is not None and best >= score:
+                    break
+                key = {
+                    "user_id": user_id,
+                    "difficulty_scope": difficulty_scope,
+                    "timeframe": timeframe,
+                    "period_start": period_start,
+                }
+                if not cls._upsert_if_better(key, values, exists=best is not None):
+                    break
+
+    @classmethod
+    def _upsert_if_better(cls, key, values, exists):
+        """Store `values` under `key` if no row exists or the stored score is lower. Returns True if written."""
+        if exists:
+            # Conditional: a concurrent submission may have stored a higher score since the read
+            return bool(cls.objects.filter(**key, score__lt=values["score"]).update(**values))
+        try:
+            with transaction.atomic():
+                cls.objects.create(**key, **values)
+            return True
+        except IntegrityError:
+            # A concurrent submission created the row first; keep whichever score is higher
+            return bool(cls.objects.filter(**key, score__lt=values["score"]).update(**values))
+
+    def to_response(self, user_display_name: str | None = None, include_message: bool = False):
+        """Convert BestScore to the same API response format as individual score rows."""
+        return {
+            "score_id": str(self.score_id),
+            "user_display_name": user_display_name,
+            "score": self.score,
+            "difficulty": self.difficulty,
+            "submitted_at": self.achieved_at.isoformat(),
+        }
+
+    def __str__(self):
+        return f"{self.user_id} best {self.timeframe} ({self.difficulty_scope}) - {self.score}"
+
+
+PROFILE_SOURCE_CHOICES = [
+    ("firebase", "Firebase"),
+    ("token", "Token"),  # `name` claim of a verified ID token
+    ("user", "User"),
+]
+
+
+class UserProfile(models.Model):
+    """
+    The one display name row per uid, read by every leaderboard and multiplayer view.
+
+    Names chosen through the update-display-name endpoint have source "user" and
+    are never overwritten. Other rows cache the Firebase profile name (or the
+    `name` claim of the user's last token) and are re-fetched once fetched_at is
+    older than the directory TTL; a null
+    display_name records that the user is unknown or has no name (negative cache).
+    """
+    uid = models.CharField(max_length=128, primary_key=True)
+    display_name = models.CharField(max_length=255, blank=True, null=True)
+    source = models.CharField(max_length=10, choices=PROFILE_SOURCE_CHOICES, default="firebase")
+    fetched_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.uid}: {self.display_name}"
+
 
 STATUS_CHOICES = [
     ("waiting", "Waiting"),
     ("active", "Active"),
     ("finished", "Finished"),
+    ("expired", "Expired"),  # lobby that never filled (set by the reaper)
 ]
 
 class MultiplayerSession(models.Model):
     session_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    join_code = models.CharField(max_length=8, unique=True, db_index=True)  # Short code for joining (e.g., "ABC123")
+    # Short code for joining (e.g., "ABC123"); cleared when a finished/expired session's code is reused
+    join_code = models.CharField(max_length=8, unique=True, null=True, blank=True, db_index=True)
     board_seed = models.CharField(max_length=64)  # Used to generate same question order for all players
-    players = models.JSONField(default=list)  # list of Firebase user IDs (JSONField works with SQLite)
     number_of_players = models.IntegerField(default=2)  # Target number of players
-    scores = models.JSONField(default=dict)  # {user_id: {"score": int, "correct_count": int, "time_taken_seconds": int}}
+    # Players and their scores live in MultiplayerPlayer; these counters make the
+    # full/all-submitted checks part of the version compare-and-swap
+    player_count = models.PositiveIntegerField(default=0)
+    submitted_count = models.PositiveIntegerField(default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="waiting")
     start_time = models.DateTimeField(null=True, blank=True)  # When game actually started (all players joined)
     finished_at = models.DateTimeField(null=True, blank=True)  # When all players finished
-    winners = models.JSONField(default=list)  # List of user IDs who won (can be multiple for ties)
+    # Best score submitted so far and the players on it, kept current as each score
+    # arrives (incremental standings); once finished, `winners` are the winners
+    top_score = models.IntegerField(null=True, blank=True)
+    winners = models.JSONField(default=list)
     difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES, default="easy")
     total_questions = models.IntegerField(default=10)  # Number of questions in the game
     created_at = models.DateTimeField(auto_now_add=True)
+    version = models.PositiveIntegerField(default=1)  # Bumped on every join/submit (compare-and-swap, ETag, event ids)
 
     @staticmethod
     def generate_join_code():
-        """Generate a unique 6-character alphanumeric join code"""
-        characters = string.ascii_uppercase + string.digits
-        # Exclude confusing characters: 0, O, I, 1
-        characters = characters.replace('0', '').replace('O', '').replace('I', '').replace('1', '')
-        
-        while True:
-            code = ''.join(random.choices(characters, k=6))
-            if not MultiplayerSession.objects.filter(join_code=code).exists():
-                return code
+        """Allocate a 6-character join code (see api.join_codes; no database read)"""
+        from .join_codes import join_codes
+        return join_codes.allocate()
 
     class Meta:
         indexes = [
@@ -151,36 +398,193 @@ class MultiplayerSession(models.Model):
 
     def is_full(self):
         """Check if session has reached maximum number of players"""
-        return len(self.players) >= self.number_of_players
+        return self.player_count >= self.number_of_players
 
     def all_players_submitted(self):
         """Check if all players have submitted their scores"""
-        if not self.players:
-            return False
-        submitted_user_ids = set(self.scores.keys())
-        required_user_ids = set(self.players)
-        return submitted_user_ids == required_user_ids
-
-    def compute_winners(self):
-        """Compute winners based on scores (highest score wins, ties are allowed)"""
-        if not self.scores or not self.all_players_submitted():
-            return []
-        
-        # Get all scores
-        score_list = []
-        for user_id, score_data in self.scores.items():
-            score_value = score_data.get("score", 0) if isinstance(score_data, dict) else score_data
-            score_list.append((user_id, score_value))
-        
-        if not score_list:
+        return self.player_count > 0 and self.submitted_count >= self.player_count
+
+    def roster(self, limit=None, offset=0):
+        """The session's MultiplayerPlayer rows in join order (one indexed query)."""
+        rows = self.player_rows.order_by("joined_at", "id")
+        return list(rows[offset:offset + limit] if limit is not None else rows)
+
+    def standings(self, limit=None, offset=0):
+        """Players by score, best first; players yet to submit come last (one indexed query)."""
+        rows = self.player_rows.order_by(models.F("score").desc(nulls_last=True), "submitted_at", "id")
+        return list(rows[offset:offset + limit] if limit is not None else rows)
+
+    @staticmethod
+    def compute_winners(scores):
+        """Compute winners from {user_id: score} (highest score wins, ties are allowed)"""
+        if not scores:
             return []
-        
-        # Find maximum score
-        max_score = max(score for _, score in score_list)
-        
-        # Find all players with max score (winners)
-        winners = [user_id for user_id, score in score_list if score == max_score]
-        return winners
+        max_score = max(scores.values())
+        return [user_id for user_id, score in scores.items() if score == max_score]
+
+    def __str__(self):
+        return f"MultiplayerSession {self.session_id} - {self.status} ({self.player_count}/{self.number_of_players})"
+
+
+class MultiplayerPlayer(models.Model):
+    """
+    One player's seat and result in a MultiplayerSession.
+
+    Joins insert a row and submits update the player's own row, so concurrent
+    players never rewrite each other's data; the session row only carries
+    counters and the version used for compare-and-swap.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    session = models.ForeignKey(MultiplayerSession, on_delete=models.CASCADE, related_name="player_rows")
+    user_id = models.CharField(max_length=100)
+    joined_at = models.DateTimeField(default=timezone.now)
+    score = models.IntegerField(null=True, blank=True)
+    correct_count = models.IntegerField(null=True, blank=True)
+    time_taken_seconds = models.IntegerField(null=True, blank=True)
+    submitted_at = models.DateTimeField(null=True, blank=True)
+    changed_version = models.PositiveIntegerField(default=1)  # session version of this row's last change (deltas)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["session", "user_id"], name="unique_player_per_session"),
+        ]
+        indexes = [
+            # Roster and standings pages of large rooms
+            models.Index(fields=["session", "joined_at"], name="api_mpplayer_roster_idx"),
+            models.Index(fields=["session", "-score"], name="api_mpplayer_standings_idx"),
+        ]
+
+    @property
+    def submitted(self):
+        return self.submitted_at is not None
+
+    def __str__(self):
+        return f"MultiplayerPlayer {self.user_id} in {self.session_id}"
+
+
+
+class MultiplayerAnswer(models.Model):
+    """
+    One player's answer to one question of a MultiplayerSession.
+
+    Reported as each question is answered and written in batches (see
+    api/answers.py); the final score still arrives through the submit endpoint.
+    """
+    session = models.ForeignKey(MultiplayerSession, on_delete=models.CASCADE, related_name="answers")
+    user_id = models.CharField(max_length=100)
+    question_index = models.PositiveSmallIntegerField()
+    correct = models.BooleanField()
+    answered_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            # Also makes a re-sent answer a no-op when a batch is written (ignore_conflicts)
+            models.UniqueConstraint(fields=["session", "user_id", "question_index"], name="unique_answer_per_question"),
+        ]
+
+    def __str__(self):
+        return f"MultiplayerAnswer {self.user_id} q{self.question_index} in {self.session_id}"
+
+class ArchivedMultiplayerSession(models.Model):
+    """
+    A finished or expired MultiplayerSession moved out of the hot tables by the reaper (api/reaper.py).
+
+    The players and their results are kept as one JSON list, since archived
+    games are only ever read whole. The per-question answers (MultiplayerAnswer)
+    are kept as tallies: per player in `players`, per question in `questions`.
+    """
+    session_id = models.UUIDField(primary_key=True, editable=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES)
+    total_questions = models.IntegerField()
+    number_of_players = models.IntegerField()
+    created_at = models.DateTimeField()
+    start_time = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    winners = models.JSONField(default=list)
+    # [{user_id, score, correct_count, time_taken_seconds, submitted_at, answered, answered_correctly}]
+    players = models.JSONField(default=list)
+    questions = models.JSONField(default=list)  # [{answered, correct}] per question, from the reported answers
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def from_session(cls, session, player_answers=None, question_answers=None):
+        """
+        Archive row for `session` (its player_rows should be prefetched). `player_answers`
+        maps user_id and `question_answers` question index to (answered, correct) counts.
+        """
+        player_answers = player_answers or {}
+        question_answers = question_answers or {}
+        return cls(
+            session_id=session.session_id,
+            status=session.status,
+            difficulty=session.difficulty,
+            total_questions=session.total_questions,
+            number_of_players=session.number_of_players,
+            created_at=session.created_at,
+            start_time=session.start_time,
+            finished_at=session.finished_at,
+            winners=session.winners,
+            players=[
+                {
+                    "user_id": player.user_id,
+                    "score": player.score,
+                    "correct_count": player.correct_count,
+                    "time_taken_seconds": player.time_taken_seconds,
+                    "submitted_at": player.submitted_at.isoformat() if player.submitted_at else None,
+                    "answered": player_answers.get(player.user_id, (0, 0))[0],
+                    "answered_correctly": player_answers.get(player.user_id, (0, 0))[1],
+                }
+                for player in sorted(session.player_rows.all(), key=lambda player: (player.joined_at, player.id))
+            ],
+            questions=[
+                dict(zip(("answered", "correct"), question_answers.get(index, (0, 0))))
+                for index in range(session.total_questions)
+            ],
+        )
+
+    def __str__(self):
+        return f"ArchivedMultiplayerSession {self.session_id} - {self.status}"
+
+
+class JoinCodeCounter(models.Model):
+    """
+    Counter behind the join-code allocator (api.join_codes).
+
+    Workers reserve blocks of counter values with one UPDATE and hand codes out
+    from memory; each value maps to a distinct code through a fixed permutation.
+    """
+    name = models.CharField(max_length=32, primary_key=True)
+    next_value = models.BigIntegerField(default=0)
+
+    @classmethod
+    def reserve(cls, name, count):
+        """Reserve `count` consecutive values and return the first one."""
+        if supports_update_returning():
+            # UPDATE ... RETURNING (SQLite 3.35+, PostgreSQL): one round trip
+            table = connection.ops.quote_name(cls._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} SET next_value = next_value + %s WHERE name = %s RETURNING next_value",
+                    [count, name],
+                )
+                row = cursor.fetchone()
+            if row is not None:
+                return row[0] - count
+        else:
+            # Fallback: lock the row, then advance it
+            with transaction.atomic():
+                counter = cls.objects.select_for_update().filter(name=name).first()
+                if counter is not None:
+                    cls.objects.filter(name=name).update(next_value=models.F("next_value") + count)
+                    return counter.next_value
+        # First reservation for this counter
+        try:
+            with transaction.atomic():
+                cls.objects.create(name=name, next_value=count)
+            return 0
+        except IntegrityError:
+            return cls.reserve(name, count)  # created concurrently
 
     def __str__(self):
-        return f"MultiplayerSession {self.session_id} - {self.status} ({len(self.players)}/{self.number_of_players})"
+        return f"JoinCodeCounter {self.name} at {self.next_value}"
@@ -0,0 +1,211 @@
+# backend/api/multiplayer.py
+import contextlib
+import random
+import threading
+import time
+
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from .models import MultiplayerPlayer, MultiplayerSession
+
+MAX_ATTEMPTS = 20  # compare-and-swap retries before a join/submit gives up as "busy"
+OPTIMISTIC_ATTEMPTS = 1  # lost races before a join/submit queues on the session row lock instead
+BACKOFF_BASE_SECONDS = 0.002  # first retry waits up to this long; doubles per lost race
+BACKOFF_CAP_SECONDS = 0.05
+
+
+class MultiplayerError(Exception):
+    """A join or submit that cannot be applied; `reason` says why (the views map it to a response)."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class ConflictCounter:
+    """Counts lost compare-and-swap races (read by the benchmark_multiplayer command)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def increment(self):
+        with self._lock:
+            self.value += 1
+
+
+conflicts = ConflictCounter()
+
+
+def _compare_and_swap(session, changes):
+    """Apply `changes` to the session row if its version is still the one `session` was read at."""
+    if MultiplayerSession.objects.filter(pk=session.pk, version=session.version).update(**changes):
+        return True
+    conflicts.increment()
+    return False
+
+
+def _backoff(attempt):
+    """Wait a jittered, exponentially growing moment after a lost race, so a whole room submitting at once spreads out."""
+    time.sleep(random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)))
+
+
+@contextlib.contextmanager
+def _read_guard(attempt, **lookup):
+    """
+    Context for reading the session on this attempt.
+
+    The first attempts read without locking (the swap detects a concurrent change).
+    After OPTIMISTIC_ATTEMPTS lost races the read happens in a transaction that
+    first locks the session row with a no-op UPDATE (a row lock on PostgreSQL, the
+    write lock on SQLite), so contended requests queue on the row instead of
+    retrying, and the swap that follows cannot lose.
+    """
+    if attempt < OPTIMISTIC_ATTEMPTS:
+        yield
+        return
+    with transaction.atomic():
+        MultiplayerSession.objects.filter(**lookup).update(version=models.F("version"))
+        yield
+
+
+def join_session(join_code, uid):
+    """
+    Add `uid` to the session with `join_code`. Returns (session, joined).
+
+    The seat is claimed with one compare-and-swap UPDATE on the session version,
+    which also starts the game when the last seat fills, and the player's row is
+    inserted in the same transaction. The first read takes no lock: a concurrent
+    change makes the swap miss and the join retries on fresh state (after a short
+    backoff, and queued on the row lock - see _read_guard), and the unique
+    (session, user) constraint turns a duplicate join into a no-op.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        with _read_guard(attempt, join_code=join_code):
+            session = MultiplayerSession.objects.filter(join_code=join_code).first()
+            if session is None:
+                raise MultiplayerError("invalid_code")
+            if session.player_rows.filter(user_id=uid).exists():
+                return session, False
+            if session.status in ("finished", "expired"):
+                raise MultiplayerError(session.status)
+            if session.is_full():
+                raise MultiplayerError("full")
+
+            now = timezone.now()
+            changes = {"version": session.version + 1, "player_count": session.player_count + 1}
+            if changes["player_count"] >= session.number_of_players:
+                changes.update(status="active", start_time=now)
+            try:
+                with transaction.atomic():
+                    swapped = _compare_and_swap(session, changes)
+                    if swapped:
+                        MultiplayerPlayer.objects.create(
+                            session=session, user_id=uid, joined_at=now, changed_version=changes["version"]
+                        )
+            except IntegrityError:
+                continue  # joined concurrently from another request; the next pass returns the session
+        if not swapped:
+            _backoff(attempt)
+            continue
+        for field, value in changes.items():
+            setattr(session, field, value)
+        return session, True
+    raise MultiplayerError("busy")
+
+
+def _standings_after(session, player, score):
+    """
+    (top_score, leaders) once `player` has `score`, updated from the session's current standings.
+
+    O(1) per submission: only a leader lowering their own score (a resubmit) when
+    no other player shares the lead needs the next best score, which is one
+    indexed query.
+    """
+    top_score, leaders = session.top_score, list(session.winners or [])
+    if player.user_id in leaders and score < top_score:
+        leaders.remove(player.user_id)
+        if not leaders:
+            # Other players' rows cannot change without bumping the version, so the swap validates this read
+            others = session.player_rows.filter(submitted_at__isnull=False).exclude(pk=player.pk)
+            best = others.order_by("-score").values("score")[:1]
+            rows = list(others.filter(score=models.Subquery(best)).values_list("user_id", "score"))
+            top_score, leaders = (rows[0][1], [user_id for user_id, _ in rows]) if rows else (None, [])
+    if top_score is None or score > top_score:
+        return score, [player.user_id]
+    if score == top_score and player.user_id not in leaders:
+        leaders.append(player.user_id)
+    return top_score, leaders
+
+
+def submit_score(session_id, uid, score, correct_count=None, time_taken_seconds=None):
+    """
+    Record `uid`'s score in an active session. Returns the updated session.
+
+    The player's own row is updated; the session row only gets its counters and
+    version swapped, and the last submission finishes the game and stores the
+    winners in that same swap. Resubmitting overwrites the earlier score.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        with _read_guard(attempt, pk=session_id):
+            session = MultiplayerSession.objects.filter(pk=session_id).first()
+            if session is None:
+                raise MultiplayerError("not_found")
+            player = session.player_rows.filter(user_id=uid).first()
+            if player is None:
+                raise MultiplayerError("not_player")
+            if session.status == "waiting":
+                raise MultiplayerError("not_started")
+            if session.status in ("finished", "expired"):
+                raise MultiplayerError(session.status)
+
+            now = timezone.now()
+            top_score, leaders = _standings_after(session, player, score)
+            changes = {
+                "version": session.version + 1,
+                "submitted_count": session.submitted_count + (0 if player.submitted else 1),
+                "top_score": top_score,
+                "winners": leaders,
+            }
+            if changes["submitted_count"] >= session.player_count:
+                # The standings are already current, so finishing needs no scan of the room
+                changes.update(status="finished", finished_at=now)
+            with transaction.atomic():
+                swapped = _compare_and_swap(session, changes)
+                if swapped:
+                    MultiplayerPlayer.objects.filter(pk=player.pk).update(
+                        score=score,
+                        correct_count=correct_count,
+                        time_taken_seconds=time_taken_seconds,
+                        submitted_at=now,
+                        changed_version=changes["version"],
+                    )
+        if not swapped:
+            _backoff(attempt)
+            continue
+        for field, value in changes.items():
+            setattr(session, field, value)
+        return session
+    raise MultiplayerError("busy")
+
+
+def finish_abandoned(session_id):
+    """
+    Finish an active game that not every player completed. Returns the session, or None if it is not active.
+
+    The leaders on the scores submitted so far win; the same version swap as a
+    submit guards against a last-moment submission.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        session = MultiplayerSession.objects.filter(pk=session_id, status="active").first()
+        if session is None:
+            return None
+        # The current leaders (kept up to date by submit_score) become the winners
+        changes = {"version": session.version + 1, "status": "finished", "finished_at": timezone.now()}
+        if _compare_and_swap(session, changes):
+            for field, value in changes.items():
+                setattr(session, field, value)
+            return session
+        _backoff(attempt)
+    raise MultiplayerError("busy")
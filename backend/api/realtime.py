@@ -0,0 +1,195 @@
+# backend/api/realtime.py
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+RETRY_MILLISECONDS = 2000  # EventSource reconnect delay sent to clients
+
+
+class InProcessHub:
+    """
+    Latest-state pub/sub for multiplayer sessions, within one process.
+
+    Every publish replaces the session's snapshot and bumps its version (normally
+    MultiplayerSession.version), then wakes the session's subscribers. Subscribers always read the latest snapshot, so a
+    slow client skips straight to the current state instead of replaying each
+    change, and a reconnecting client resumes by sending the last version it saw.
+
+    Other backends (e.g. one fanning out through Redis) plug in through
+    MULTIPLAYER_HUB_BACKEND and implement publish/latest/wait/wait_async.
+    """
+
+    def __init__(self, max_sessions=10000):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._latest = OrderedDict()  # session_id -> (version, data)
+        self._waiters = {}  # session_id -> set of wake-up callables
+
+    def publish(self, session_id, data, version=None):
+        """Store `data` as the session's current state and wake subscribers. Returns the new version."""
+        session_id = str(session_id)
+        with self._lock:
+            current = self._latest.get(session_id)
+            if version is None:
+                version = current[0] + 1 if current else 1
+            elif current and version <= current[0]:
+                return current[0]  # an older write arrived late
+            self._latest[session_id] = (version, data)
+            self._latest.move_to_end(session_id)
+            while len(self._latest) > self.max_sessions:
+                self._latest.popitem(last=False)
+            waiters = list(self._waiters.get(session_id, ()))
+        for wake in waiters:
+            wake()
+        return version
+
+    def latest(self, session_id):
+        """Return (version, data) for the session, or None if nothing was published here."""
+        with self._lock:
+            return self._latest.get(str(session_id))
+
+    def _subscribe(self, session_id, wake):
+        with self._lock:
+            self._waiters.setdefault(session_id, set()).add(wake)
+
+    def _unsubscribe(self, session_id, wake):
+        with self._lock:
+            waiters = self._waiters.get(session_id)
+            if waiters is not None:
+                waiters.discard(wake)
+                if not waiters:
+                    del self._waiters[session_id]
+
+    def _newer(self, session_id, version):
+        latest = self.latest(session_id)
+        if latest is not None and (version is None or latest[0] > version):
+            return latest
+        return None
+
+    def wait(self, session_id, version, timeout):
+        """Block until the session's version passes `version`; returns (version, data) or None on timeout."""
+        session_id = str(session_id)
+        event = threading.Event()
+        self._subscribe(session_id, event.set)
+        try:
+            # Checked after subscribing, so a publish in between is not missed
+            newer = self._newer(session_id, version)
+            if newer is None and event.wait(timeout):
+                newer = self._newer(session_id, version)
+            return newer
+        finally:
+            self._unsubscribe(session_id, event.set)
+
+    async def wait_async(self, session_id, version, timeout):
+        """Asyncio version of wait() for ASGI workers (publishes may come from other threads)."""
+        session_id = str(session_id)
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def wake():
+            loop.call_soon_threadsafe(event.set)
+
+        self._subscribe(session_id, wake)
+        try:
+            newer = self._newer(session_id, version)
+            if newer is None:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    return None
+                newer = self._newer(session_id, version)
+            return newer
+        finally:
+            self._unsubscribe(session_id, wake)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    """Return the process-wide hub named by MULTIPLAYER_HUB_BACKEND."""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = import_string(settings.MULTIPLAYER_HUB_BACKEND)()
+    return _hub
+
+
+def sse_message(version, data, event="session"):
+    payload = json.dumps(data, separators=(",", ":"))
+    return f"id: {version}\nevent: {event}\ndata: {payload}\n\n"
+
+
+def _is_final(data):
+    return data.get("status") in ("finished", "expired")
+
+
+def stream_session(hub, session_id, last_version, load, keepalive, max_duration, clock=time.monotonic, event="session"):
+    """
+    Server-Sent Events for one session (blocking generator for WSGI workers).
+
+    Sends the current state unless the client already has it, then one message
+    per change, with comment keepalives in between. Ends when the game finishes
+    or after `max_duration` seconds; EventSource then reconnects with
+    Last-Event-ID and the stream resumes from that version. `load()` renders the
+    session from the database when this process has not published it yet.
+    Messages are sent as `event` (live standings use their own channel and name).
+    """
+    yield f"retry: {RETRY_MILLISECONDS}\n\n"
+    latest = hub.latest(session_id)
+    if latest is None:
+        data = load()
+        if data is None:
+            yield sse_message(0, {"error": "Session not found"}, event="gone")
+            return
+        hub.publish(session_id, data, version=data.get("version"))
+        latest = hub.latest(session_id)
+    deadline = clock() + max_duration
+    while True:
+        if latest is not None and (last_version is None or latest[0] > last_version):
+            last_version, data = latest
+            yield sse_message(last_version, data, event=event)
+            if _is_final(data):
+                return
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return
+        latest = hub.wait(session_id, last_version, min(keepalive, remaining))
+        if latest is None:
+            yield ": keepalive\n\n"
+
+
+async def stream_session_async(
+    hub, session_id, last_version, load, keepalive, max_duration, clock=time.monotonic, event="session"
+):
+    """stream_session() for ASGI: waiting parks a coroutine, not a thread."""
+    yield f"retry: {RETRY_MILLISECONDS}\n\n"
+    latest = hub.latest(session_id)
+    if latest is None:
+        data = await sync_to_async(load)()
+        if data is None:
+            yield sse_message(0, {"error": "Session not found"}, event="gone")
+            return
+        hub.publish(session_id, data, version=data.get("version"))
+        latest = hub.latest(session_id)
+    deadline = clock() + max_duration
+    while True:
+        if latest is not None and (last_version is None or latest[0] > last_version):
+            last_version, data = latest
+            yield sse_message(last_version, data, event=event)
+            if _is_final(data):
+                return
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return
+        latest = await hub.wait_async(session_id, last_version, min(keepalive, remaining))
+        if latest is None:
+            yield ": keepalive\n\n"
@@ -0,0 +1,134 @@
+# backend/api/reaper.py
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from . import multiplayer
+from .models import ArchivedMultiplayerSession, MultiplayerAnswer, MultiplayerSession
+from .snapshots import snapshots
+
+logger = logging.getLogger(__name__)
+
+
+def _publish(session):
+    # Imported here: the views module is heavy and the reaper also runs from cron
+    from .views import publish_multiplayer_session
+    publish_multiplayer_session(session)
+
+
+def expire_lobbies(now, batch_size):
+    """Expire waiting sessions created more than MULTIPLAYER_LOBBY_TTL_SECONDS ago; frees their join codes."""
+    cutoff = now - timedelta(seconds=settings.MULTIPLAYER_LOBBY_TTL_SECONDS)
+    expired = 0
+    while True:
+        rows = list(
+            MultiplayerSession.objects.filter(status="waiting", created_at__lt=cutoff)
+            .order_by("created_at")
+            .values_list("session_id", "join_code")[:batch_size]
+        )
+        if not rows:
+            return expired
+        ids = [session_id for session_id, _ in rows]
+        with transaction.atomic():
+            # Still conditional on status: a lobby that filled meanwhile is left alone,
+            # and the version bump makes any in-flight join's compare-and-swap miss
+            expired += MultiplayerSession.objects.filter(pk__in=ids, status="waiting").update(
+                status="expired", finished_at=now, join_code=None, version=F("version") + 1
+            )
+            for session in MultiplayerSession.objects.filter(pk__in=ids, status="expired", finished_at=now):
+                _publish(session)
+        # The codes were freed, and the sessions changed outside any worker: drop their snapshots
+        snapshots.discard(rows)
+
+
+def finish_abandoned_games(now, batch_size):
+    """Force-finish games active for more than MULTIPLAYER_GAME_TTL_SECONDS, ranking the scores submitted so far."""
+    cutoff = now - timedelta(seconds=settings.MULTIPLAYER_GAME_TTL_SECONDS)
+    finished, skipped = 0, set()
+    while True:
+        ids = list(
+            MultiplayerSession.objects.filter(status="active")
+            .filter(Q(start_time__lt=cutoff) | Q(start_time__isnull=True, created_at__lt=cutoff))
+            .exclude(pk__in=skipped)
+            .order_by("start_time")
+            .values_list("session_id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return finished
+        for session_id in ids:
+            try:
+                session = multiplayer.finish_abandoned(session_id)
+            except multiplayer.MultiplayerError:
+                skipped.add(session_id)  # kept changing under us; next run
+                continue
+            if session is not None:
+                finished += 1
+                _publish(session)
+                snapshots.discard([(session.session_id, session.join_code)])
+
+
+def _answer_tallies(session_ids, field):
+    """(answered, correct) counts of the sessions' answers grouped by `field`: {session_id: {value: counts}}."""
+    tallies = {}
+    rows = (
+        MultiplayerAnswer.objects.filter(session_id__in=session_ids)
+        .values("session_id", field)
+        .annotate(answered=Count("id"), correct=Count("id", filter=Q(correct=True)))
+    )
+    for row in rows:
+        tallies.setdefault(row["session_id"], {})[row[field]] = (row["answered"], row["correct"])
+    return tallies
+
+
+def archive_finished(now, batch_size):
+    """
+    Move sessions finished or expired over MULTIPLAYER_ARCHIVE_AFTER_SECONDS ago into the archive table.
+
+    Their answers are deleted with them, so they are archived as tallies per player and per question.
+    """
+    cutoff = now - timedelta(seconds=settings.MULTIPLAYER_ARCHIVE_AFTER_SECONDS)
+    archived = 0
+    while True:
+        sessions = list(
+            MultiplayerSession.objects.filter(status__in=["finished", "expired"])
+            .filter(Q(finished_at__lt=cutoff) | Q(finished_at__isnull=True, created_at__lt=cutoff))
+            .order_by("finished_at")
+            .prefetch_related("player_rows")[:batch_size]
+        )
+        if not sessions:
+            return archived
+        ids = [session.pk for session in sessions]
+        with transaction.atomic():
+            # Optimization: Two grouped queries per batch instead of loading every answer row
+            by_player = _answer_tallies(ids, "user_id")
+            by_question = _answer_tallies(ids, "question_index")
+            # ignore_conflicts: a batch whose delete failed last run is simply archived again
+            ArchivedMultiplayerSession.objects.bulk_create(
+                [
+                    ArchivedMultiplayerSession.from_session(
+                        session, by_player.get(session.pk), by_question.get(session.pk)
+                    )
+                    for session in sessions
+                ],
+                ignore_conflicts=True,
+            )
+            MultiplayerSession.objects.filter(pk__in=ids).delete()
+        snapshots.discard([(session.session_id, session.join_code) for session in sessions])
+        archived += len(sessions)
+
+
+def reap(now=None, batch_size=None):
+    """Run every reaper step once. Returns how many sessions each step touched."""
+    now = now or timezone.now()
+    batch_size = batch_size or settings.MULTIPLAYER_REAPER_BATCH_SIZE
+    counts = {
+        "expired": expire_lobbies(now, batch_size),
+        "finished": finish_abandoned_games(now, batch_size),
+        "archived": archive_finished(now, batch_size),
+    }
+    logger.info(f"Multiplayer reaper: {counts}")
+    return counts
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import MultiplayerSession
 
@@ -8,6 +9,8 @@ class SubmitScoreSerializer(serializers.Serializer):
 	total_questions = serializers.IntegerField(required=False, allow_null=True)
 	time_taken_seconds = serializers.IntegerField(required=False, allow_null=True)
 	categories = serializers.ListField(child=serializers.CharField(), required=False)
+	session_id = serializers.UUIDField(required=False, allow_null=True)  # GameSession from start-game to finalize
+	session_token = serializers.CharField(required=False, allow_null=True)  # signed token from start-game
 
 
 class UpdateDisplayNameSerializer(serializers.Serializer):
@@ -15,7 +18,7 @@ class UpdateDisplayNameSerializer(serializers.Serializer):
 
 
 class CreateMultiplayerSerializer(serializers.Serializer):
-    number_of_players = serializers.IntegerField(min_value=2, max_value=10, default=2)
+    number_of_players = serializers.IntegerField(min_value=2, max_value=settings.MULTIPLAYER_MAX_PLAYERS, default=2)
     difficulty = serializers.ChoiceField(
         choices=[("easy", "Easy"), ("medium", "Medium"), ("hard", "Hard")], 
         default="easy"
@@ -28,6 +31,12 @@ class JoinMultiplayerSerializer(serializers.Serializer):
     join_code = serializers.CharField(max_length=8, min_length=6)
 
 
+class MultiplayerAnswerSerializer(serializers.Serializer):
+    session_id = serializers.UUIDField()
+    question_index = serializers.IntegerField(min_value=0)
+    correct = serializers.BooleanField()
+
+
 class SubmitMultiplayerScoreSerializer(serializers.Serializer):
     session_id = serializers.UUIDField()
     score = serializers.IntegerField(min_value=0)
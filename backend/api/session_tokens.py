@@ -0,0 +1,81 @@
+# backend/api/session_tokens.py
+import time
+import uuid
+
+from django.conf import settings
+from django.core import signing
+
+SALT = "api.game-session-token"
+STREAM_SALT = "api.multiplayer-stream-token"
+
+
+class SessionTokenError(ValueError):
+    pass
+
+
+def issue_session_token(session, ttl=None):
+    """
+    Return a compact signed token for a GameSession created by StartGameView.
+
+    The token carries the session id, the owner's uid, the allowed hints and an
+    expiry, signed with SECRET_KEY. Hint and submit requests that present it can
+    be checked for ownership and limits without reading the session row.
+    """
+    ttl = settings.GAME_SESSION_TOKEN_TTL_SECONDS if ttl is None else ttl
+    payload = {
+        "s": session.id.hex,
+        "u": session.user_id,
+        "h": session.allowed_hints,
+        "e": int(time.time()) + ttl,
+    }
+    # Plain Signer: the expiry is in the payload, so TimestampSigner's timestamp would be redundant
+    return signing.Signer(salt=SALT).sign_object(payload)
+
+
+def read_session_token(token, session_id, uid):
+    """
+    Verify `token` for `session_id` and `uid` and return its claims.
+
+    Raises SessionTokenError if the signature is invalid, the token has expired,
+    or it was issued for another session or user.
+    """
+    try:
+        claims = signing.Signer(salt=SALT).unsign_object(token)
+    except signing.BadSignature:
+        raise SessionTokenError("Invalid game session token") from None
+    if claims.get("e", 0) < time.time():
+        raise SessionTokenError("Game session token has expired")
+    if claims.get("s") != uuid.UUID(str(session_id)).hex or claims.get("u") != uid:
+        raise SessionTokenError("Game session token does not match this session")
+    return {
+        "session_id": claims["s"],
+        "uid": claims["u"],
+        "allowed_hints": claims.get("h"),
+        "expires_at": claims["e"],
+    }
+
+
+def issue_stream_token(session_id, uid, ttl=None):
+    """
+    Return a signed token that lets `uid` open the event stream of a multiplayer session.
+
+    EventSource cannot send an Authorization header, so the stream authenticates
+    with this token (issued by the authenticated multiplayer endpoints) instead of
+    a Firebase ID token in the URL.
+    """
+    ttl = settings.GAME_SESSION_TOKEN_TTL_SECONDS if ttl is None else ttl
+    payload = {"s": uuid.UUID(str(session_id)).hex, "u": uid, "e": int(time.time()) + ttl}
+    return signing.Signer(salt=STREAM_SALT).sign_object(payload)
+
+
+def read_stream_token(token, session_id):
+    """Verify a stream token for `session_id` and return the uid it was issued to."""
+    try:
+        claims = signing.Signer(salt=STREAM_SALT).unsign_object(token)
+    except signing.BadSignature:
+        raise SessionTokenError("Invalid stream token") from None
+    if claims.get("e", 0) < time.time():
+        raise SessionTokenError("Stream token has expired")
+    if claims.get("s") != uuid.UUID(str(session_id)).hex:
+        raise SessionTokenError("Stream token does not match this session")
+    return claims["u"]
@@ -0,0 +1,147 @@
+# backend/api/signing_keys.py
+import logging
+import re
+import threading
+import time
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+DEFAULT_MAX_AGE = 3600  # used when the response has no Cache-Control max-age
+
+
+def fetch_certificates(url, timeout=5):
+    """GET the {kid: PEM certificate} map and its max-age (seconds) from `url`."""
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    match = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+    return response.json(), int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+
+class SigningKeyManager:
+    """
+    In-memory set of the public keys Firebase signs ID tokens with.
+
+    Google rotates the x509 certificates and publishes their lifetime in the
+    Cache-Control header. A daemon thread refreshes the set `refresh_margin`
+    seconds before it expires, so requests verify against keys already parsed in
+    memory and never wait on the network. If a token names an unknown key, one
+    request fetches while concurrent ones wait for that fetch instead of starting
+    their own; a known key past its max-age keeps verifying while a fetch is in
+    flight. No lock is held across the network call: the fetched set replaces the
+    old one (keys and expiry together) in one assignment.
+    """
+
+    def __init__(self, fetch, refresh_margin=300, retry_after=30, clock=time.time):
+        self._fetch = fetch  # callable() -> ({kid: pem}, max_age_seconds)
+        self.refresh_margin = refresh_margin
+        self.retry_after = retry_after
+        self._clock = clock
+        self._key_set = ({}, 0.0)  # ({kid: public key}, expires_at), replaced whole
+        self._last_attempt = 0.0
+        self._fetching = None  # threading.Event set when the fetch in flight ends
+        self._refresh_lock = threading.Lock()  # guards _last_attempt/_fetching only, never held across a fetch
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background refresh thread (idempotent; no lock once started)."""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="signing-key-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def get_key(self, kid):
+        """Return the public key for `kid`, refreshing synchronously only if it is unknown or expired."""
+        keys, expires_at = self._key_set
+        key = keys.get(kid)
+        if key is not None and self._clock() < expires_at:
+            return key
+        try:
+            # An expired key is still returned without waiting if another thread is fetching
+            self.refresh(if_older_than=self.retry_after, wait=key is None)
+        except Exception as e:
+            # Fallback: Keep verifying with the last key set; Google keeps keys valid past max-age
+            logger.warning(f"Could not refresh Firebase signing keys: {str(e)}")
+        return self._key_set[0].get(kid, key)
+
+    def refresh(self, if_older_than=0, wait=True):
+        """Fetch and parse the current certificates; skipped if another thread just did (or, with wait, is doing it)."""
+        # Imported on first use to keep cryptography out of worker boot
+        from cryptography.x509 import load_pem_x509_certificate
+
+        with self._refresh_lock:
+            fetching = self._fetching
+            if fetching is None:
+                if self._clock() - self._last_attempt < if_older_than:
+                    return
+                self._last_attempt = self._clock()
+                self._fetching = threading.Event()
+        if fetching is not None:
+            if wait:
+                fetching.wait()
+            return
+        try:
+            certs, max_age = self._fetch()
+            keys = {
+                kid: load_pem_x509_certificate(pem.encode("utf-8")).public_key()
+                for kid, pem in certs.items()
+            }
+            # Swap keys and expiry in one assignment so readers never see a partial key set
+            self._key_set = (keys, self._clock() + max_age)
+        finally:
+            with self._refresh_lock:
+                done, self._fetching = self._fetching, None
+            done.set()
+        logger.info(f"Loaded {len(keys)} Firebase signing keys (valid for {max_age}s)")
+
+    def verify(self, token, project_id):
+        """
+        Verify a Firebase ID token and return its claims, with `uid` set like verify_id_token.
+
+        Raises jwt.InvalidTokenError (or ValueError) when the token is malformed,
+        signed by an unknown key, expired, or issued for another project.
+        """
+        try:
+            import jwt  # imported on first use to keep cryptography out of worker boot
+        except ImportError as e:  # PyJWT/cryptography ship with firebase-admin; may be missing in local dev
+            raise RuntimeError("PyJWT and cryptography are required to verify tokens locally") from e
+        self.start()
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.get_key(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Token signed with unknown key id {kid!r}")
+        claims = jwt.decode(
+            token,
+            key=key,
+            algorithms=["RS256"],
+            audience=project_id,
+            issuer=f"https://securetoken.google.com/{project_id}",
+            options={"require": ["exp", "iat", "sub"]},
+            leeway=5,
+        )
+        sub = claims.get("sub")
+        if not isinstance(sub, str) or not sub or len(sub) > 128:
+            raise jwt.InvalidTokenError("Token has an invalid subject")
+        claims["uid"] = sub
+        return claims
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh(if_older_than=self.retry_after)
+            except Exception as e:
+                # Non-fatal - current keys stay in use; retry after `retry_after` seconds
+                logger.warning(f"Could not refresh Firebase signing keys: {str(e)}")
+            delay = max(self._key_set[1] - self.refresh_margin - self._clock(), self.retry_after)
+            if self._stopped.wait(delay):
+                return
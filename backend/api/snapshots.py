@@ -0,0 +1,62 @@
+# backend/api/snapshots.py
+from django.conf import settings
+from django.core.cache import cache
+
+SESSION_KEY = "multiplayer:snapshot:{session_id}"
+CODE_KEY = "multiplayer:snapshot:code:{join_code}"
+
+
+class SnapshotStore:
+    """
+    Rendered multiplayer session snapshots in the Django cache.
+
+    The views that change a session render it once when the change commits
+    (publish_multiplayer_session) and store (version, data) under the session id
+    and, while the session holds one, its join code, so GetMultiplayerSessionView
+    answers either lookup after reading only the session's version (one indexed
+    integer) instead of rendering the session and its players.
+
+    A snapshot is only served when its version matches that read. Nothing here is
+    atomic: two writers can store their snapshots out of order, and writes made
+    in another process (the reaper's cron run) never reach a per-process
+    LocMemCache. Both just leave a stale snapshot, which the version check
+    refuses; the reader renders from the database and replaces it.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+
+    def _ttl(self):
+        return settings.MULTIPLAYER_SNAPSHOT_CACHE_SECONDS if self.ttl is None else self.ttl
+
+    @staticmethod
+    def _keys(session_id, join_code):
+        keys = [SESSION_KEY.format(session_id=session_id)]
+        if join_code:
+            keys.append(CODE_KEY.format(join_code=join_code))
+        return keys
+
+    def get(self, session_id=None, join_code=None):
+        """Return (version, data) for a session id or join code, or None."""
+        if session_id is not None:
+            return cache.get(SESSION_KEY.format(session_id=session_id))
+        return cache.get(CODE_KEY.format(join_code=join_code))
+
+    def put(self, session_id, join_code, version, data):
+        """Store a session's snapshot unless the one cached under its id is at least as new."""
+        current = cache.get(SESSION_KEY.format(session_id=session_id))
+        if current is not None and current[0] >= version:
+            return False
+        cache.set_many(dict.fromkeys(self._keys(session_id, join_code), (version, data)), self._ttl())
+        return True
+
+    def forget_codes(self, join_codes):
+        """Drop the by-code entries of codes taken away from their sessions (expired or reclaimed)."""
+        cache.delete_many([CODE_KEY.format(join_code=code) for code in join_codes if code])
+
+    def discard(self, sessions):
+        """Drop the snapshots of sessions, given (session_id, join_code) pairs."""
+        cache.delete_many([key for session_id, join_code in sessions for key in self._keys(session_id, join_code)])
+
+
+snapshots = SnapshotStore()
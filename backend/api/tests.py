@@ -2,194 +2,1684 @@
 BrainTease Test Suite
 Tests the backend API functionality including authentication, gameplay, questions, hints, and leaderboard.
 """
-from django.test import TestCase, Client
-from unittest.mock import patch
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from unittest.mock import patch, Mock
 from django.urls import reverse
 import json
+import uuid
 
 # Example constants
 FAKE_FIREBASE_UID = "12345"
 FAKE_USER_EMAIL = "testuser@example.com"
 
 
-class FirebaseAuthMock:
-    """ Mock class to replace Firebase verification """
-    @staticmethod
-    def verify_id_token(token):
-        return {"uid": FAKE_FIREBASE_UID, "email": FAKE_USER_EMAIL}
+def fake_opentdb_response(amount=10):
+    """ OpenTDB-shaped response with `amount` multiple-choice questions """
+    response = Mock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = {
+        "response_code": 0,
+        "results": [
+            {
+                "type": "multiple",
+                "difficulty": "easy",
+                "category": "Science",
+                "question": f"Question {n}?",
+                "correct_answer": f"Right {n}",
+                "incorrect_answers": [f"Wrong {n}a", f"Wrong {n}b", f"Wrong {n}c"],
+            }
+            for n in range(amount)
+        ],
+    }
+    return response
 
 
-class AuthTests(TestCase):
-    """ Tests for user authentication (FR-1, FR-2, FR-3) """
+@override_settings(FIREBASE_AUTH_BACKEND="local")
+class LocalAuthTestCase(TestCase):
+    """ Authenticates requests with tokens minted by the local auth backend """
 
     def setUp(self):
-        self.client = Client()
+        from rest_framework.test import APIClient
+        from api.auth_backends import get_auth_backend
+        from api.display_names import display_names
+        display_names.clear()
+        self.client = APIClient()
+        token = get_auth_backend().mint_token(FAKE_FIREBASE_UID, name="tester", email=FAKE_USER_EMAIL)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
 
-    @patch("api.firebase_auth.auth.verify_id_token", FirebaseAuthMock.verify_id_token)
-    def test_google_login(self):
-        response = self.client.post(
-            reverse("api:login"),
-            data=json.dumps({"token": "fake_token"}),
-            content_type="application/json"
-        )
+    @patch("api.views.requests.get", return_value=fake_opentdb_response())
+    def start_game(self, mock_get, difficulty="easy"):
+        return self.client.post(reverse("start-game"), {"difficulty": difficulty}, format="json")
+
+
+class AuthTests(LocalAuthTestCase):
+    """ Tests for user authentication (FR-1, FR-2, FR-3) """
+
+    def test_local_token_authenticates(self):
+        response = self.client.post(reverse("update-display-name"), {"display_name": "Tester"}, format="json")
         self.assertEqual(response.status_code, 200)
-        data = response.json()
-        self.assertIn("uid", data)
-        self.assertEqual(data["uid"], FAKE_FIREBASE_UID)
 
+    def test_missing_token_rejected(self):
+        self.client.credentials()
+        response = self.client.post(reverse("update-display-name"), {"display_name": "Tester"}, format="json")
+        self.assertIn(response.status_code, [401, 403])
 
-class GameplayTests(TestCase):
-    """ Tests for gameplay functionality (FR-4 to FR-10) """
+    def test_token_signed_by_another_key_rejected(self):
+        from api.local_firebase import LocalFirebase
+        forged = LocalFirebase().mint_token(FAKE_FIREBASE_UID)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {forged}")
+        response = self.client.post(reverse("update-display-name"), {"display_name": "Tester"}, format="json")
+        self.assertIn(response.status_code, [401, 403])
 
-    def setUp(self):
-        self.client = Client()
-        # Login first
-        self.client.post(
-            reverse("api:login"),
-            data=json.dumps({"token": "fake_token"}),
-            content_type="application/json"
-        )
+    @patch("questions.views.fetch_categories", return_value=[])
+    def test_public_endpoints_skip_token_verification(self, mock_categories):
+        from api.auth_backends import get_auth_backend
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer not-a-valid-token")
+        with patch.object(get_auth_backend(), "verify_id_token", side_effect=AssertionError("verified")) as verify:
+            for url in (reverse("leaderboard"), reverse("questions"), reverse("categories")):
+                self.assertEqual(self.client.get(url).status_code, 200, url)
+        verify.assert_not_called()
+
+    def test_mint_local_tokens_command(self):
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        from api import auth_backends
+
+        key_path = os.path.join(tempfile.mkdtemp(), "local-key.pem")
+        out = StringIO()
+        with override_settings(FIREBASE_LOCAL_KEY_PATH=key_path), patch.dict(auth_backends._backends, clear=True):
+            call_command("mint_local_tokens", count=3, stdout=out)
+            tokens = [json.loads(line) for line in out.getvalue().splitlines()]
+            self.assertEqual(len(tokens), 3)
+            # A fresh backend (another process) loads the same key and accepts the tokens
+            auth_backends._backends.clear()
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens[2]['token']}")
+            response = self.client.post(reverse("update-display-name"), {"display_name": "Tester"}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+
+class GameplayTests(LocalAuthTestCase):
+    """ Tests for gameplay functionality (FR-4 to FR-10) """
 
     def test_select_difficulty(self):
-        response = self.client.post(reverse("api:start_game"), {"difficulty": "Easy"})
-        self.assertIn(response.status_code, [200, 201])
+        response = self.start_game()
+        self.assertEqual(response.status_code, 201)
         data = response.json()
-        self.assertIn("questions", data)
         self.assertIsInstance(data["questions"], list)
+        self.assertEqual(len(data["questions"]), 10)
+        self.assertIn(data["questions"][0]["correct_answer"], data["questions"][0]["shuffled_answers"])
 
-    def test_answer_question(self):
-        game_resp = self.client.post(reverse("api:start_game"), {"difficulty": "Easy"})
-        questions = game_resp.json()["questions"]
-        question_id = questions[0]["id"]
-
-        response = self.client.post(
-            reverse("api:answer_question"),
-            {"question_id": question_id, "answer": "A"}
-        )
-        self.assertEqual(response.status_code, 200)
-        self.assertIn("correct", response.json())
+    def test_invalid_difficulty(self):
+        response = self.start_game(difficulty="impossible")
+        self.assertEqual(response.status_code, 400)
 
 
 class QuestionHandlingTests(TestCase):
     """ Tests for question fetching and mapping (FR-17 to FR-20) """
 
     def setUp(self):
+        from questions.models import Question
         self.client = Client()
+        Question.objects.create(text="Capital of France?", answer="Paris", difficulty="easy", category="Geography")
+        Question.objects.create(text="2 ** 10?", answer="1024", difficulty="hard", category="Math")
 
-    @patch("api.views.fetch_trivia_questions")
-    def test_fetch_questions_success(self, mock_fetch):
-        mock_fetch.return_value = [
-            {"id": 1, "question": "Capital of France?", "correct_answer": "Paris", "category": "Geography"}
-        ]
-        response = self.client.get(reverse("api:get_questions"))
+    def test_questions_filtered_by_difficulty(self):
+        response = self.client.get(reverse("questions"), {"difficulty": "easy"})
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = response.json()["questions"]
         self.assertEqual(len(data), 1)
-        self.assertEqual(data[0]["correct_answer"], "Paris")
+        self.assertEqual(data[0]["answer"], "Paris")
 
-    @patch("api.views.fetch_trivia_questions")
-    def test_fallback_questions_on_api_fail(self, mock_fetch):
-        mock_fetch.side_effect = Exception("API down")
-        response = self.client.get(reverse("api:get_questions"))
-        self.assertEqual(response.status_code, 200)
-        data = response.json()
-        self.assertTrue(len(data) > 0)
+    def test_limit(self):
+        response = self.client.get(reverse("questions"), {"limit": 1})
+        self.assertEqual(len(response.json()["questions"]), 1)
 
 
-class HintTests(TestCase):
+class HintTests(LocalAuthTestCase):
     """ Tests for hints & clues (FR-21, FR-22) """
 
     def setUp(self):
-        self.client = Client()
-        # Login and start game
-        self.client.post(
-            reverse("api:login"),
-            data=json.dumps({"token": "fake_token"}),
-            content_type="application/json"
-        )
-        game_resp = self.client.post(reverse("api:start_game"), {"difficulty": "Easy"})
-        self.session_id = game_resp.json()["session_id"]
+        super().setUp()
+        self.session_id = self.start_game().json()["session_id"]
 
     def test_request_hint_limit(self):
-        for i in range(3):
-            response = self.client.get(reverse("api:get_hint", args=[self.session_id]), {"question_id": 1})
+        payload = {"question_index": 0}
+        for i in range(2):  # 10 questions -> 2 hints
+            response = self.client.post(reverse("use-hint", args=[self.session_id]), payload, format="json")
             self.assertEqual(response.status_code, 200)
-            self.assertIn("hint", response.json())
+            self.assertIn("removed_index", response.json())
 
-        response = self.client.get(reverse("api:get_hint", args=[self.session_id]), {"question_id": 1})
+        response = self.client.post(reverse("use-hint", args=[self.session_id]), payload, format="json")
         self.assertEqual(response.status_code, 400)  # Exceeded hint limit
 
 
-class LeaderboardTests(TestCase):
-    """ Tests for leaderboard functionality (FR-24, FR-26, FR-27) """
+class SessionTokenTests(LocalAuthTestCase):
+    """ Tests for signed game-session tokens and conditional hint updates """
+
+    payload = {"question_index": 0}
 
     def setUp(self):
-        self.client = Client()
-        # Login first
-        self.client.post(
-            reverse("api:login"),
-            data=json.dumps({"token": "fake_token"}),
-            content_type="application/json"
+        super().setUp()
+        game = self.start_game().json()
+        self.session_id, self.session_token = game["session_id"], game["session_token"]
+
+    def use_hint(self, token=None, session_id=None):
+        return self.client.post(
+            reverse("use-hint", args=[session_id or self.session_id]),
+            {**self.payload, "session_token": token or self.session_token},
+            format="json",
+        )
+
+    def test_hint_with_token_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.use_hint()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["hints_used"], response.json()["hints_remaining"]), (1, 1))
+
+    def test_hint_limit_enforced_by_conditional_update(self):
+        from api.models import GameSession
+        with patch("api.models.supports_update_returning", return_value=False):
+            self.assertEqual(GameSession.consume_hint(self.session_id, FAKE_FIREBASE_UID), (1, 2))
+        self.assertEqual(GameSession.consume_hint(self.session_id, FAKE_FIREBASE_UID), (2, 2))
+        self.assertIsNone(GameSession.consume_hint(self.session_id, FAKE_FIREBASE_UID))
+        self.assertIsNone(GameSession.consume_hint(self.session_id, "someone-else"))
+        self.assertEqual(GameSession.objects.get(id=self.session_id).hints_used, 2)
+        self.assertEqual(self.use_hint().json()["error"], "No hints remaining")
+
+    def test_update_returning_is_gated_on_vendor_not_insert_feature(self):
+        from django.db import connection
+        from api.models import supports_update_returning
+        self.assertTrue(supports_update_returning())  # SQLite 3.35+ here
+        with patch.object(connection, "vendor", "mysql"), \
+                patch.object(connection.features, "can_return_columns_from_insert", True):
+            self.assertFalse(supports_update_returning())  # MariaDB: INSERT ... RETURNING only
+
+    def test_rejects_tampered_foreign_and_expired_tokens(self):
+        from api.models import GameSession
+        from api.session_tokens import issue_session_token
+        other = GameSession.objects.create(user_id=FAKE_FIREBASE_UID, difficulty="easy", categories=[], score=0, allowed_hints=2)
+        expired = issue_session_token(GameSession.objects.get(id=self.session_id), ttl=-1)
+        for token in (self.session_token[:-2] + "xx", issue_session_token(other), expired):
+            with self.assertNumQueries(0):
+                response = self.use_hint(token)
+            self.assertEqual(response.status_code, 403)
+        self.assertEqual(GameSession.objects.get(id=self.session_id).hints_used, 0)
+
+    def test_submit_checks_session_token(self):
+        other_token = self.start_game().json()["session_token"]
+        score = {"score": 10, "difficulty": "easy", "session_id": self.session_id}
+        response = self.client.post(reverse("submit-score"), {**score, "session_token": other_token}, format="json")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(reverse("submit-score"), {**score, "session_token": self.session_token}, format="json")
+        self.assertEqual(response.status_code, 201)
+
+
+class AnswerKeyTests(LocalAuthTestCase):
+    """ Tests for server-held answer keys and hints by question index """
+
+    def setUp(self):
+        from api.answer_keys import answer_keys
+        super().setUp()
+        game = self.start_game().json()
+        self.session_id, self.questions = game["session_id"], game["questions"]
+        self.answer_keys = answer_keys
+
+    def hint(self, question_index, eliminated=0):
+        return self.client.post(
+            reverse("use-hint", args=[self.session_id]),
+            {"question_index": question_index, "eliminated": eliminated},
+            format="json",
         )
 
+    def test_elimination_order_removes_each_wrong_answer_once(self):
+        from api.models import GameSession
+        GameSession.objects.filter(id=self.session_id).update(allowed_hints=3)
+        question = self.questions[4]
+        removed = [question["shuffled_answers"][self.hint(4, n).json()["removed_index"]] for n in range(3)]
+        self.assertCountEqual(removed, question["incorrect_answers"])
+        self.assertEqual(self.hint(4, 3).status_code, 400)  # nothing left to remove, no hint spent
+        self.assertEqual(GameSession.objects.get(id=self.session_id).hints_used, 3)
+
+    def test_hint_needs_no_session_read_when_cached(self):
+        with self.assertNumQueries(1):  # the conditional UPDATE only
+            self.assertEqual(self.hint(0).status_code, 200)
+
+    def test_falls_back_to_database_after_eviction(self):
+        from api.models import GameSession
+        self.answer_keys.discard(self.session_id)
+        stored = GameSession.objects.get(id=self.session_id).answer_key
+        self.assertEqual(len(stored), len(self.questions))
+        with self.assertNumQueries(2):  # answer key read + conditional UPDATE
+            response = self.hint(2)
+        self.assertEqual(response.json()["removed_index"], stored[2][1][0])
+        with self.assertNumQueries(1):  # re-cached
+            self.hint(3)
+
+    def test_invalid_question_index_does_not_spend_hint(self):
+        from api.models import GameSession
+        self.assertEqual(self.hint(99).status_code, 400)
+        self.assertEqual(self.client.post(reverse("use-hint", args=[self.session_id]), {}, format="json").status_code, 400)
+        self.assertEqual(GameSession.objects.get(id=self.session_id).hints_used, 0)
+
+    def test_hint_after_submit_score_is_rejected(self):
+        from api.models import GameSession
+        self.assertEqual(self.hint(0).status_code, 200)
+        response = self.client.post(
+            reverse("submit-score"), {"score": 50, "difficulty": "easy", "session_id": self.session_id}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.hint(1)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Game session has already finished")
+        with patch("api.models.supports_update_returning", return_value=False):
+            self.assertIsNone(GameSession.consume_hint(self.session_id, FAKE_FIREBASE_UID))
+        self.assertEqual(GameSession.objects.get(id=self.session_id).hints_used, 1)
+
+    def test_session_without_answer_key(self):
+        from api.models import GameSession
+        legacy = GameSession.objects.create(user_id=FAKE_FIREBASE_UID, difficulty="easy", categories=[], score=0, allowed_hints=2)
+        response = self.client.post(reverse("use-hint", args=[legacy.id]), {"question_index": 0}, format="json")
+        self.assertEqual(response.json()["error"], "Hints are not available for this game session")
+        response = self.client.post(reverse("use-hint", args=[uuid.uuid4()]), {"question_index": 0}, format="json")
+        self.assertEqual(response.status_code, 404)
+
+
+class LeaderboardTests(LocalAuthTestCase):
+    """ Tests for leaderboard functionality (FR-24, FR-26, FR-27) """
+
     def test_store_score(self):
-        response = self.client.post(reverse("api:submit_score"), {"uid": FAKE_FIREBASE_UID, "score": 100})
-        self.assertIn(response.status_code, [200, 201])
-        self.assertIn("success", response.json())
+        response = self.client.post(reverse("submit-score"), {"score": 100, "difficulty": "easy"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertIn("score_id", response.json())
+        self.assertTrue(response.json()["is_top_5"])
 
     def test_global_leaderboard(self):
-        response = self.client.get(reverse("api:leaderboard"))
+        response = self.client.get(reverse("leaderboard"))
         self.assertEqual(response.status_code, 200)
         data = response.json()["leaderboard"]  # Extract list
         self.assertIsInstance(data, list)
 
 
-class SystemTests(TestCase):
+class SystemTests(LocalAuthTestCase):
     """ End-to-end / integration tests """
 
+    def test_full_game_flow(self):
+        # Start game
+        game_response = self.start_game()
+        self.assertEqual(game_response.status_code, 201)
+        session_id = game_response.json()["session_id"]
+        question = game_response.json()["questions"][0]
+
+        # Request hint (optional)
+        hint_response = self.client.post(
+            reverse("use-hint", args=[session_id]),
+            {"question_index": 0},
+            format="json"
+        )
+        self.assertEqual(hint_response.status_code, 200)
+        removed = question["shuffled_answers"][hint_response.json()["removed_index"]]
+        self.assertIn(removed, question["incorrect_answers"])
+
+        # Submit score
+        score_response = self.client.post(
+            reverse("submit-score"),
+            {"score": 50, "difficulty": "easy", "session_id": session_id},
+            format="json"
+        )
+        self.assertEqual(score_response.status_code, 201)
+
+        # Check leaderboard - the name comes from the (local) user record
+        leaderboard_response = self.client.get(reverse("leaderboard"))
+        self.assertEqual(leaderboard_response.status_code, 200)
+        leaderboard_data = leaderboard_response.json()["leaderboard"]
+        self.assertEqual([(e["user_display"], e["score"]) for e in leaderboard_data], [("tester", 50)])
+
+
+class BestPerUserLeaderboardTests(TestCase):
+    """ Tests for the best_per_user leaderboard mode """
+
     def setUp(self):
+        from api.display_names import display_names
         self.client = Client()
+        display_names.clear()
 
-    @patch("api.firebase_auth.auth.verify_id_token", FirebaseAuthMock.verify_id_token)
-    @patch("api.views.fetch_trivia_questions")
-    def test_full_game_flow(self, mock_fetch):
-        mock_fetch.return_value = [
-            {"id": 1, "question": "1+1=?", "correct_answer": "2", "category": "Math"}
-        ]
+    def _submit(self, user_id, score, difficulty="easy"):
+        from api.models import ScoreEntry, BestScore, UserProfile
+        UserProfile.objects.get_or_create(uid=user_id, defaults={"display_name": user_id, "source": "user"})
+        entry = ScoreEntry.objects.create(user_id=user_id, difficulty=difficulty, score=score)
+        BestScore.record(user_id, difficulty, score, entry.id, entry.created_at)
+        return entry
 
-        # Login
-        login_response = self.client.post(
-            reverse("api:login"),
-            json.dumps({"token": "fake_token"}),
-            content_type="application/json"
+    def test_each_user_ranked_once(self):
+        self._submit("alice", 5)
+        self._submit("alice", 9)
+        self._submit("alice", 7)
+        self._submit("bob", 8)
+
+        response = self.client.get(reverse("leaderboard"), {"mode": "best_per_user"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["total_entries"], 2)
+        self.assertEqual(
+            [(e["user_display"], e["score"]) for e in data["leaderboard"]],
+            [("alice", 9), ("bob", 8)]
         )
-        self.assertEqual(login_response.status_code, 200)
-        self.assertEqual(login_response.json()["uid"], FAKE_FIREBASE_UID)
 
-        # Start game
-        game_response = self.client.post(reverse("api:start_game"), {"difficulty": "Easy"})
-        self.assertEqual(game_response.status_code, 200)
-        session_id = game_response.json()["session_id"]
-        question_id = game_response.json()["questions"][0]["id"]
+    def test_lower_score_does_not_replace_best(self):
+        from api.models import BestScore
+        best = self._submit("alice", 9)
+        self._submit("alice", 3)
+        self._submit("alice", 9)  # ties keep the earlier score
+
+        rows = BestScore.objects.filter(user_id="alice")
+        self.assertEqual(rows.count(), 6)  # 3 timeframes x (difficulty, all)
+        self.assertTrue(all(row.score_id == best.id for row in rows))
+
+    def test_score_that_is_not_a_personal_best_writes_nothing(self):
+        import uuid
+        from django.utils import timezone
+        from api.models import BestScore
+        self._submit("alice", 9)
+        with self.assertNumQueries(1):  # reads the six records, writes none
+            BestScore.record("alice", "easy", 4, uuid.uuid4(), timezone.now())
+        BestScore.record("alice", "hard", 7, uuid.uuid4(), timezone.now())  # a first hard score, below the overall best
+        self.assertEqual(BestScore.objects.filter(user_id="alice", score=9).count(), 6)
+        self.assertEqual(BestScore.objects.filter(user_id="alice", difficulty_scope="hard", score=7).count(), 3)
+
+    def test_difficulty_scope(self):
+        self._submit("alice", 4, difficulty="easy")
+        self._submit("alice", 6, difficulty="hard")
+
+        easy = self.client.get(reverse("leaderboard"), {"mode": "best_per_user", "difficulty": "easy"}).json()
+        overall = self.client.get(reverse("leaderboard"), {"mode": "best_per_user"}).json()
+        self.assertEqual(easy["leaderboard"][0]["score"], 4)
+        self.assertEqual(overall["leaderboard"][0]["score"], 6)
+        self.assertEqual(overall["leaderboard"][0]["difficulty"], "hard")
 
-        # Answer question
-        answer_response = self.client.post(
-            reverse("api:answer_question"),
-            {"question_id": question_id, "answer": "2"}
+    def test_invalid_mode(self):
+        response = self.client.get(reverse("leaderboard"), {"mode": "fastest"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ScoreLedgerTests(TestCase):
+    """ Tests for score submission into the single score ledger """
+
+    def setUp(self):
+        from types import SimpleNamespace
+        from rest_framework.test import APIClient
+        from api.display_names import display_names
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=SimpleNamespace(is_authenticated=True, uid=FAKE_FIREBASE_UID, display_name="tester")
         )
-        self.assertEqual(answer_response.status_code, 200)
-        self.assertTrue(answer_response.json()["correct"])
+        display_names.clear()
 
-        # Request hint (optional)
-        hint_response = self.client.get(reverse("api:get_hint", args=[session_id]), {"question_id": question_id})
-        self.assertEqual(hint_response.status_code, 200)
+    def test_minimal_and_detailed_scores_share_one_leaderboard(self):
+        minimal = self.client.post(reverse("submit-score"), {"score": 3, "difficulty": "easy"}, format="json")
+        detailed = self.client.post(
+            reverse("submit-score"),
+            {"score": 7, "difficulty": "easy", "correct_count": 7, "total_questions": 10, "categories": ["9"]},
+            format="json"
+        )
+        self.assertEqual(minimal.status_code, 201)
+        self.assertEqual(detailed.status_code, 201)
+        self.assertEqual(detailed.json()["rank"], 1)
+        self.assertTrue(detailed.json()["is_top_5"])
 
-        # Submit score
-        score_response = self.client.post(reverse("api:submit_score"), {"uid": FAKE_FIREBASE_UID, "score": 50})
-        self.assertIn(score_response.status_code, [200, 201])
+        data = self.client.get(reverse("leaderboard"), {"difficulty": "easy"}).json()
+        self.assertEqual(data["total_entries"], 2)
+        self.assertEqual([e["score"] for e in data["leaderboard"]], [7, 3])
+        self.assertEqual(data["leaderboard"][0]["correct_count"], 7)
+        self.assertIsNone(data["leaderboard"][1]["correct_count"])
 
-        # Check leaderboard
-        leaderboard_response = self.client.get(reverse("api:leaderboard"))
-        self.assertEqual(leaderboard_response.status_code, 200)
-        leaderboard_data = leaderboard_response.json()["leaderboard"]
-        self.assertIsInstance(leaderboard_data, list)
+
+    def test_submit_finalizes_started_session_once(self):
+        from api.models import GameSession, ScoreEntry
+        session = GameSession.objects.create(
+            user_id=FAKE_FIREBASE_UID, difficulty="easy", categories=[], score=0, total_questions=10
+        )
+        payload = {"score": 6, "difficulty": "easy", "session_id": str(session.id)}
+
+        first = self.client.post(reverse("submit-score"), payload, format="json")
+        second = self.client.post(reverse("submit-score"), payload, format="json")
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 409)
+
+        session.refresh_from_db()
+        self.assertEqual((session.status, session.score), ("finished", 6))
+        self.assertEqual(GameSession.objects.count(), 1)
+        self.assertEqual(ScoreEntry.objects.get().session_id, session.id)
+
+    def test_submit_for_another_users_session(self):
+        from api.models import GameSession
+        session = GameSession.objects.create(
+            user_id="someone-else", difficulty="easy", categories=[], score=0, total_questions=10
+        )
+        response = self.client.post(
+            reverse("submit-score"), {"score": 6, "difficulty": "easy", "session_id": str(session.id)}, format="json"
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+    def test_category_leaderboard(self):
+        self.client.post(reverse("submit-score"), {"score": 5, "difficulty": "easy", "categories": ["Science"]}, format="json")
+        self.client.post(reverse("submit-score"), {"score": 8, "difficulty": "easy", "categories": ["History"]}, format="json")
+        self.client.post(reverse("submit-score"), {"score": 4, "difficulty": "hard", "categories": ["Science", "History"]}, format="json")
+
+        science = self.client.get(reverse("leaderboard"), {"category": "Science"}).json()
+        self.assertEqual(science["total_entries"], 2)
+        self.assertEqual([e["score"] for e in science["leaderboard"]], [5, 4])
+
+        hard_history = self.client.get(reverse("leaderboard"), {"category": "History", "difficulty": "hard"}).json()
+        self.assertEqual([e["score"] for e in hard_history["leaderboard"]], [4])
+
+    def test_category_leaderboard_by_opentdb_id(self):
+        # The web client submits the numeric OpenTDB ids it started the game with
+        self.client.post(reverse("submit-score"), {"score": 6, "difficulty": "easy", "categories": [23, 9]}, format="json")
+        self.client.post(reverse("submit-score"), {"score": 3, "difficulty": "easy", "categories": [9]}, format="json")
+
+        history = self.client.get(reverse("leaderboard"), {"category": "23"}).json()
+        self.assertEqual([e["score"] for e in history["leaderboard"]], [6])
+        self.assertEqual(self.client.get(reverse("leaderboard"), {"category": "9"}).json()["total_entries"], 2)
+        self.assertEqual(self.client.get(reverse("leaderboard"), {"category": "History"}).json()["total_entries"], 0)
+
+    def test_rename_writes_one_profile_row(self):
+        from api.display_names import display_names
+        from api.models import UserProfile
+        for score in (3, 5, 7):
+            self.client.post(reverse("submit-score"), {"score": score, "difficulty": "easy"}, format="json")
+
+        with self.assertNumQueries(1):  # one upsert, however many scores exist
+            response = self.client.post(reverse("update-display-name"), {"display_name": "Renamed"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(UserProfile.objects.get(uid=FAKE_FIREBASE_UID).source, "user")
+
+        display_names.clear()  # another worker: resolves from the profile table
+        for mode in ("all", "best_per_user"):
+            data = self.client.get(reverse("leaderboard"), {"mode": mode}).json()
+            self.assertEqual({e["user_display"] for e in data["leaderboard"]}, {"Renamed"})
+
+
+class TopKCacheTests(TestCase):
+    """ Tests for the cached top-5 qualification check """
+
+    def setUp(self):
+        from django.core.cache import cache
+        from api.leaderboard import top_k_cache
+        cache.clear()
+        top_k_cache.invalidate()
+        self.top_k = top_k_cache
+
+    def _entry(self, score, difficulty="easy"):
+        from api.models import ScoreEntry
+        return ScoreEntry.objects.create(user_id="u", difficulty=difficulty, score=score)
+
+    def test_low_score_ruled_out_without_query(self):
+        for score in (10, 9, 8, 7, 6):
+            self.top_k.rank_of(self._entry(score))
+        low = self._entry(6)  # ties with the 5th best but was submitted later
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.top_k.rank_of(low))
+
+    def test_high_score_ranked_from_database(self):
+        for score in (10, 9, 8, 7, 6):
+            self.top_k.rank_of(self._entry(score))
+        self.assertEqual(self.top_k.rank_of(self._entry(9)), 3)
+        self.assertEqual(self.top_k.threshold("easy"), 7)
+
+    def test_placing_score_is_ranked_from_the_heap_without_query(self):
+        for score in (10, 9, 8, 7, 6):
+            self.top_k.rank_of(self._entry(score))
+        entries = [self._entry(9), self._entry(12)]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.top_k.rank_of(entries[0]), 3)
+            self.assertEqual(self.top_k.rank_of(entries[1]), 1)
+        self.assertEqual(self.top_k.threshold("easy"), 8)
+        self.assertEqual(self.top_k.rank_of(self._entry(8)), None)
+
+    def test_heap_reloads_after_another_worker_places(self):
+        from api.leaderboard import TopKCache
+        other_worker = TopKCache()
+        for score in (10, 9, 8, 7, 6):
+            self.top_k.rank_of(self._entry(score))
+        other_worker.rank_of(self._entry(1))  # loads its own heap
+        other_worker.rank_of(self._entry(20))  # places there, raising the shared threshold to 7
+        entry = self._entry(15)
+        with self.assertNumQueries(1):  # this heap has not seen the 20: reloaded
+            self.assertEqual(self.top_k.rank_of(entry), 2)
+
+    def test_stale_threshold_from_another_worker_is_still_correct(self):
+        from api.leaderboard import TopKCache
+        other_worker = TopKCache()
+        for score in (10, 9, 8, 7, 6):
+            other_worker.rank_of(self._entry(score))
+        # This worker has no local heap but picks up the shared lower bound
+        low = self._entry(5)
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.top_k.rank_of(low))
+        self.assertEqual(self.top_k.rank_of(self._entry(11)), 1)
+
+
+class VerifiedTokenCacheTests(TestCase):
+    """ Tests for the verified Firebase ID token cache """
+
+    def setUp(self):
+        from api.token_cache import VerifiedTokenCache
+        self.now = 1000.0
+        self.cache = VerifiedTokenCache(max_entries=2, clock=lambda: self.now)
+
+    def test_hit_until_token_expires(self):
+        self.cache.put("token-a", {"uid": "a", "exp": 1060})
+        self.assertEqual(self.cache.get("token-a")["uid"], "a")
+        self.now = 1060
+        self.assertIsNone(self.cache.get("token-a"))
+        self.assertEqual(self.cache.stats()["hit_rate"], 0.5)
+
+    def test_least_recently_used_entry_evicted(self):
+        self.cache.put("token-a", {"uid": "a", "exp": 2000})
+        self.cache.put("token-b", {"uid": "b", "exp": 2000})
+        self.cache.get("token-a")
+        self.cache.put("token-c", {"uid": "c", "exp": 2000})
+        self.assertIsNone(self.cache.get("token-b"))
+        self.assertIsNotNone(self.cache.get("token-a"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_revocation_interval_shortens_lifetime(self):
+        from api.token_cache import VerifiedTokenCache
+        cache = VerifiedTokenCache(revocation_check_interval=30, clock=lambda: self.now)
+        cache.put("token-a", {"uid": "a", "exp": 2000})
+        self.now = 1030
+        self.assertIsNone(cache.get("token-a"))
+
+
+class DisplayNameDirectoryTests(TestCase):
+    """ Tests for batched display name resolution """
+
+    def _fake_backend(self, known):
+        from types import SimpleNamespace
+        calls = []
+
+        def get_display_names(uids):
+            calls.append(list(uids))
+            return {u: known[u] for u in uids if u in known}
+
+        fake = SimpleNamespace(is_ready=lambda: True, get_display_names=get_display_names)
+        return fake, calls
+
+    def test_resolves_in_batches_of_100_and_persists(self):
+        from api.display_names import DisplayNameDirectory
+        from api.models import UserProfile
+        uids = [f"user-{i}" for i in range(150)]
+        fake, calls = self._fake_backend({u: u.upper() for u in uids})
+        directory = DisplayNameDirectory()
+        with patch("api.display_names.get_auth_backend", return_value=fake):
+            names = directory.resolve_many(uids)
+            self.assertEqual([len(c) for c in calls], [100, 50])
+            self.assertEqual(names["user-7"], "USER-7")
+            with self.assertNumQueries(0):
+                directory.resolve_many(uids)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(UserProfile.objects.count(), 150)
+
+        # A fresh process reads the table instead of calling Firebase
+        with patch("api.display_names.get_auth_backend", return_value=fake):
+            self.assertEqual(DisplayNameDirectory().resolve("user-3"), "USER-3")
+        self.assertEqual(len(calls), 2)
+
+    def test_unknown_users_are_negatively_cached(self):
+        from api.display_names import DisplayNameDirectory
+        fake, calls = self._fake_backend({"known": "Known"})
+        directory = DisplayNameDirectory()
+        with patch("api.display_names.get_auth_backend", return_value=fake):
+            self.assertEqual(directory.resolve_many(["known", "ghost"]), {"known": "Known", "ghost": None})
+            self.assertIsNone(directory.resolve("ghost"))
+        self.assertEqual(len(calls), 1)
+
+    def test_firebase_failure_is_not_cached(self):
+        from types import SimpleNamespace
+        from api.display_names import DisplayNameDirectory
+
+        def get_display_names(uids):
+            raise RuntimeError("unavailable")
+
+        fake = SimpleNamespace(is_ready=lambda: True, get_display_names=get_display_names)
+        directory = DisplayNameDirectory()
+        with patch("api.display_names.get_auth_backend", return_value=fake):
+            self.assertIsNone(directory.resolve("abc"))
+        self.assertFalse(directory._lookup("abc")[0])
+
+    def test_firebase_refresh_keeps_user_chosen_name(self):
+        from api.display_names import DisplayNameDirectory
+        from api.models import UserProfile
+        fake, calls = self._fake_backend({"abc": "Firebase Name"})
+        directory = DisplayNameDirectory(ttl=0)
+        with patch("api.display_names.get_auth_backend", return_value=fake):
+            directory.rename("abc", "Chosen")
+            directory.clear()
+            self.assertEqual(directory.resolve("abc"), "Chosen")
+        self.assertEqual(calls, [])
+        self.assertEqual(UserProfile.objects.get(uid="abc").display_name, "Chosen")
+
+    def test_rename_during_firebase_fetch_is_not_overwritten(self):
+        from types import SimpleNamespace
+        from api.display_names import DisplayNameDirectory
+        from api.models import UserProfile
+        directory = DisplayNameDirectory()
+
+        def get_display_names(uids):
+            directory.rename("abc", "Chosen")  # lands while Firebase is being called
+            return {"abc": "Firebase Name", "new": "New"}
+
+        fake = SimpleNamespace(is_ready=lambda: True, get_display_names=get_display_names)
+        with patch("api.display_names.get_auth_backend", return_value=fake):
+            self.assertEqual(directory.resolve_many(["abc", "new"]), {"abc": "Chosen", "new": "New"})
+        self.assertEqual(
+            dict(UserProfile.objects.values_list("uid", "source")), {"abc": "user", "new": "firebase"}
+        )
+        self.assertEqual(UserProfile.objects.get(uid="abc").display_name, "Chosen")
+
+
+class TokenDisplayNameTests(LocalAuthTestCase):
+    """ Tests for display names taken from the token's name claim """
+
+    def test_name_claim_is_stored_and_spares_firebase_lookups(self):
+        from api.display_names import display_names
+        from api.models import UserProfile
+        fake = Mock(is_ready=lambda: True, get_display_names=Mock(side_effect=AssertionError("called Firebase")))
+        with patch("api.display_names.get_auth_backend", return_value=fake):
+            response = self.client.post(reverse("submit-score"), {"score": 5, "difficulty": "easy"}, format="json")
+            self.assertEqual(response.json()["user_display_name"], "tester")
+            display_names.clear()  # another worker reads the row the token wrote
+            self.assertEqual(display_names.resolve(FAKE_FIREBASE_UID), "tester")
+        self.assertEqual(UserProfile.objects.get(uid=FAKE_FIREBASE_UID).source, "token")
+
+    def test_authenticate_makes_no_queries_on_a_warm_token_cache(self):
+        from rest_framework.test import APIRequestFactory
+        from api.display_names import display_names
+        from api.firebase_auth import FirebaseAuthentication
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=self.client._credentials["HTTP_AUTHORIZATION"])
+        FirebaseAuthentication().authenticate(request)  # warms the token cache
+        display_names.clear()
+        with self.assertNumQueries(0):
+            user, _ = FirebaseAuthentication().authenticate(request)
+        self.assertEqual(user.display_name, "tester")
+
+    def test_user_chosen_name_wins_over_the_name_claim(self):
+        from api.display_names import display_names
+        from api.models import UserProfile
+        self.client.post(reverse("update-display-name"), {"display_name": "Chosen"}, format="json")
+        display_names.clear()
+        response = self.client.post(reverse("submit-score"), {"score": 5, "difficulty": "easy"}, format="json")
+        self.assertEqual(response.json()["user_display_name"], "Chosen")
+        self.assertEqual(UserProfile.objects.get(uid=FAKE_FIREBASE_UID).display_name, "Chosen")
+
+
+class SigningKeyManagerTests(TestCase):
+    """ Tests for in-memory Firebase signing keys refreshed ahead of expiry """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from api.local_firebase import LocalFirebase
+        cls.firebase = LocalFirebase(project_id="test-project")
+
+    def _manager(self, **kwargs):
+        from api.signing_keys import SigningKeyManager
+        fetches = []
+
+        def fetch():
+            fetches.append(1)
+            return self.firebase.certificates()
+
+        manager = SigningKeyManager(fetch, **kwargs)
+        self.addCleanup(manager.stop)
+        return manager, fetches
+
+    def _wait_for(self, condition, timeout=3):
+        import time
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def test_verifies_against_keys_fetched_once(self):
+        manager, fetches = self._manager()
+        for i in range(20):
+            claims = manager.verify(self.firebase.mint_token(f"user-{i}", name="Tester"), "test-project")
+            self.assertEqual(claims["uid"], f"user-{i}")
+        self.assertEqual(len(fetches), 1)
+
+    def test_rejects_wrong_project_and_expired_tokens(self):
+        import jwt
+        manager, _ = self._manager()
+        with self.assertRaises(jwt.InvalidTokenError):
+            manager.verify(self.firebase.mint_token("abc"), "other-project")
+        with self.assertRaises(jwt.InvalidTokenError):
+            manager.verify(self.firebase.mint_token("abc", lifetime=-60), "test-project")
+
+    def test_unknown_key_id_triggers_one_refresh(self):
+        import time
+        now = [time.time()]
+        manager, fetches = self._manager(retry_after=30, clock=lambda: now[0])
+        manager.start()
+        self._wait_for(lambda: len(fetches) == 1)  # prefetch on start
+        manager.verify(self.firebase.mint_token("abc"), "test-project")
+        now[0] += 31
+        self.firebase.rotate()
+        manager.verify(self.firebase.mint_token("abc"), "test-project")
+        manager.verify(self.firebase.mint_token("def"), "test-project")
+        self.assertEqual(len(fetches), 2)
+
+    def test_refreshes_in_background_before_expiry(self):
+        from api.local_firebase import LocalFirebase
+        self.firebase = LocalFirebase(project_id="test-project", cert_max_age=1)
+        manager, fetches = self._manager(refresh_margin=0.9, retry_after=0.05)
+        manager.start()
+        self._wait_for(lambda: len(fetches) >= 3)
+
+    def test_failed_refresh_keeps_previous_keys(self):
+        import time
+        from api.signing_keys import SigningKeyManager
+        certs = self.firebase.certificates()[0]
+        responses = [(certs, 0)]
+
+        def fetch():
+            if responses:
+                return responses.pop()
+            raise ConnectionError("offline")
+
+        now = [time.time()]
+        manager = SigningKeyManager(fetch, retry_after=30, clock=lambda: now[0])
+        self.addCleanup(manager.stop)
+        manager.start()
+        self._wait_for(lambda: not responses)
+        now[0] += 31  # keys expired and due for a retry, which fails
+        claims = manager.verify(self.firebase.mint_token("abc"), "test-project")
+        self.assertEqual(claims["uid"], "abc")
+
+
+    def test_verify_never_waits_on_a_fetch_in_flight(self):
+        import threading
+        import time
+        from api.signing_keys import SigningKeyManager
+        certs = self.firebase.certificates()[0]
+        release, fetching = threading.Event(), threading.Event()
+        responses = [(certs, 60)]
+
+        def fetch():
+            if responses:
+                return responses.pop()
+            fetching.set()
+            release.wait(5)  # a slow certificate endpoint
+            return certs, 60
+
+        now = [time.time()]
+        manager = SigningKeyManager(fetch, retry_after=30, clock=lambda: now[0])
+        self.addCleanup(manager.stop)
+        self.addCleanup(release.set)
+        manager.start()
+        self._wait_for(lambda: not responses)
+        slow = threading.Thread(target=manager.refresh)
+        slow.start()
+        self.assertTrue(fetching.wait(3))
+        now[0] += 61  # known key past max-age while the slow fetch is in flight
+        started = time.monotonic()
+        claims = manager.verify(self.firebase.mint_token("abc"), "test-project")
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(claims["uid"], "abc")
+        release.set()
+        slow.join(3)
+
+class LazyFirebaseTests(TestCase):
+    """ Tests for on-demand Firebase initialization and the startup profile """
+
+    def test_initializes_once_across_threads(self):
+        import threading
+        from api import firebase
+        calls = []
+
+        def initialize():
+            calls.append(1)
+            return "app"
+
+        with patch.object(firebase, "_initialized", False), patch.object(firebase, "_app", None), \
+                patch.object(firebase, "_initialize", initialize):
+            threads = [threading.Thread(target=firebase.initialize_firebase) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(firebase.initialize_firebase(), "app")
+        self.assertEqual(len(calls), 1)
+
+    def test_worker_boot_does_not_import_firebase_or_crypto(self):
+        import os
+        import subprocess
+        import sys
+        from django.conf import settings
+        from api.management.commands.startup_profile import BOOT_SCRIPT
+        script = BOOT_SCRIPT.format(wsgi="backend.wsgi") + (
+            "; import sys; print(sorted(m for m in ('firebase_admin', 'cryptography', 'jwt') if m in sys.modules))"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "backend.settings"},
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout.strip().splitlines()[-1], "[]")
+
+    def test_importtime_summary(self):
+        from api.management.commands.startup_profile import parse_importtime, summarize
+        stderr = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |     django.utils",
+            "import time:       400 |        500 |   django",
+            "import time:      2000 |       2000 | api.views",
+        ])
+        summary = summarize(parse_importtime(stderr))
+        self.assertEqual(summary["total_import_ms"], 2.5)
+        self.assertEqual(summary["packages_ms"], {"api": 2.0, "django": 0.5})
+        self.assertEqual(summary["slowest_modules_ms"][0]["module"], "api.views")
+
+
+class SessionHubTests(TestCase):
+    """ Tests for the in-process multiplayer pub/sub hub """
+
+    def test_versions_and_late_writes(self):
+        from api.realtime import InProcessHub
+        hub = InProcessHub()
+        self.assertIsNone(hub.latest("s"))
+        self.assertEqual(hub.publish("s", {"n": 1}), 1)
+        self.assertEqual(hub.publish("s", {"n": 2}), 2)
+        self.assertEqual(hub.publish("s", {"n": 0}, version=1), 2)  # older state is ignored
+        self.assertEqual(hub.latest("s"), (2, {"n": 2}))
+        self.assertEqual(hub.wait("s", 1, timeout=0), (2, {"n": 2}))  # already newer: no wait
+        self.assertIsNone(hub.wait("s", 2, timeout=0.01))
+        self.assertIsNone(hub.wait("s", 5, timeout=0.01))  # a client ahead of this process waits
+
+    def test_publish_wakes_sync_and_async_waiters(self):
+        import asyncio
+        import threading
+        from api.realtime import InProcessHub
+        hub = InProcessHub()
+        hub.publish("s", {"n": 1})
+        threading.Timer(0.05, hub.publish, args=("s", {"n": 2})).start()
+        self.assertEqual(hub.wait("s", 1, timeout=5), (2, {"n": 2}))
+
+        async def wait():
+            return await hub.wait_async("s", 2, timeout=5)
+
+        threading.Timer(0.05, hub.publish, args=("s", {"n": 3})).start()
+        self.assertEqual(asyncio.run(wait()), (3, {"n": 3}))
+        self.assertEqual(hub._waiters, {})
+
+    def test_async_stream_loads_unknown_session_once(self):
+        import asyncio
+        from api.realtime import InProcessHub, stream_session_async
+        hub = InProcessHub()
+        loads = []
+
+        def load():
+            loads.append(1)
+            return {"status": "finished"}
+
+        async def collect():
+            return [chunk async for chunk in stream_session_async(hub, "s", None, load, keepalive=1, max_duration=1)]
+
+        chunks = asyncio.run(collect())
+        self.assertEqual(chunks[1], 'id: 1\nevent: session\ndata: {"status":"finished"}\n\n')
+        asyncio.run(collect())
+        self.assertEqual(len(loads), 1)  # served from the hub afterwards
+
+
+class MultiplayerTestCase(LocalAuthTestCase):
+    """ Starts each test with a two-player session created by FAKE_FIREBASE_UID """
+
+    def setUp(self):
+        super().setUp()
+        from django.core.cache import cache
+        cache.clear()  # cached session snapshots: join codes repeat between tests
+        with self.captureOnCommitCallbacks(execute=True):
+            created = self.client.post(reverse("create-multiplayer"), {"number_of_players": 2}, format="json").json()
+        self.session_id, self.join_code = created["session_id"], created["join_code"]
+        self.stream_token = created["stream_token"]
+
+    def client_for(self, uid):
+        from rest_framework.test import APIClient
+        from api.auth_backends import get_auth_backend
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_auth_backend().mint_token(uid, name=uid)}")
+        return client
+
+    def join_as(self, uid):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client_for(uid).post(reverse("join-multiplayer"), {"join_code": self.join_code}, format="json")
+
+    def submit_as(self, client, score):
+        with self.captureOnCommitCallbacks(execute=True):
+            return client.post(
+                reverse("submit-multiplayer-score"), {"session_id": self.session_id, "score": score}, format="json"
+            )
+
+
+@override_settings(MULTIPLAYER_STREAM_MAX_SECONDS=0)
+class MultiplayerEventsTests(MultiplayerTestCase):
+    """ Tests for the multiplayer Server-Sent Events stream """
+
+    def events(self, last_event_id=None, token=None):
+        headers = {"HTTP_LAST_EVENT_ID": str(last_event_id)} if last_event_id is not None else {}
+        response = self.client.get(
+            reverse("multiplayer-events", args=[self.session_id]), {"token": token or self.stream_token}, **headers
+        )
+        if response.status_code != 200:
+            return response, []
+        messages = []
+        for chunk in response.streaming_content:
+            chunk = chunk.decode()
+            if chunk.startswith("id:"):
+                lines = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+                messages.append((int(lines["id"]), lines["event"], json.loads(lines["data"])))
+        return response, messages
+
+    def test_stream_sends_current_state(self):
+        response, messages = self.events()
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(len(messages), 1)
+        version, event, data = messages[0]
+        self.assertEqual((event, data["status"], data["players"]), ("session", "waiting", [FAKE_FIREBASE_UID]))
+
+    def test_join_publishes_and_client_resumes_from_last_version(self):
+        _, [(version, _, _)] = self.events()
+        _, messages = self.events(last_event_id=version)
+        self.assertEqual(messages, [])  # nothing new since the client's version
+
+        self.assertEqual(self.join_as("player-two").status_code, 200)
+        _, [(new_version, _, data)] = self.events(last_event_id=version)
+        self.assertGreater(new_version, version)
+        self.assertEqual(data["status"], "active")
+        self.assertEqual(data["player_scores"]["player-two"]["display_name"], "player-two")
+
+    def test_stream_waits_for_changes_and_ends_when_finished(self):
+        import threading
+        from api.realtime import get_hub
+        _, [(version, _, data)] = self.events()
+        threading.Timer(0.05, get_hub().publish, args=(self.session_id, {**data, "status": "finished"})).start()
+        with override_settings(MULTIPLAYER_STREAM_MAX_SECONDS=5):
+            _, messages = self.events(last_event_id=version)
+        self.assertEqual([data["status"] for _, _, data in messages], ["finished"])
+
+    def test_rejects_bad_stream_token(self):
+        from api.session_tokens import issue_stream_token
+        response, _ = self.events(token="forged")
+        self.assertEqual(response.status_code, 403)
+        response, _ = self.events(token=issue_stream_token(uuid.uuid4(), FAKE_FIREBASE_UID))
+        self.assertEqual(response.status_code, 403)
+
+
+class MultiplayerVersionTests(MultiplayerTestCase):
+    """ Tests for versioned multiplayer state, conditional GETs and deltas """
+
+    def get(self, headers=None, **params):
+        return self.client.get(reverse("get-multiplayer-session", args=[self.session_id]), params, **(headers or {}))
+
+    def test_idle_poll_is_304_after_one_query(self):
+        from django.core.cache import cache
+        response = self.get()
+        self.assertEqual(response.json()["version"], 1)
+        etag = response["ETag"]
+        with self.assertNumQueries(1):
+            response = self.get({"HTTP_IF_NONE_MATCH": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        cache.clear()
+        with self.assertNumQueries(1):  # the snapshot cache is not needed for a 304
+            response = self.get({"HTTP_IF_NONE_MATCH": etag})
+        self.assertEqual(response.status_code, 304)
+        by_code = self.client.get(reverse("get-multiplayer-session-by-code"), {"join_code": self.join_code},
+                                  HTTP_IF_NONE_MATCH=f"W/{etag}")
+        self.assertEqual(by_code.status_code, 304)
+
+    def test_join_and_submit_bump_version(self):
+        etag = self.get()["ETag"]
+        self.assertEqual(self.join_as("player-two").json()["version"], 2)
+        response = self.get({"HTTP_IF_NONE_MATCH": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.submit_as(self.client, 7).json()["version"], 3)
+
+    def test_since_version_returns_changed_players_only(self):
+        player_two = self.client_for("player-two")
+        self.join_as("player-two")
+        self.submit_as(player_two, 5)
+        data = self.get(since_version=2).json()
+        self.assertEqual((data["version"], data["since_version"]), (3, 2))
+        self.assertEqual(list(data["player_scores"]), ["player-two"])
+        self.assertEqual(data["player_scores"]["player-two"]["score"], 5)
+        self.assertEqual(data["players"], [FAKE_FIREBASE_UID, "player-two"])
+        self.assertEqual(self.get(since_version=3).status_code, 304)
+        self.assertEqual(self.get(since_version="x").status_code, 400)
+
+
+class MultiplayerWaitTests(MultiplayerTestCase):
+    """ Tests for the multiplayer long-poll endpoint """
+
+    def wait(self, version, timeout=0.05, token=None):
+        return self.client.get(
+            reverse("multiplayer-wait", args=[self.session_id]),
+            {"version": version, "timeout": timeout, "token": token or self.stream_token},
+        )
+
+    def test_returns_immediately_when_client_is_behind(self):
+        response = self.wait(0)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["version"], 1)
+
+    def test_times_out_with_304(self):
+        response = self.wait(1)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn("Retry-After", response)
+
+    def test_publish_wakes_parked_request(self):
+        import threading
+        from api.realtime import get_hub
+        data = self.wait(0).json()
+        threading.Timer(0.05, get_hub().publish, args=(self.session_id, {**data, "version": 2}), kwargs={"version": 2}).start()
+        response = self.wait(1, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["version"], 2)
+
+    def test_change_from_another_worker_is_found_before_waiting(self):
+        from api.models import MultiplayerSession
+        self.wait(0)  # this process's hub now holds version 1
+        MultiplayerSession.objects.filter(session_id=self.session_id).update(version=2, status="active")
+        response = self.wait(1, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["version"], response.json()["status"]), (2, "active"))
+
+    @override_settings(MULTIPLAYER_WAIT_DB_CHECK_SECONDS=0.02)
+    def test_change_from_another_worker_is_found_while_waiting(self):
+        import time
+        from api.models import MultiplayerSession
+        from api.views import MultiplayerWaitView
+        real_check = MultiplayerWaitView._newer_in_database
+        checks = []
+
+        def check_after_other_worker_writes(view, session_id, version):
+            checks.append(version)
+            if len(checks) == 2:  # lands while the request is parked
+                MultiplayerSession.objects.filter(session_id=self.session_id).update(version=2, status="active")
+            return real_check(view, session_id, version)
+
+        started = time.monotonic()
+        with patch.object(MultiplayerWaitView, "_newer_in_database", check_after_other_worker_writes):
+            response = self.wait(1, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["version"], 2)
+        self.assertEqual(len(checks), 2)
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_wsgi_waiters_are_bounded(self):
+        import threading
+        from api.views import MultiplayerWaitView
+        with patch.object(MultiplayerWaitView, "blocking_waiters", threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = self.wait(1, timeout=5)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["Retry-After"], "2")
+
+    def test_validation(self):
+        self.assertEqual(self.wait(1, token="forged").status_code, 403)
+        response = self.client.get(reverse("multiplayer-wait", args=[self.session_id]), {"token": self.stream_token})
+        self.assertEqual(response.status_code, 400)
+
+
+class MultiplayerPlayerTests(MultiplayerTestCase):
+    """ Tests for per-player rows and version compare-and-swap on joins and submits """
+
+    def session(self):
+        from api.models import MultiplayerSession
+        return MultiplayerSession.objects.get(session_id=self.session_id)
+
+    def test_join_inserts_one_row_and_duplicate_join_is_a_no_op(self):
+        self.assertEqual(self.join_as("player-two").status_code, 200)
+        response = self.join_as("player-two")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["players"], [FAKE_FIREBASE_UID, "player-two"])
+        session = self.session()
+        self.assertEqual((session.player_count, session.version, session.status), (2, 2, "active"))
+        self.assertEqual(session.player_rows.count(), 2)
+        response = self.join_as("player-three")
+        self.assertEqual((response.status_code, response.json()["error"]), (400, "Session is full"))
+
+    def test_join_retries_when_another_join_wins_the_race(self):
+        from api import multiplayer
+        from api.models import MultiplayerSession
+        self.session_id = self.client.post(
+            reverse("create-multiplayer"), {"number_of_players": 3}, format="json"
+        ).json()["session_id"]
+        join_code = self.session().join_code
+        real_swap = multiplayer._compare_and_swap
+        raced = []
+
+        def swap_after_concurrent_join(session, changes):
+            if not raced:
+                raced.append(True)
+                multiplayer.join_session(join_code, "player-two")  # lands between our read and our swap
+            return real_swap(session, changes)
+
+        with patch.object(multiplayer, "_compare_and_swap", swap_after_concurrent_join):
+            before = multiplayer.conflicts.value
+            session, joined = multiplayer.join_session(join_code, "player-three")
+        self.assertTrue(joined)
+        self.assertEqual(multiplayer.conflicts.value - before, 1)
+        session = MultiplayerSession.objects.get(session_id=session.session_id)
+        self.assertEqual((session.player_count, session.version, session.status), (3, 3, "active"))
+        self.assertEqual(
+            [row.user_id for row in session.roster()], [FAKE_FIREBASE_UID, "player-two", "player-three"]
+        )
+
+    def test_resubmit_overwrites_score_and_last_submit_computes_winners(self):
+        player_two = self.client_for("player-two")
+        self.join_as("player-two")
+        self.assertEqual(self.submit_as(self.client, 3).json()["players_submitted"], 1)
+        data = self.submit_as(self.client, 9).json()
+        self.assertEqual((data["players_submitted"], data["scores"][FAKE_FIREBASE_UID]["score"]), (1, 9))
+        data = self.submit_as(player_two, 9).json()
+        self.assertEqual((data["status"], sorted(data["winners"])), ("finished", sorted([FAKE_FIREBASE_UID, "player-two"])))
+        session = self.session()
+        self.assertEqual((session.submitted_count, session.version), (2, 5))
+        self.assertEqual(self.submit_as(player_two, 1).json()["error"], "Session has already finished")
+
+    def test_submit_errors(self):
+        self.assertEqual(self.submit_as(self.client, 1).json()["error"], "Session has not started yet")
+        self.join_as("player-two")
+        response = self.submit_as(self.client_for("outsider"), 1)
+        self.assertEqual(response.status_code, 403)
+        bad_code = self.client.post(reverse("join-multiplayer"), {"join_code": "ZZZZZZ"}, format="json")
+        self.assertEqual(bad_code.status_code, 404)
+
+
+class MultiplayerBenchmarkTests(TransactionTestCase):
+    """ Smoke test for the benchmark_multiplayer management command """
+
+    def test_concurrent_joins_and_submits_lose_no_updates(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from api.models import MultiplayerSession
+        out = StringIO()
+        # One worker thread: the in-memory test database fails concurrent writers instead of waiting
+        call_command("benchmark_multiplayer", sessions=2, players=3, threads=1, seed=7, json=True, stdout=out)
+        summary = json.loads(out.getvalue())
+        self.assertEqual(summary["lost_updates"], 0, summary)
+        self.assertEqual([phase["operations"] for phase in summary["phases"]], [8, 6])
+        self.assertEqual([phase["errors"] for phase in summary["phases"]], [{}, {}])
+        self.assertFalse(MultiplayerSession.objects.exists())  # benchmark sessions are cleaned up
+
+
+class JoinCodeAllocatorTests(TestCase):
+    """ Tests for the permuted-counter join-code allocator """
+
+    def allocator(self, block_size=4):
+        from api.join_codes import JoinCodeAllocator
+        return JoinCodeAllocator(block_size=block_size, secret="test")
+
+    def test_permutation_gives_distinct_valid_codes(self):
+        from api.join_codes import ALPHABET, CodePermutation, SPACE, encode
+        permute = CodePermutation("test")
+        values = [permute(n) for n in range(50000)]
+        self.assertEqual(len(set(values)), len(values))
+        self.assertTrue(all(0 <= value < SPACE for value in values))
+        self.assertEqual(encode(0), "AAAAAA")
+        self.assertEqual(encode(SPACE - 1), "999999")
+        self.assertTrue(set(encode(values[1])) <= set(ALPHABET))
+
+    def test_one_counter_update_per_block(self):
+        allocator = self.allocator(block_size=4)
+        with self.assertNumQueries(1):
+            codes = [allocator.allocate() for _ in range(4)]
+        with self.assertNumQueries(1):
+            codes.append(allocator.allocate())
+        self.assertEqual(len(set(codes)), 5)
+        # A second worker reserves the next block rather than repeating codes
+        self.assertNotIn(self.allocator().allocate(), codes)
+
+    def test_counter_without_update_returning_locks_and_advances(self):
+        from api.models import JoinCodeCounter
+        with patch("api.models.supports_update_returning", return_value=False):
+            first = JoinCodeCounter.reserve("fallback", 4)
+            second = JoinCodeCounter.reserve("fallback", 4)
+        self.assertEqual((first, second), (0, 4))
+        self.assertEqual(JoinCodeCounter.reserve("fallback", 4), 8)
+
+    def test_code_of_finished_session_is_reclaimed(self):
+        from api.models import MultiplayerSession
+        allocator = self.allocator()
+        code = allocator.allocate()
+        old = MultiplayerSession.objects.create(join_code=code, board_seed="x", status="finished")
+        allocator.reset()
+        allocator.allocate = Mock(side_effect=[code])
+        session = allocator.create_session(board_seed="y")
+        self.assertEqual(session.join_code, code)
+        old.refresh_from_db()
+        self.assertIsNone(old.join_code)
+
+    def test_code_in_use_is_skipped(self):
+        from api.models import MultiplayerSession
+        MultiplayerSession.objects.create(join_code="ABCDEF", board_seed="x", status="active")
+        allocator = self.allocator()
+        allocator.allocate = Mock(side_effect=["ABCDEF", "ABCDEG"])
+        session = allocator.create_session(board_seed="y")
+        self.assertEqual(session.join_code, "ABCDEG")
+        self.assertTrue(MultiplayerSession.objects.filter(join_code="ABCDEF", status="active").exists())
+
+
+class MultiplayerReaperTests(MultiplayerTestCase):
+    """ Tests for expiring, force-finishing and archiving multiplayer sessions """
+
+    def age(self, session_id, seconds, **fields):
+        from datetime import timedelta
+        from django.utils import timezone
+        from api.models import MultiplayerSession
+        then = timezone.now() - timedelta(seconds=seconds)
+        MultiplayerSession.objects.filter(session_id=session_id).update(created_at=then, **fields)
+
+    def reap(self, **kwargs):
+        from api.reaper import reap
+        with self.captureOnCommitCallbacks(execute=True):
+            return reap(**kwargs)
+
+    @override_settings(MULTIPLAYER_LOBBY_TTL_SECONDS=60)
+    def test_stale_lobby_expires_and_frees_its_code(self):
+        from api.models import MultiplayerSession
+        from api.realtime import get_hub
+        self.age(self.session_id, 120)
+        self.assertEqual(self.reap()["expired"], 1)
+        session = MultiplayerSession.objects.get(session_id=self.session_id)
+        self.assertEqual((session.status, session.join_code, session.version), ("expired", None, 2))
+        self.assertEqual(get_hub().latest(self.session_id)[1]["status"], "expired")
+        self.assertEqual(self.join_as("player-two").status_code, 404)
+        self.assertEqual(self.reap()["expired"], 0)
+
+    @override_settings(MULTIPLAYER_GAME_TTL_SECONDS=60)
+    def test_abandoned_game_finishes_with_scores_so_far(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from api.models import MultiplayerSession
+        self.join_as("player-two")
+        self.submit_as(self.client, 4)
+        self.assertEqual(self.reap()["finished"], 0)  # still within its deadline
+        self.age(self.session_id, 120, start_time=timezone.now() - timedelta(seconds=120))
+        self.assertEqual(self.reap()["finished"], 1)
+        session = MultiplayerSession.objects.get(session_id=self.session_id)
+        self.assertEqual((session.status, session.winners), ("finished", [FAKE_FIREBASE_UID]))
+        response = self.submit_as(self.client_for("player-two"), 9)
+        self.assertEqual(response.json()["error"], "Session has already finished")
+
+    @override_settings(MULTIPLAYER_ARCHIVE_AFTER_SECONDS=60)
+    def test_old_finished_sessions_are_archived_in_batches(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from api.models import ArchivedMultiplayerSession, MultiplayerAnswer, MultiplayerPlayer, MultiplayerSession
+        self.join_as("player-two")
+        MultiplayerAnswer.objects.bulk_create([
+            MultiplayerAnswer(session_id=self.session_id, user_id=FAKE_FIREBASE_UID, question_index=0, correct=True),
+            MultiplayerAnswer(session_id=self.session_id, user_id=FAKE_FIREBASE_UID, question_index=1, correct=False),
+            MultiplayerAnswer(session_id=self.session_id, user_id="player-two", question_index=0, correct=True),
+        ])
+        self.submit_as(self.client, 4)
+        self.submit_as(self.client_for("player-two"), 6)
+        old = timezone.now() - timedelta(seconds=120)
+        for _ in range(2):
+            MultiplayerSession.objects.create(join_code=None, board_seed="x", status="expired", finished_at=old)
+        MultiplayerSession.objects.filter(session_id=self.session_id).update(finished_at=old)
+        self.assertEqual(self.reap(batch_size=2)["archived"], 3)
+        self.assertFalse(MultiplayerSession.objects.exists())
+        self.assertFalse(MultiplayerPlayer.objects.exists())
+        self.assertFalse(MultiplayerAnswer.objects.exists())
+        archived = ArchivedMultiplayerSession.objects.get(session_id=self.session_id)
+        self.assertEqual(archived.winners, ["player-two"])
+        self.assertEqual([(p["user_id"], p["score"]) for p in archived.players], [(FAKE_FIREBASE_UID, 4), ("player-two", 6)])
+        # The answers went with the session, so their tallies are archived
+        self.assertEqual(
+            [(p["answered"], p["answered_correctly"]) for p in archived.players], [(2, 1), (1, 1)]
+        )
+        self.assertEqual(archived.questions[:2], [{"answered": 2, "correct": 2}, {"answered": 1, "correct": 0}])
+        self.assertEqual(len(archived.questions), 10)
+
+
+class LargeRoomTests(MultiplayerTestCase):
+    """ Tests for large multiplayer rooms: incremental standings, bounded snapshots and player pages """
+
+    def fill_room(self, size, scores=()):
+        from api import multiplayer
+        from api.join_codes import join_codes
+        from api.models import MultiplayerPlayer
+        session = join_codes.create_session(board_seed="x", number_of_players=size, player_count=1)
+        MultiplayerPlayer.objects.create(session=session, user_id="p0")
+        for n in range(1, size):
+            multiplayer.join_session(session.join_code, f"p{n}")
+        for n, score in enumerate(scores):
+            multiplayer.submit_score(session.pk, f"p{n}", score)
+        session.refresh_from_db()
+        return session
+
+    def test_room_size_limit(self):
+        create = lambda size: self.client.post(reverse("create-multiplayer"), {"number_of_players": size}, format="json")
+        self.assertEqual(create(100).status_code, 201)
+        with override_settings(MULTIPLAYER_MAX_PLAYERS=500):
+            self.assertEqual(create(501).status_code, 400)
+
+    def test_standings_are_maintained_incrementally(self):
+        from api import multiplayer
+        session = self.fill_room(4, scores=[5, 7, 7])
+        self.assertEqual((session.top_score, sorted(session.winners)), (7, ["p1", "p2"]))
+        session = multiplayer.submit_score(session.pk, "p1", 2)  # a tied leader drops out
+        self.assertEqual((session.top_score, session.winners), (7, ["p2"]))
+        with self.assertNumQueries(7):  # the sole leader dropping costs one indexed lookup on top of a submit
+            session = multiplayer.submit_score(session.pk, "p2", 1)
+        self.assertEqual((session.top_score, session.winners), (5, ["p0"]))
+        session = multiplayer.submit_score(session.pk, "p3", 5)
+        self.assertEqual((session.status, sorted(session.winners)), ("finished", ["p0", "p3"]))
+
+    def test_hundred_player_room_submits_survive_lost_races(self):
+        from django.db.models import F
+        from api import multiplayer
+        from api.models import MultiplayerSession
+        session = self.fill_room(100)
+        real_swap = multiplayer._compare_and_swap
+        calls = []
+
+        def swap_after_competing_write(session, changes):
+            calls.append(session.version)
+            if len(calls) % 2:  # every first attempt loses to a write landing between its read and its swap
+                MultiplayerSession.objects.filter(pk=session.pk).update(version=F("version") + 1)
+            return real_swap(session, changes)
+
+        before = multiplayer.conflicts.value
+        with patch.object(multiplayer, "_compare_and_swap", swap_after_competing_write), \
+                patch.object(multiplayer, "_backoff") as backoff:
+            for n in range(100):
+                multiplayer.submit_score(session.pk, f"p{n}", n % 37)
+        # One lost race each, then the retry queues on the row lock and wins: no "busy", no third attempt
+        self.assertEqual((len(calls), multiplayer.conflicts.value - before, backoff.call_count), (200, 100, 100))
+        session.refresh_from_db()
+        self.assertEqual((session.status, session.submitted_count), ("finished", 100))
+        self.assertEqual((session.top_score, sorted(session.winners)), (36, ["p36", "p73"]))
+
+    @override_settings(MULTIPLAYER_SNAPSHOT_PLAYERS=3)
+    def test_large_room_snapshot_is_bounded_and_players_are_paged(self):
+        from api.views import render_multiplayer_session
+        session = self.fill_room(6, scores=[10, 40, 20, 50])
+        data = render_multiplayer_session(session, since_version=1)
+        self.assertTrue(data["players_truncated"])
+        self.assertNotIn("since_version", data)
+        self.assertEqual(data["players"], ["p0", "p1", "p2"])
+        self.assertEqual(list(data["player_scores"]), ["p3", "p1", "p2"])
+        self.assertEqual((data["top_score"], data["leaders"]), (50, ["p3"]))
+
+        url = reverse("multiplayer-players", args=[session.session_id])
+        page = self.client.get(url, {"order": "score", "page": 2, "page_size": 2}).json()
+        self.assertEqual([(p["user_id"], p.get("position")) for p in page["players"]], [("p2", 3), ("p0", 4)])
+        self.assertEqual((page["total"], page["has_next"]), (6, True))
+        last = self.client.get(url, {"page": 2, "page_size": 4}).json()
+        self.assertEqual(([p["user_id"] for p in last["players"]], last["has_next"]), (["p4", "p5"], False))
+        self.assertEqual(self.client.get(url, {"order": "rank"}).status_code, 400)
+
+    @override_settings(MULTIPLAYER_SNAPSHOT_PLAYERS=5)
+    def test_load_profile_cost_per_event_does_not_grow_with_room(self):
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        call_command("profile_multiplayer_rooms", sizes="8,40", json=True, stdout=out)
+        small, large = json.loads(out.getvalue())
+        self.assertTrue(small["finished"] and large["finished"])
+        for event in ("join", "submit", "snapshot"):
+            self.assertEqual(small[event]["queries_max"], large[event]["queries_max"], event)
+
+
+class MatchmakingTests(MultiplayerTestCase):
+    """ Tests for the quick-match queue and its handoff into multiplayer sessions """
+
+    def make_queue(self, **kwargs):
+        from api.matchmaking import MatchmakingQueue
+        self.now = 0.0
+        return MatchmakingQueue(clock=lambda: self.now, **{"room_size": 3, "min_players": 2, "max_wait": 10, **kwargs})
+
+    def test_room_forms_when_full_or_when_the_wait_is_over(self):
+        from api.models import MultiplayerSession
+        queue = self.make_queue()
+        self.assertEqual(queue.enqueue("a", "easy")["status"], "queued")
+        queue.enqueue("b", "easy")
+        queue.enqueue("x", "hard")
+        self.assertEqual(queue.status("b")["position"], 2)
+        ticket = queue.enqueue("c", "easy")
+        self.assertEqual(ticket["status"], "matched")
+        session = MultiplayerSession.objects.get(pk=ticket["session_id"])
+        self.assertEqual((session.status, session.difficulty, session.player_count), ("active", "easy", 3))
+        self.assertEqual(sorted(player.user_id for player in session.roster()), ["a", "b", "c"])
+        self.assertEqual(queue.status("a")["session_id"], ticket["session_id"])
+
+        queue.enqueue("y", "hard")
+        self.assertEqual(queue.status("x")["status"], "queued")
+        self.now = 11.0  # the oldest hard player has waited long enough for a two-player room
+        self.assertEqual(queue.status("y")["status"], "matched")
+        metrics = queue.metrics()["queues"]
+        self.assertEqual((metrics["easy"]["rooms"], metrics["hard"]["matched"]), (1, 2))
+        self.assertEqual(metrics["hard"]["time_to_match_seconds"]["max"], 11.0)
+
+    def test_failed_handoff_requeues_players_in_order(self):
+        def fail(difficulty, uids):
+            raise RuntimeError("database unavailable")
+        queue = self.make_queue(form=fail)
+        with self.assertLogs("api.matchmaking", "ERROR"):
+            for uid in ("a", "b", "c"):
+                queue.enqueue(uid, "easy")
+        self.assertEqual([queue.status(uid, form=False)["position"] for uid in ("a", "b", "c")], [1, 2, 3])
+        self.assertEqual(queue.metrics()["queues"]["easy"]["form_failures"], 1)
+
+    def test_queue_operations_do_not_touch_the_database(self):
+        queue = self.make_queue(room_size=1000)
+        with self.assertNumQueries(0):
+            for n in range(5000):
+                queue.enqueue(f"u{n % 900}", ["easy", "medium", "hard"][n % 3])
+            for n in range(900):
+                queue.cancel(f"u{n}")
+        self.assertEqual(sum(q["depth"] for q in queue.metrics()["queues"].values()), 0)
+
+    def test_quick_match_endpoints(self):
+        from unittest import mock
+        queue = self.make_queue(room_size=2)
+        url = reverse("matchmaking-queue")
+        with mock.patch("api.views.matchmaking", queue):
+            self.assertEqual(self.client.post(url, {"difficulty": "extreme"}, format="json").status_code, 400)
+            self.assertEqual(self.client.post(url, {"difficulty": ["easy"]}, format="json").status_code, 400)
+            self.assertEqual(self.client.post(url, {"difficulty": {"a": 1}}, format="json").status_code, 400)
+            self.assertEqual(self.client.get(url).status_code, 404)
+            self.assertEqual(self.client.post(url, {"difficulty": "medium"}, format="json").status_code, 202)
+            self.assertEqual(self.client.delete(url).status_code, 204)
+            self.assertEqual(self.client.post(url, {"difficulty": "medium"}, format="json").status_code, 202)
+            matched = self.client_for("p2").post(url, {"difficulty": "medium"}, format="json")
+            self.assertEqual(matched.status_code, 200)
+            body = matched.json()
+            self.assertEqual((body["session"]["status"], body["session"]["difficulty"]), ("active", "medium"))
+            self.assertTrue(body["stream_token"])
+            polled = self.client.get(url).json()
+            self.assertEqual(polled["session"]["session_id"], body["session_id"])
+            self.assertEqual(self.client.delete(url).status_code, 409)
+            metrics = self.client.get(reverse("matchmaking-metrics"), HTTP_AUTHORIZATION="Bearer not-a-token").json()
+        self.assertEqual(metrics["queues"]["medium"]["cancelled"], 1)
+
+
+class MultiplayerAnswerTests(MultiplayerTestCase):
+    """ Tests for per-question answers: buffered writes and live standings """
+
+    def setUp(self):
+        super().setUp()
+        from unittest import mock
+        from api.answers import AnswerBuffer
+        self.join_as("p2")
+        self.buffer = AnswerBuffer(batch_size=100, background=False)
+        patcher = mock.patch("api.views.answer_buffer", self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def answer(self, client, question_index, correct=True):
+        return client.post(
+            reverse("multiplayer-answer"),
+            {"session_id": self.session_id, "question_index": question_index, "correct": correct},
+            format="json",
+        )
+
+    def test_burst_of_answers_is_written_in_one_batch(self):
+        from api.models import MultiplayerAnswer
+        with self.assertNumQueries(3):  # loading the room once; no write per answer
+            for question_index in range(10):
+                self.buffer.record(self.session_id, FAKE_FIREBASE_UID, question_index, question_index % 2 == 0)
+                self.buffer.record(self.session_id, "p2", question_index, True)
+        self.assertEqual(self.buffer.record(self.session_id, "p2", 3, False), (False, (10, 10)))  # a repeat
+        self.assertEqual(MultiplayerAnswer.objects.count(), 0)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.buffer.write(), 20)
+        self.assertEqual(MultiplayerAnswer.objects.filter(user_id="p2", correct=True).count(), 10)
+        self.assertEqual(self.buffer.stats()["duplicates"], 1)
+
+    def test_buffer_writes_when_full_and_rebuilds_tallies_after_restart(self):
+        from api.answers import AnswerBuffer
+        from api.models import MultiplayerAnswer
+        buffer = AnswerBuffer(batch_size=4, background=False)
+        for question_index in range(5):
+            buffer.record(self.session_id, "p2", question_index, question_index != 1)
+        self.assertEqual((MultiplayerAnswer.objects.count(), buffer.stats()["pending"]), (4, 1))
+        restarted = AnswerBuffer(background=False)
+        self.assertEqual(restarted.record(self.session_id, "p2", 2, True), (False, (4, 3)))
+
+    def test_invalid_answers_are_rejected(self):
+        self.assertEqual(self.answer(self.client, 0).status_code, 202)
+        self.assertEqual(self.answer(self.client, 0).status_code, 200)
+        self.assertEqual(self.answer(self.client, 10).status_code, 400)  # sessions have 10 questions by default
+        self.assertEqual(self.answer(self.client_for("outsider"), 1).status_code, 403)
+        waiting = self.client.post(reverse("create-multiplayer"), {"number_of_players": 2}, format="json").json()
+        response = self.client.post(
+            reverse("multiplayer-answer"),
+            {"session_id": waiting["session_id"], "question_index": 0, "correct": True},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_live_standings_are_broadcast_per_flush_and_end_with_the_game(self):
+        from api.answers import live_channel
+        from api.realtime import get_hub
+        other = self.client_for("p2")
+        self.answer(self.client, 0, correct=False)
+        self.answer(other, 0)
+        self.answer(other, 1)
+        self.assertIsNone(get_hub().latest(live_channel(self.session_id)))
+        self.assertEqual(self.buffer.flush(), 3)
+        version, data = get_hub().latest(live_channel(self.session_id))
+        self.assertEqual([(p["user_id"], p["correct"]) for p in data["standings"]], [("p2", 2), (FAKE_FIREBASE_UID, 0)])
+        self.assertEqual(data["questions"][0], {"answered": 2, "correct": 1})
+        self.assertEqual(self.buffer.broadcast(), 0)  # nothing changed since
+
+        with override_settings(MULTIPLAYER_STREAM_MAX_SECONDS=0):
+            stream = self.client.get(reverse("multiplayer-live", args=[self.session_id]), {"token": self.stream_token})
+            body = b"".join(stream.streaming_content).decode()
+        self.assertIn(f"id: {version}\nevent: standings", body)
+
+        self.submit_as(self.client, 0)
+        self.submit_as(other, 2)
+        _, final = get_hub().latest(live_channel(self.session_id))
+        self.assertEqual(final["status"], "finished")
+        self.assertEqual(self.answer(other, 2).status_code, 400)
+
+    def test_flush_closes_rooms_finished_on_another_worker(self):
+        from api.answers import live_channel
+        from api.models import MultiplayerSession
+        from api.realtime import get_hub
+        self.assertEqual(self.answer(self.client, 0).status_code, 202)
+        # The last submit (or the reaper) ran elsewhere: only the database knows
+        MultiplayerSession.objects.filter(session_id=self.session_id).update(status="finished")
+        self.assertEqual(self.answer(self.client_for("p2"), 0).status_code, 202)  # this worker cannot tell yet
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(get_hub().latest(live_channel(self.session_id))[1]["status"], "finished")
+        self.assertEqual(self.buffer.stats()["rooms"], 0)
+        self.assertEqual(self.answer(self.client_for("p2"), 1).json()["error"], "Session has already finished")
+
+    @override_settings(MULTIPLAYER_GAME_TTL_SECONDS=60)
+    def test_answers_after_the_game_deadline_are_rejected(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from api.answers import AnswerBuffer
+        from api.models import MultiplayerSession
+        from api.multiplayer import MultiplayerError
+        self.assertEqual(self.answer(self.client, 0).status_code, 202)
+        with self.assertRaises(MultiplayerError) as raised:
+            self.buffer.record(self.session_id, "p2", 0, True, answered_at=timezone.now() + timedelta(seconds=61))
+        self.assertEqual(raised.exception.reason, "finished")
+        # Past its deadline but not reaped yet when another worker first loads the room
+        MultiplayerSession.objects.filter(session_id=self.session_id).update(
+            start_time=timezone.now() - timedelta(seconds=120)
+        )
+        with self.assertRaises(MultiplayerError):
+            AnswerBuffer(background=False).record(self.session_id, "p2", 1, True)
+
+
+class MultiplayerSnapshotCacheTests(MultiplayerTestCase):
+    """ Tests for cached rendered session snapshots """
+
+    def test_reads_by_id_and_code_are_served_from_the_snapshot_written_on_join(self):
+        self.join_as("p2")
+        with self.assertNumQueries(2):  # one version read each
+            by_id = self.client.get(reverse("get-multiplayer-session", args=[self.session_id]))
+            by_code = self.client.get(reverse("get-multiplayer-session-by-code"), {"join_code": self.join_code.lower()})
+        self.assertEqual(by_id.json()["version"], 2)
+        self.assertEqual(by_id.json()["status"], "active")
+        self.assertEqual(by_code.json()["session_id"], self.session_id)
+        self.assertTrue(by_code.json()["stream_token"])
+        self.assertEqual(by_id["ETag"], by_code["ETag"])
+
+    def test_late_older_write_does_not_roll_back_the_snapshot(self):
+        from api.snapshots import snapshots
+        self.join_as("p2")
+        self.assertFalse(snapshots.put(self.session_id, self.join_code, 1, {"session_id": self.session_id}))
+        self.assertEqual(snapshots.get(join_code=self.join_code)[0], 2)
+
+    def test_stale_snapshot_is_never_served(self):
+        from api.models import MultiplayerSession
+        from api.snapshots import snapshots
+        url = reverse("get-multiplayer-session", args=[self.session_id])
+        self.assertEqual(self.client.get(url).json()["players"], [FAKE_FIREBASE_UID])
+        # A write whose snapshot never reached this process's cache (another process, or a lost put race)
+        self.join_as("p2")
+        MultiplayerSession.objects.filter(pk=self.session_id).update(version=9)
+        self.assertEqual(snapshots.get(session_id=self.session_id)[0], 2)
+        data = self.client.get(url).json()
+        self.assertEqual((data["version"], data["players"]), (9, [FAKE_FIREBASE_UID, "p2"]))
+        self.assertEqual(snapshots.get(session_id=self.session_id)[0], 9)  # replaced by the re-render
+
+    def test_miss_renders_once_then_fills_the_cache(self):
+        from django.core.cache import cache
+        cache.clear()
+        url = reverse("get-multiplayer-session", args=[self.session_id])
+        self.assertEqual(self.client.get(url).json()["version"], 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        # A delta is still rendered from the database
+        self.join_as("p2")
+        delta = self.client.get(url, {"since_version": 1}).json()
+        self.assertEqual(list(delta["player_scores"]), ["p2"])
+
+    def test_reaper_drops_the_snapshots_of_sessions_it_changes(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from api.reaper import reap
+        from api.snapshots import snapshots
+        url = reverse("get-multiplayer-session-by-code")
+        self.assertEqual(self.client.get(url, {"join_code": self.join_code}).status_code, 200)
+        reap(now=timezone.now() + timedelta(hours=2))  # as from cron: its own publish never reaches the workers
+        self.assertIsNone(snapshots.get(join_code=self.join_code))
+        self.assertEqual(self.client.get(url, {"join_code": self.join_code}).status_code, 404)
+        self.assertIsNone(snapshots.get(session_id=self.session_id))
+        by_id = self.client.get(reverse("get-multiplayer-session", args=[self.session_id]))
+        self.assertEqual(by_id.json()["status"], "expired")
@@ -0,0 +1,82 @@
+# backend/api/token_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class VerifiedTokenCache:
+    """Bounded LRU cache of decoded Firebase ID token claims.
+
+    Entries are keyed by a SHA-256 digest of the raw token (the token itself is
+    never stored) and expire at the token's `exp` claim, so a cache hit skips the
+    RSA signature check without ever accepting an expired token.
+
+    When `revocation_check_interval` is set, entries also expire that many seconds
+    after they were verified; the caller then re-verifies with `check_revoked=True`.
+    """
+
+    def __init__(self, max_entries=10000, revocation_check_interval=None, clock=time.time):
+        self.max_entries = max_entries
+        self.revocation_check_interval = revocation_check_interval or None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # digest -> (claims, expires_at)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token):
+        """Return cached claims for `token`, or None if absent, expired or due for a revocation check."""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires_at = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, token, claims):
+        """Cache verified claims until the token's `exp` (or the next revocation check)."""
+        exp = claims.get("exp")
+        if not exp:
+            return
+        expires_at = float(exp)
+        if self.revocation_check_interval:
+            expires_at = min(expires_at, self._clock() + self.revocation_check_interval)
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return hit/miss counters and hit rate for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
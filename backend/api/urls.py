@@ -1,6 +1,8 @@
 from django.urls import path
 from .views import SubmitScoreView, LeaderboardView, QuestionsView, StartGameView, UseHintView, UpdateDisplayNameView
 from .views import CreateMultiplayerView, JoinMultiplayerView, SubmitMultiplayerScoreView, GetMultiplayerSessionView
+from .views import MultiplayerEventsView, MultiplayerWaitView, MultiplayerPlayersView
+from .views import MatchmakingQueueView, matchmaking_metrics, MultiplayerAnswerView, MultiplayerLiveView
 
 urlpatterns = [
 	path("questions/", QuestionsView.as_view(), name="questions"),
@@ -12,6 +14,13 @@ urlpatterns = [
 	path("multiplayer/create", CreateMultiplayerView.as_view(), name="create-multiplayer"),
     path("multiplayer/join", JoinMultiplayerView.as_view(), name="join-multiplayer"),
     path("multiplayer/submit", SubmitMultiplayerScoreView.as_view(), name="submit-multiplayer-score"),
+    path("multiplayer/answer", MultiplayerAnswerView.as_view(), name="multiplayer-answer"),
     path("multiplayer/<uuid:session_id>", GetMultiplayerSessionView.as_view(), name="get-multiplayer-session"),
+    path("multiplayer/<uuid:session_id>/events", MultiplayerEventsView.as_view(), name="multiplayer-events"),
+    path("multiplayer/<uuid:session_id>/wait", MultiplayerWaitView.as_view(), name="multiplayer-wait"),
+    path("multiplayer/<uuid:session_id>/live", MultiplayerLiveView.as_view(), name="multiplayer-live"),
+    path("multiplayer/<uuid:session_id>/players", MultiplayerPlayersView.as_view(), name="multiplayer-players"),
     path("multiplayer/by-code", GetMultiplayerSessionView.as_view(), name="get-multiplayer-session-by-code"),
+    path("matchmaking/queue", MatchmakingQueueView.as_view(), name="matchmaking-queue"),
+    path("matchmaking/metrics", matchmaking_metrics, name="matchmaking-metrics"),
 ]
@@ -1,47 +1,56 @@
 from datetime import timedelta
 from typing import List
 import logging
+import threading
+import time
 import uuid
 import random
 import html
 
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.db import transaction
+from django.views import View
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, serializers
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
-from .firebase_auth import FirebaseAuthentication
+from . import multiplayer
+from .answers import answer_buffer, live_channel
+from .display_names import display_names
+from .firebase_auth import FirebaseAuthentication, LazyAuthenticationMixin
+from .join_codes import join_codes
+from .answer_keys import answer_keys, build_answer_key
+from .leaderboard import top_k_cache
+from .matchmaking import matchmaking
+from .realtime import get_hub, stream_session, stream_session_async
+from .snapshots import snapshots
+from .session_tokens import (
+    SessionTokenError,
+    issue_session_token,
+    issue_stream_token,
+    read_session_token,
+    read_stream_token,
+)
 from .serializers import (
     SubmitScoreSerializer, 
     UpdateDisplayNameSerializer,
     CreateMultiplayerSerializer, 
     JoinMultiplayerSerializer, 
-    SubmitMultiplayerScoreSerializer
+    SubmitMultiplayerScoreSerializer,
+    MultiplayerAnswerSerializer,
 )
-from .models import UserScore, GameSession, MultiplayerSession
+from .models import ScoreEntry, ScoreCategory, GameSession, BestScore, MultiplayerSession, MultiplayerPlayer, ALL_DIFFICULTIES, DIFFICULTY_CHOICES
 
 import requests
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 
 logger = logging.getLogger(__name__)
 
-try:
-	from firebase_admin import auth as firebase_auth
-except Exception:
-	firebase_auth = None
-
-
-def _get_display_name(uid: str):
-	if not firebase_auth:
-		return None
-	try:
-		user_rec = firebase_auth.get_user(uid)
-		return getattr(user_rec, "display_name", None)
-	except Exception:
-		return None
-
 
 class SubmitScoreView(APIView):
 	authentication_classes = [FirebaseAuthentication]
@@ -73,10 +82,6 @@ class SubmitScoreView(APIView):
 					status=status.HTTP_401_UNAUTHORIZED
 				)
 
-			# Get display name with fallback: try from request.user first, then fetch from Firebase
-			# Fallback: Returns None if Firebase lookup fails (non-fatal)
-			display_name = getattr(request.user, "display_name", None) or _get_display_name(uid)
-
 			# Input validation: Prevent negative scores
 			# No fallback needed - this is a hard validation error
 			if data["score"] < 0:
@@ -85,95 +90,85 @@ class SubmitScoreView(APIView):
 					status=status.HTTP_400_BAD_REQUEST
 				)
 
-			# If detailed session fields or categories are provided, create GameSession
-			has_session_fields = any(
-				k in data for k in ("correct_count", "total_questions", "time_taken_seconds", "categories")
-			)
+			# Validate detail fields if provided (prevent invalid data from reaching database)
+			# No fallback - these are hard validation errors
+			if data.get("total_questions") is not None and data.get("total_questions") < 0:
+				return Response(
+					{"error": "total_questions cannot be negative"},
+					status=status.HTTP_400_BAD_REQUEST
+				)
+			if data.get("correct_count") is not None and data.get("correct_count") < 0:
+				return Response(
+					{"error": "correct_count cannot be negative"},
+					status=status.HTTP_400_BAD_REQUEST
+				)
+			if data.get("time_taken_seconds") is not None and data.get("time_taken_seconds") < 0:
+				return Response(
+					{"error": "time_taken_seconds cannot be negative"},
+					status=status.HTTP_400_BAD_REQUEST
+				)
 
 			# Database operations wrapped in try/except for error handling
 			# Fallback: Return 500 error if database write fails (e.g., constraint violation, connection issue)
 			try:
-				if has_session_fields:
-					# Validate session fields if provided (prevent invalid data from reaching database)
-					# No fallback - these are hard validation errors
-					if data.get("total_questions") is not None and data.get("total_questions") < 0:
-						return Response(
-							{"error": "total_questions cannot be negative"},
-							status=status.HTTP_400_BAD_REQUEST
-						)
-					if data.get("correct_count") is not None and data.get("correct_count") < 0:
-						return Response(
-							{"error": "correct_count cannot be negative"},
-							status=status.HTTP_400_BAD_REQUEST
-						)
-					if data.get("time_taken_seconds") is not None and data.get("time_taken_seconds") < 0:
-						return Response(
-							{"error": "time_taken_seconds cannot be negative"},
-							status=status.HTTP_400_BAD_REQUEST
+				# Append to the score ledger; detail fields are stored when provided
+				# (display names live in UserProfile, not on score rows)
+				session_id = data.get("session_id")
+				if session_id and data.get("session_token"):
+					# A signed session token proves ownership without touching the database
+					try:
+						read_session_token(data["session_token"], session_id, uid)
+					except SessionTokenError as e:
+						return Response({"error": str(e)}, status=status.HTTP_403_FORBIDDEN)
+				with transaction.atomic():
+					if session_id:
+						# Finalize the GameSession created by StartGameView with one conditional UPDATE
+						# (no read, and a session can only be finalized once)
+						finalized = GameSession.objects.filter(
+							id=session_id,
+							user_id=uid,
+							difficulty=data["difficulty"],
+							status="active",
+						).update(
+							status="finished",
+							score=data["score"],
+							correct_count=data.get("correct_count"),
+							time_taken_seconds=data.get("time_taken_seconds"),
+							finished_at=timezone.now(),
 						)
+						if not finalized:
+							return self._finalize_error(session_id, uid)
+						# The game is over: its answer key no longer needs a cache slot
+						transaction.on_commit(lambda: answer_keys.discard(session_id))
 
-					# Create GameSession record (detailed game data)
-					# Error handling: Database exceptions caught below
-					# Optimization: Store display_name to avoid Firebase lookups in leaderboard
-					gs = GameSession.objects.create(
+					entry = ScoreEntry.objects.create(
+						session_id=session_id,
 						user_id=uid,
-						display_name=display_name,  # Store display_name for leaderboard efficiency
 						difficulty=data["difficulty"],
-						categories=data.get("categories", []),
 						score=data["score"],
+						categories=data.get("categories"),
 						correct_count=data.get("correct_count"),
 						total_questions=data.get("total_questions"),
 						time_taken_seconds=data.get("time_taken_seconds"),
 					)
-					logger.info(f"GameSession created: {gs.id} for user {uid}")
-					
-					# Check if score is in top-5 for this difficulty
-					top_5_scores = GameSession.objects.filter(
-						difficulty=data["difficulty"]
-					).order_by("-score", "created_at")[:5]
-					
-					is_top_5 = False
-					rank = None
-					for idx, top_score in enumerate(top_5_scores, start=1):
-						if top_score.id == gs.id:
-							is_top_5 = True
-							rank = idx
-							break
-					
-					response_data = gs.to_response(display_name)
-					response_data["is_top_5"] = is_top_5
-					response_data["rank"] = rank
-					
-					return Response(response_data, status=status.HTTP_201_CREATED)
-
-				# Fallback path: Create lightweight UserScore if no session fields provided
-				# This allows backward compatibility with simpler score submissions
-				# Optimization: Store display_name to avoid Firebase lookups in leaderboard
-				us = UserScore.objects.create(
-					user_id=uid,
-					display_name=display_name,  # Store display_name for leaderboard efficiency
-					difficulty=data["difficulty"],
-					score=data["score"],
-				)
-				logger.info(f"UserScore created: {us.id} for user {uid}")
-				
+					# Index categories for category-filtered leaderboards
+					ScoreCategory.objects.bulk_create(ScoreCategory.rows_for(entry))
+					# Keep the best_per_user leaderboard current (writes only on a new personal best)
+					BestScore.record(uid, entry.difficulty, entry.score, entry.id, entry.created_at)
+				logger.info(f"ScoreEntry created: {entry.id} for user {uid}")
+
 				# Check if score is in top-5 for this difficulty
-				top_5_scores = UserScore.objects.filter(
-					difficulty=data["difficulty"]
-				).order_by("-score", "created_at")[:5]
-				
-				is_top_5 = False
-				rank = None
-				for idx, top_score in enumerate(top_5_scores, start=1):
-					if top_score.id == us.id:
-						is_top_5 = True
-						rank = idx
-						break
-				
-				response_data = us.to_response(display_name, include_message=True)
-				response_data["is_top_5"] = is_top_5
+				# Optimization: The cached k-th best score rules out most submissions with one
+				# comparison; only possible top-5 scores query the database
+				rank = top_k_cache.rank_of(entry)
+
+				# Profile name (including a custom one) first, then the token's name claim
+				# Fallback: None if neither is known (non-fatal)
+				display_name = display_names.resolve(uid) or getattr(request.user, "display_name", None)
+				response_data = entry.to_response(display_name)
+				response_data["is_top_5"] = rank is not None
 				response_data["rank"] = rank
-				
+
 				return Response(response_data, status=status.HTTP_201_CREATED)
 
 			except Exception as db_error:
@@ -196,7 +191,33 @@ class SubmitScoreView(APIView):
 			)
 
 
-class LeaderboardView(APIView):
+	def _finalize_error(self, session_id, uid):
+		"""Explain why a GameSession could not be finalized (only read on the error path)."""
+		session = GameSession.objects.filter(id=session_id).values("user_id", "status").first()
+		if session is None:
+			return Response(
+				{"error": "Game session not found"},
+				status=status.HTTP_404_NOT_FOUND
+			)
+		if session["user_id"] != uid:
+			logger.warning(f"SubmitScoreView: User {uid} attempted to submit a score for session {session_id} owned by {session['user_id']}")
+			return Response(
+				{"error": "You can only submit scores for your own game sessions"},
+				status=status.HTTP_403_FORBIDDEN
+			)
+		if session["status"] != "active":
+			return Response(
+				{"error": "Score has already been submitted for this game session"},
+				status=status.HTTP_409_CONFLICT
+			)
+		return Response(
+			{"error": "difficulty does not match the game session"},
+			status=status.HTTP_400_BAD_REQUEST
+		)
+
+
+class LeaderboardView(LazyAuthenticationMixin, APIView):
+	# Public and high-volume: the Authorization header is only verified if the view reads request.user
 	permission_classes = [AllowAny]
 
 	def get(self, request):
@@ -256,6 +277,45 @@ class LeaderboardView(APIView):
 					status=status.HTTP_400_BAD_REQUEST
 				)
 
+			# Validate mode parameter with default fallback
+			# Fallback: Default to "all" (every score is ranked); "best_per_user" ranks each user once
+			mode = request.query_params.get("mode", "all")
+			if mode not in ["all", "best_per_user"]:
+				return Response(
+					{"error": "Invalid mode. Must be 'all' or 'best_per_user'"},
+					status=status.HTTP_400_BAD_REQUEST
+				)
+
+			# Validate category parameter (optional filter)
+			category = (request.query_params.get("category") or "").strip()
+			if category and mode == "best_per_user":
+				return Response(
+					{"error": "category cannot be combined with mode=best_per_user"},
+					status=status.HTTP_400_BAD_REQUEST
+				)
+
+			start = (page - 1) * limit
+			end = start + limit
+
+			if mode == "best_per_user":
+				# Optimization: BestScore holds one row per user for each difficulty scope and
+				# timeframe period, so this is a single ordered index scan (no Python dedup)
+				try:
+					best_scores = BestScore.objects.filter(
+						timeframe=timeframe,
+						period_start=BestScore.period_start_for(timeframe),
+						difficulty_scope=difficulty or ALL_DIFFICULTIES,
+					)
+					total_entries = best_scores.count()
+					page_items = list(best_scores.order_by("-score", "achieved_at")[start:end])
+				except Exception as db_error:
+					logger.error(f"Database error in LeaderboardView: {str(db_error)}", exc_info=True)
+					return Response(
+						{"error": "Failed to fetch leaderboard"},
+						status=status.HTTP_500_INTERNAL_SERVER_ERROR
+					)
+				return self._build_response(page_items, page, limit, start, total_entries)
+
 			# timeframe filtering
 			now = timezone.now()
 			since = None
@@ -270,23 +330,27 @@ class LeaderboardView(APIView):
 			if since is not None:
 				filters["created_at__gte"] = since
 
-			# Fetch candidates from both models and merge
-			# Optimization: Use only() to fetch only needed fields, reducing memory and network overhead
+			# Fetch one page straight from the score ledger
+			# Optimization: Single ordered query over the (difficulty, -score, created_at) index;
+			# defer() skips the categories JSON which the leaderboard never returns
 			# Error handling: Database queries wrapped in try/except
 			# Fallback: Return 500 error if database query fails (connection issue, etc.)
 			try:
-				# Fetch 2x limit to account for merging and sorting
-				# Optimization: Only fetch fields needed for sorting and response
-				user_scores = list(
-					UserScore.objects.filter(**filters)
-					.only('id', 'user_id', 'score', 'difficulty', 'created_at')
-					.order_by("-score", "created_at")[: limit * 2]
-				)
-				sessions = list(
-					GameSession.objects.filter(**filters)
-					.only('id', 'user_id', 'score', 'difficulty', 'created_at')
-					.order_by("-score", "created_at")[: limit * 2]
-				)
+				if category:
+					# Optimization: ScoreCategory carries score/difficulty/created_at, so the filter and
+					# ordering use the (category, difficulty, -score, created_at) index; entries are joined
+					category_rows = ScoreCategory.objects.filter(category=category, **filters)
+					total_entries = category_rows.count()
+					page_items = [
+						row.entry for row in category_rows.select_related("entry")
+						.defer("entry__categories").order_by("-score", "created_at")[start:end]
+					]
+				else:
+					entries = ScoreEntry.objects.filter(**filters)
+					total_entries = entries.count()
+					page_items = list(
+						entries.defer("categories").order_by("-score", "created_at")[start:end]
+					)
 			except Exception as db_error:
 				# Database error handling: Log full error, return generic message
 				logger.error(f"Database error in LeaderboardView: {str(db_error)}", exc_info=True)
@@ -295,71 +359,7 @@ class LeaderboardView(APIView):
 					status=status.HTTP_500_INTERNAL_SERVER_ERROR
 				)
 
-			# Optimization: Sort in Python after fetching (needed for merging two querysets)
-			combined = user_scores + sessions
-			# sort by score desc, created_at asc (tie-breaker)
-			combined.sort(key=lambda o: (-o.score, o.created_at))
-
-			# pagination
-			start = (page - 1) * limit
-			end = start + limit
-			page_items = combined[start:end]
-
-			# Optimization: Use stored display_name from database (no Firebase lookups needed)
-			# Fallback: Only fetch from Firebase if display_name is not stored
-			# This significantly reduces Firebase API calls and improves performance
-			unique_user_ids = list(set(obj.user_id for obj in page_items))
-			display_names_cache = {}
-			
-			# Only fetch from Firebase for users without stored display_name
-			# Optimization: Batch Firebase lookups only for users missing display_name
-			users_needing_fetch = [
-				uid for uid in unique_user_ids
-				if not any(getattr(obj, 'user_id', None) == uid and getattr(obj, 'display_name', None) for obj in page_items)
-			]
-			
-			if firebase_auth and users_needing_fetch:
-				for user_id in users_needing_fetch:
-					try:
-						display_name = _get_display_name(user_id)
-						if display_name:
-							display_names_cache[user_id] = display_name
-					except Exception as name_error:
-						# Fallback: Log but continue - missing display name is acceptable
-						logger.debug(f"Could not fetch display name for {user_id}: {str(name_error)}")
-						display_names_cache[user_id] = None
-
-			# Build leaderboard response with per-item error handling
-			# Fallback strategy: Continue processing even if individual items fail
-			leaderboard: List[dict] = []
-			rank = start + 1
-			for obj in page_items:
-				# Optimization: Use stored display_name first, then fall back to Firebase cache
-				display_name = obj.display_name or display_names_cache.get(obj.user_id)
-
-				# Format response with fallback logic
-				# Fallback: Skip this entry if formatting fails (prevent one bad entry from breaking entire response)
-				try:
-					# Optimization: Exclude message field for leaderboard (reduces response size)
-					resp = obj.to_response(display_name, include_message=False)
-					resp["rank"] = rank
-					# normalize keys to match contract
-					resp["user_display"] = resp.pop("user_display_name", None)
-					leaderboard.append(resp)
-					rank += 1
-				except Exception as resp_error:
-					# Fallback: Log warning and skip this entry (graceful degradation)
-					logger.warning(f"Error formatting response for object {obj.id}: {str(resp_error)}")
-					continue
-
-			total_entries = len(combined)
-
-			return Response({
-				"leaderboard": leaderboard,
-				"page": page,
-				"limit": limit,
-				"total_entries": total_entries
-			})
+			return self._build_response(page_items, page, limit, start, total_entries)
 
 		except Exception as e:
 			logger.error(f"Unexpected error in LeaderboardView: {str(e)}", exc_info=True)
@@ -368,9 +368,50 @@ class LeaderboardView(APIView):
 				status=status.HTTP_500_INTERNAL_SERVER_ERROR
 			)
 
+	def _build_response(self, page_items, page, limit, start, total_entries):
+		"""Format one page of ScoreEntry or BestScore rows as the leaderboard response."""
+		# Optimization: Resolve every name on the page in one batch through the display-name
+		# directory (LRU, then one UserProfile query, then Firebase get_users only for misses)
+		display_names_cache = {}
+		try:
+			display_names_cache = display_names.resolve_many(obj.user_id for obj in page_items)
+		except Exception as name_error:
+			# Fallback: Log but continue - missing display name is acceptable
+			logger.debug(f"Could not resolve display names: {str(name_error)}")
+
+		# Build leaderboard response with per-item error handling
+		# Fallback strategy: Continue processing even if individual items fail
+		leaderboard: List[dict] = []
+		rank = start + 1
+		for obj in page_items:
+			display_name = display_names_cache.get(obj.user_id)
+
+			# Format response with fallback logic
+			# Fallback: Skip this entry if formatting fails (prevent one bad entry from breaking entire response)
+			try:
+				# Optimization: Exclude message field for leaderboard (reduces response size)
+				resp = obj.to_response(display_name, include_message=False)
+				resp["rank"] = rank
+				# normalize keys to match contract
+				resp["user_display"] = resp.pop("user_display_name", None)
+				leaderboard.append(resp)
+				rank += 1
+			except Exception as resp_error:
+				# Fallback: Log warning and skip this entry (graceful degradation)
+				logger.warning(f"Error formatting response for object {obj.id}: {str(resp_error)}")
+				continue
+
+		return Response({
+			"leaderboard": leaderboard,
+			"page": page,
+			"limit": limit,
+			"total_entries": total_entries
+		})
+
 
 class QuestionsView(APIView):
 	"""Get questions from the database with optional filtering by difficulty and limit."""
+	authentication_classes = []  # Public: never verifies a token, even if one is sent
 	permission_classes = [AllowAny]
 
 	def get(self, request):
@@ -640,26 +681,25 @@ class StartGameView(APIView):
             # Fallback: Return 500 error if database write fails
             try:
                 with transaction.atomic():
-                    # Get display name with fallback: try from request.user first, then fetch from Firebase
-                    # Fallback: Returns None if Firebase lookup fails (non-fatal)
-                    display_name = getattr(request.user, "display_name", None) or _get_display_name(uid)
-                    
                     # Atomic transaction: Either all operations succeed or all roll back
-                    # Optimization: Store display_name to avoid Firebase lookups in leaderboard
-                    session = GameSession.objects.create(
+                    session = GameSession(
                         user_id=uid,
-                        display_name=display_name,  # Store display_name for leaderboard efficiency
                         difficulty=difficulty,
                         categories=category_ids,
                         score=0,
                         total_questions=len(questions),
+                        answer_key=build_answer_key(questions),
                     )
 
                     # Set allowed hints (calculated as 1/5 of total questions)
+                    # Optimization: Computed before the insert so the session costs a single write
                     session.set_hint_limits()
-                    session.save()
+                    session.save(force_insert=True)
                     logger.info(f"GameSession created: {session.id} for user {uid} with {len(questions)} questions")
 
+                # Optimization: Answer key cached once committed, so hints skip the session read
+                answer_keys.put(session.id, session.answer_key)
+
                 # Optimization: Return minimal session info first, questions can be large
                 # Response structure optimized for frontend consumption
                 return Response({
@@ -668,6 +708,8 @@ class StartGameView(APIView):
                     "total_questions": len(questions),
                     "allowed_hints": session.allowed_hints,
                     "hints_used": session.hints_used,
+                    # Signed session id/uid/hint limit, checked by use-hint and submit-score without a read
+                    "session_token": issue_session_token(session),
                     "questions": questions,  # Full questions included for initial game setup
                 }, status=status.HTTP_201_CREATED)
 
@@ -701,8 +743,7 @@ class UpdateDisplayNameView(APIView):
         
         Error Handling Strategy:
         - Validates input format and length
-        - Updates all existing UserScore and GameSession records for the user
-        - Uses database transactions for atomicity
+        - Upserts the user's single UserProfile row (leaderboards resolve names from it)
         - Handles database errors gracefully
         """
         try:
@@ -729,23 +770,18 @@ class UpdateDisplayNameView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Update all existing records for this user with database transaction
-            # Error handling: Transaction ensures all-or-nothing update
+            # Update the user's profile row
+            # Optimization: Score rows do not store names, so a rename is one upsert
+            # however many scores the user has
             # Fallback: Return 500 error if database update fails
             try:
-                with transaction.atomic():
-                    # Atomic transaction: Update all UserScore and GameSession records
-                    updated_scores = UserScore.objects.filter(user_id=uid).update(display_name=display_name)
-                    updated_sessions = GameSession.objects.filter(user_id=uid).update(display_name=display_name)
-                    
-                    logger.info(f"Updated display_name for user {uid}: {updated_scores} scores, {updated_sessions} sessions")
-                    
-                    return Response({
-                        "message": "Display name updated successfully",
-                        "display_name": display_name,
-                        "updated_scores": updated_scores,
-                        "updated_sessions": updated_sessions,
-                    }, status=status.HTTP_200_OK)
+                display_names.rename(uid, display_name)
+                logger.info(f"Updated display_name for user {uid}")
+
+                return Response({
+                    "message": "Display name updated successfully",
+                    "display_name": display_name,
+                }, status=status.HTTP_200_OK)
 
             except Exception as db_error:
                 # Database error handling: Log full error, return generic message
@@ -774,7 +810,7 @@ class UpdateDisplayNameView(APIView):
 
 
 class UseHintView(APIView):
-    """Removes one incorrect answer and updates hint usage."""
+    """Removes one incorrect answer (by question index, from the server-held answer key) and updates hint usage."""
     authentication_classes = [FirebaseAuthentication]
     permission_classes = [IsAuthenticated]
 
@@ -784,8 +820,8 @@ class UseHintView(APIView):
         
         Error Handling Strategy:
         - Validates authentication, session ownership, and hint availability
-        - Uses database transactions for atomic updates
-        - Prevents unauthorized access with ownership checks
+        - Checks the signed session token from start-game instead of reading the session
+        - Records the hint with one conditional UPDATE (no lost updates, no overspending)
         - Validates all inputs before processing
         """
         try:
@@ -809,102 +845,70 @@ class UseHintView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Fetch session with error handling
-            # Fallback: Return 404 if session doesn't exist
-            # Optimization: Only fetch fields needed for validation and update
-            try:
-                session = GameSession.objects.only(
-                    'id', 'user_id', 'allowed_hints', 'hints_used'
-                ).get(id=session_id)
-            except GameSession.DoesNotExist:
-                logger.warning(f"UseHintView: Session {session_id} not found")
-                return Response(
-                    {"error": "Game session not found"},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-
-            # Security check: Ownership validation
-            # Fallback: Return 403 Forbidden if user doesn't own session (prevents unauthorized access)
-            if session.user_id != uid:
-                logger.warning(f"UseHintView: User {uid} attempted to use hint for session {session_id} owned by {session.user_id}")
-                return Response(
-                    {"error": "You can only use hints for your own game sessions"},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-
-            # Validate hint availability
-            # No fallback - these are hard validation errors
-            if session.allowed_hints is None:
-                logger.warning(f"UseHintView: Session {session_id} has no allowed_hints set")
-                return Response(
-                    {"error": "Game session not properly initialized"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            if session.hints_used >= session.allowed_hints:
-                return Response(
-                    {"error": "No hints remaining"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Validate request data
-            correct_answer = request.data.get("correct_answer")
-            incorrect_answers = request.data.get("incorrect_answers")
-
-            if not correct_answer:
-                return Response(
-                    {"error": "correct_answer is required"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            if not incorrect_answers:
-                return Response(
-                    {"error": "incorrect_answers is required"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            # Security check: Ownership and hint limit from the signed session token
+            # Optimization: No database read; forged, expired or foreign tokens are rejected here
+            # Fallback: Without a token, the conditional UPDATE below enforces both
+            session_token = request.data.get("session_token")
+            if session_token:
+                try:
+                    claims = read_session_token(session_token, session_id, uid)
+                except SessionTokenError as e:
+                    logger.warning(f"UseHintView: User {uid} sent a bad token for session {session_id}: {e}")
+                    return Response(
+                        {"error": str(e)},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
+                if not claims["allowed_hints"]:
+                    return Response(
+                        {"error": "No hints remaining"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
 
-            if not isinstance(incorrect_answers, list):
+            # Validate request data: hints are requested by question index only
+            # (the answers come from the server-held answer key, not the client)
+            try:
+                question_index = int(request.data.get("question_index"))
+                eliminated = int(request.data.get("eliminated", 0))
+            except (ValueError, TypeError):
                 return Response(
-                    {"error": "incorrect_answers must be a list"},
+                    {"error": "question_index is required and must be an integer"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Cannot remove an incorrect answer if none remain
-            if len(incorrect_answers) == 0:
+            # Look up the option to remove before spending a hint
+            # Optimization: Cached answer key, O(1) per hint; the session row is the fallback
+            removed_index = answer_keys.hint(session_id, question_index, eliminated)
+            if removed_index is None:
+                if answer_keys.get(session_id) is None:
+                    return self._hint_error(session_id, uid, "Hints are not available for this game session")
                 return Response(
-                    {"error": "No incorrect answers available to remove"},
+                    {"error": "No incorrect answers available to remove for this question"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Remove ONE incorrect answer
-            removed = incorrect_answers[0]  # simple removal strategy
-            remaining_incorrect = incorrect_answers[1:]  # keep the rest
-
-            # Update session with database transaction for atomicity
-            # Error handling: Transaction ensures hint count is updated atomically
+            # Record the hint: UPDATE ... SET hints_used = hints_used + 1 WHERE hints_used < allowed_hints
+            # Error handling: The single statement is atomic, so concurrent hints cannot overspend
             # Fallback: Return 500 error if database update fails
             try:
-                with transaction.atomic():
-                    # Atomic transaction: Increment hint count and save in one operation
-                    session.hints_used += 1
-                    session.save()
-                    logger.info(f"Hint used for session {session_id} by user {uid}. Hints used: {session.hints_used}/{session.allowed_hints}")
-
-                return Response({
-                    "removed_answer": removed,
-                    "remaining_answers": [correct_answer] + remaining_incorrect,
-                    "hints_used": session.hints_used,
-                    "hints_remaining": session.allowed_hints - session.hints_used,
-                })
-
+                counters = GameSession.consume_hint(session_id, uid)
             except Exception as db_error:
                 # Database error handling: Log full error, return generic message
-                # Fallback: Return 500 error (transaction ensures no partial update)
                 logger.error(f"Database error in UseHintView: {str(db_error)}", exc_info=True)
                 return Response(
                     {"error": "Failed to update hint usage"},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
+            if counters is None:
+                return self._hint_error(session_id, uid)
+
+            hints_used, allowed_hints = counters
+            logger.info(f"Hint used for session {session_id} by user {uid}. Hints used: {hints_used}/{allowed_hints}")
+            return Response({
+                "question_index": question_index,
+                "removed_index": removed_index,
+                "hints_used": hints_used,
+                "hints_remaining": allowed_hints - hints_used,
+            })
 
         except Exception as e:
             logger.error(f"Unexpected error in UseHintView: {str(e)}", exc_info=True)
@@ -913,6 +917,37 @@ class UseHintView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _hint_error(self, session_id, uid, default_error="No hints remaining"):
+        """Explain why no hint was recorded (only read on the error path)."""
+        session = GameSession.objects.filter(id=session_id).values("user_id", "allowed_hints", "status").first()
+        if session is None:
+            logger.warning(f"UseHintView: Session {session_id} not found")
+            return Response(
+                {"error": "Game session not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if session["user_id"] != uid:
+            logger.warning(f"UseHintView: User {uid} attempted to use hint for session {session_id} owned by {session['user_id']}")
+            return Response(
+                {"error": "You can only use hints for your own game sessions"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if session["status"] != "active":
+            return Response(
+                {"error": "Game session has already finished"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if session["allowed_hints"] is None:
+            logger.warning(f"UseHintView: Session {session_id} has no allowed_hints set")
+            return Response(
+                {"error": "Game session not properly initialized"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(
+            {"error": default_error},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
 
 '''
 * Multiplayer Session Management
@@ -924,6 +959,29 @@ class UseHintView(APIView):
 '''
 
 
+MULTIPLAYER_ERRORS = {
+    "not_found": ("Session not found", status.HTTP_404_NOT_FOUND),
+    "invalid_code": ("Invalid join code. Session not found.", status.HTTP_404_NOT_FOUND),
+    "not_player": ("You are not a player in this session. Please join the session first.", status.HTTP_403_FORBIDDEN),
+    "not_started": ("Session has not started yet", status.HTTP_400_BAD_REQUEST),
+    "finished": ("Session has already finished", status.HTTP_400_BAD_REQUEST),
+    "expired": ("Session has expired", status.HTTP_400_BAD_REQUEST),
+    "full": ("Session is full", status.HTTP_400_BAD_REQUEST),
+    "busy": ("Session is busy, please try again", status.HTTP_409_CONFLICT),
+    "invalid_question": ("Invalid question_index for this session", status.HTTP_400_BAD_REQUEST),
+}
+
+
+PLAYERS_PAGE_SIZE = 50
+MAX_PLAYERS_PAGE_SIZE = 200  # Cap for performance (prevent DoS)
+
+
+def multiplayer_error_response(error):
+    """Response for a multiplayer.MultiplayerError raised by a join, submit or answer."""
+    message, code = MULTIPLAYER_ERRORS[error.reason]
+    return Response({"error": message}, status=code)
+
+
 class CreateMultiplayerView(APIView):
     """Create a new multiplayer session. The creator becomes the first player."""
     authentication_classes = [FirebaseAuthentication]
@@ -934,7 +992,7 @@ class CreateMultiplayerView(APIView):
         Create a new multiplayer session.
         
         Required fields:
-        - number_of_players: Target number of players (2-10)
+        - number_of_players: Target number of players (2 to MULTIPLAYER_MAX_PLAYERS, 500 by default)
         - difficulty: "easy", "medium", or "hard"
         - total_questions: Number of questions (1-50)
         
@@ -952,7 +1010,7 @@ class CreateMultiplayerView(APIView):
                 )
 
             # Get display name from authenticated user
-            display_name = getattr(request.user, "display_name", None) or _get_display_name(uid)
+            display_name = getattr(request.user, "display_name", None) or display_names.resolve(uid)
 
             # Validate request data
             serializer = CreateMultiplayerSerializer(data=request.data)
@@ -965,29 +1023,33 @@ class CreateMultiplayerView(APIView):
 
             # Create session with creator as first player
             with transaction.atomic():
-                join_code = MultiplayerSession.generate_join_code()
-                session = MultiplayerSession.objects.create(
-                    join_code=join_code,
+                # Optimization: The code comes from a permuted counter (no exists() probing);
+                # the unique constraint catches the rare code that is still in use
+                session = join_codes.create_session(
                     board_seed=board_seed,
                     number_of_players=number_of_players,
                     difficulty=difficulty,
                     total_questions=total_questions,
-                    players=[uid],  # Creator is first player
+                    player_count=1,  # Creator is first player
                     status="waiting"
                 )
-                logger.info(f"MultiplayerSession created: {session.session_id} (join_code: {join_code}) by user {uid}")
+                MultiplayerPlayer.objects.create(session=session, user_id=uid, changed_version=session.version)
+                publish_multiplayer_session(session)
+                logger.info(f"MultiplayerSession created: {session.session_id} (join_code: {session.join_code}) by user {uid}")
 
             return Response({
                 "session_id": str(session.session_id),
                 "join_code": session.join_code,
                 "board_seed": session.board_seed,
-                "players": session.players,
+                "players": [uid],
                 "number_of_players": session.number_of_players,
-                "current_players": len(session.players),
+                "current_players": session.player_count,
                 "difficulty": session.difficulty,
                 "total_questions": session.total_questions,
                 "status": session.status,
-                "created_at": session.created_at.isoformat()
+                "version": session.version,
+                "created_at": session.created_at.isoformat(),
+                "stream_token": issue_stream_token(session.session_id, uid),
             }, status=status.HTTP_201_CREATED)
 
         except serializers.ValidationError as e:
@@ -1030,60 +1092,36 @@ class JoinMultiplayerView(APIView):
             serializer.is_valid(raise_exception=True)
             join_code = serializer.validated_data["join_code"].upper()  # Normalize to uppercase
 
-            # Fetch session by join_code
+            # Optimization: Claim the seat with a version compare-and-swap and a one-row
+            # insert, instead of locking the session and rewriting its whole player list
             try:
-                session = MultiplayerSession.objects.select_for_update().get(join_code=join_code)
-            except MultiplayerSession.DoesNotExist:
-                return Response(
-                    {"error": "Invalid join code. Session not found."},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-
-            # Check if session is already finished
-            if session.status == "finished":
-                return Response(
-                    {"error": "Session has already finished"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Check if session is full
-            if session.is_full():
-                return Response(
-                    {"error": "Session is full"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Add player if not already in session
-            with transaction.atomic():
-                # Convert players list to mutable list if needed (for JSONField)
-                players_list = list(session.players) if session.players else []
-                
-                if uid not in players_list:
-                    players_list.append(uid)
-                    session.players = players_list
-                    
-                    # If session is now full, start the game
-                    if session.is_full():
-                        session.status = "active"
-                        session.start_time = timezone.now()
-                        logger.info(f"MultiplayerSession {session.session_id} started - all players joined")
-                    
-                    session.save()
-                    logger.info(f"User {uid} joined session {session.session_id}. Players: {session.players}")
-                else:
-                    logger.info(f"User {uid} already in session {session.session_id}")
+                session, joined = multiplayer.join_session(join_code, uid)
+            except multiplayer.MultiplayerError as e:
+                return multiplayer_error_response(e)
+
+            if joined:
+                publish_multiplayer_session(session)
+                logger.info(f"User {uid} joined session {session.session_id} ({session.player_count}/{session.number_of_players})")
+                if session.status == "active":
+                    logger.info(f"MultiplayerSession {session.session_id} started - all players joined")
+            else:
+                logger.info(f"User {uid} already in session {session.session_id}")
 
             return Response({
                 "session_id": str(session.session_id),
                 "join_code": session.join_code,
-                "players": session.players,
-                "current_players": len(session.players),
+                # Large rooms list the first joiners only (see render_multiplayer_session)
+                "players": [player.user_id for player in session.roster(limit=settings.MULTIPLAYER_SNAPSHOT_PLAYERS)],
+                "players_truncated": session.player_count > settings.MULTIPLAYER_SNAPSHOT_PLAYERS,
+                "current_players": session.player_count,
                 "number_of_players": session.number_of_players,
                 "status": session.status,
                 "board_seed": session.board_seed,
                 "difficulty": session.difficulty,
                 "total_questions": session.total_questions,
-                "start_time": session.start_time.isoformat() if session.start_time else None
+                "start_time": session.start_time.isoformat() if session.start_time else None,
+                "version": session.version,
+                "stream_token": issue_stream_token(session.session_id, uid),
             }, status=status.HTTP_200_OK)
 
         except serializers.ValidationError as e:
@@ -1139,79 +1177,41 @@ class SubmitMultiplayerScoreView(APIView):
             correct_count = serializer.validated_data.get("correct_count")
             time_taken_seconds = serializer.validated_data.get("time_taken_seconds")
 
-            # Fetch session with lock to prevent race conditions
+            # Optimization: Write only this player's row; the session row just gets its
+            # counters and version swapped (finishing the game on the last submission)
             try:
-                session = MultiplayerSession.objects.select_for_update().get(session_id=session_id)
-            except MultiplayerSession.DoesNotExist:
-                return Response(
-                    {"error": "Session not found"},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-
-            # Verify user is part of the session
-            players_list = list(session.players) if session.players else []
-            if uid not in players_list:
-                logger.warning(f"User {uid} not in session {session_id}. Players: {players_list}")
-                return Response(
-                    {"error": f"You are not a player in this session. Please join the session first."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-
-            # Verify session is active
-            if session.status == "waiting":
-                return Response(
-                    {"error": "Session has not started yet"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+                session = multiplayer.submit_score(session_id, uid, score_value, correct_count, time_taken_seconds)
+            except multiplayer.MultiplayerError as e:
+                if e.reason == "not_player":
+                    logger.warning(f"User {uid} not in session {session_id}")
+                return multiplayer_error_response(e)
 
+            publish_multiplayer_session(session)
             if session.status == "finished":
-                return Response(
-                    {"error": "Session has already finished"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Store score with additional metadata
-            score_data = {
-                "score": score_value,
-                "correct_count": correct_count,
-                "time_taken_seconds": time_taken_seconds,
-                "submitted_at": timezone.now().isoformat()
-            }
-            
-            with transaction.atomic():
-                session.scores[uid] = score_data
-                
-                # Check if all players have submitted
-                if session.all_players_submitted():
-                    session.status = "finished"
-                    session.finished_at = timezone.now()
-                    # Compute winners
-                    session.winners = session.compute_winners()
-                    logger.info(f"MultiplayerSession {session.session_id} finished. Winners: {session.winners}")
-                else:
-                    session.status = "active"
-                
-                session.save()
+                logger.info(f"MultiplayerSession {session.session_id} finished. Winners: {session.winners}")
 
-            # Build response with player details
+            # Build response with player details (the top of the standings in large rooms)
+            truncated = session.player_count > settings.MULTIPLAYER_SNAPSHOT_PLAYERS
             player_scores = {}
-            for player_id in session.players:
-                if player_id in session.scores:
-                    score_info = session.scores[player_id]
-                    player_scores[player_id] = {
-                        "score": score_info.get("score") if isinstance(score_info, dict) else score_info,
-                        "correct_count": score_info.get("correct_count") if isinstance(score_info, dict) else None,
-                        "time_taken_seconds": score_info.get("time_taken_seconds") if isinstance(score_info, dict) else None,
+            for player in (session.standings(limit=settings.MULTIPLAYER_SNAPSHOT_PLAYERS) if truncated else session.roster()):
+                if player.submitted:
+                    player_scores[player.user_id] = {
+                        "score": player.score,
+                        "correct_count": player.correct_count,
+                        "time_taken_seconds": player.time_taken_seconds,
                     }
                 else:
-                    player_scores[player_id] = None  # Player hasn't submitted yet
+                    player_scores[player.user_id] = None  # Player hasn't submitted yet
 
             response_data = {
                 "session_id": str(session.session_id),
                 "status": session.status,
                 "scores": player_scores,
-                "players_submitted": len(session.scores),
-                "total_players": len(session.players),
+                "players_submitted": session.submitted_count,
+                "players_truncated": truncated,
+                "total_players": session.player_count,
+                "version": session.version,
+                "stream_token": issue_stream_token(session.session_id, uid),
             }
 
             # Include winners if game is finished
@@ -1234,6 +1234,175 @@ class SubmitMultiplayerScoreView(APIView):
             )
 
 
+
+class MultiplayerAnswerView(APIView):
+    """Report one answer as the player goes; feeds the live standings of the room."""
+    authentication_classes = [FirebaseAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """
+        POST /api/multiplayer/answer {"session_id", "question_index", "correct"}
+
+        Returns 202 when the answer is recorded and 200 if it was already recorded
+        (safe to retry), with the player's answered/correct counts so far. The final
+        score is still sent to multiplayer/submit.
+        """
+        uid = getattr(request.user, "uid", None)
+        if not uid:
+            return Response({"error": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+        serializer = MultiplayerAnswerSerializer(data=request.data)
+        if not serializer.is_valid():
+            error_msg = "; ".join(f"{k}: {v}" for k, v in serializer.errors.items())
+            return Response({"error": error_msg}, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        # Optimization: Checked against the room held in memory and buffered; answers reach
+        # the database in batches and the standings are pushed once per flush, not per answer
+        try:
+            accepted, (answered, correct) = answer_buffer.record(
+                data["session_id"], uid, data["question_index"], data["correct"]
+            )
+        except multiplayer.MultiplayerError as e:
+            return multiplayer_error_response(e)
+        except Exception as e:
+            logger.error(f"Unexpected error in MultiplayerAnswerView: {str(e)}", exc_info=True)
+            return Response(
+                {"error": "An unexpected error occurred"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        return Response({
+            "accepted": accepted,
+            "question_index": data["question_index"],
+            "answered": answered,
+            "correct": correct,
+        }, status=status.HTTP_202_ACCEPTED if accepted else status.HTTP_200_OK)
+
+def render_player(player, names):
+    """One player's entry in player_scores (and in player pages)."""
+    player_id = player.user_id
+    display_name = names.get(player_id) or f"Player_{player_id[-4:]}"
+    if player.submitted:
+        return {
+            "display_name": display_name,
+            "score": player.score,
+            "correct_count": player.correct_count,
+            "time_taken_seconds": player.time_taken_seconds,
+            "submitted": True
+        }
+    return {
+        "display_name": display_name,
+        "score": None,
+        "submitted": False
+    }
+
+
+def render_multiplayer_session(session, since_version=None):
+    """
+    The session state clients see: players with display names, scores, winners.
+
+    Shared by GetMultiplayerSessionView and the push channel, so a change is
+    rendered once when it happens rather than once per polling client. With
+    `since_version`, player_scores only holds the players whose entry changed
+    after that version (a delta); everything else is small and always included.
+
+    Rooms with more than MULTIPLAYER_SNAPSHOT_PLAYERS players get a bounded
+    snapshot instead (players_truncated): the first joiners in `players` and the
+    top of the standings in `player_scores`, with the rest paged through
+    MultiplayerPlayersView. Such snapshots ignore `since_version`.
+    """
+    limit = settings.MULTIPLAYER_SNAPSHOT_PLAYERS
+    truncated = session.player_count > limit
+    if truncated:
+        # Optimization: Two LIMIT queries on the roster/standings indexes, so rendering
+        # and pushing a change costs the same whatever the size of the room
+        roster = session.roster(limit=limit)
+        rendered = session.standings(limit=limit)
+        since_version = None
+    else:
+        roster = session.roster()
+        rendered = roster
+        if since_version is not None:
+            rendered = [player for player in roster if player.changed_version > since_version]
+
+    # Optimization: Resolve every rendered player (and therefore every winner) in one batch
+    names = display_names.resolve_many([player.user_id for player in rendered] + list(session.winners or []))
+    player_scores = {player.user_id: render_player(player, names) for player in rendered}
+
+    response_data = {
+        "session_id": str(session.session_id),
+        "join_code": session.join_code,
+        "board_seed": session.board_seed,
+        "status": session.status,
+        "difficulty": session.difficulty,
+        "total_questions": session.total_questions,
+        "number_of_players": session.number_of_players,
+        "current_players": session.player_count,
+        "players": [player.user_id for player in roster],
+        "player_scores": player_scores,
+        "players_submitted": session.submitted_count,
+        "players_truncated": truncated,
+        "top_score": session.top_score,
+        "created_at": session.created_at.isoformat(),
+        "start_time": session.start_time.isoformat() if session.start_time else None,
+        "version": session.version,
+    }
+    if since_version is not None:
+        response_data["since_version"] = since_version
+    if session.status == "active":
+        # Live standings: who currently holds top_score
+        response_data["leaders"] = session.winners
+
+    # Include finished info if game is finished
+    if session.status == "finished":
+        response_data["finished_at"] = session.finished_at.isoformat() if session.finished_at else None
+        response_data["winners"] = session.winners
+        
+        # Add winner display names (every winner holds top_score)
+        if session.winners:
+            response_data["winner_details"] = [
+                {"user_id": winner_id, "display_name": names.get(winner_id), "score": session.top_score}
+                for winner_id in session.winners
+            ]
+
+    return response_data
+
+
+def multiplayer_etag(session_id, version):
+    """ETag of a session state; includes the id because join codes can be reused."""
+    return f'"{uuid.UUID(str(session_id)).hex}.{version}"'
+
+
+def parse_etags(header):
+    """ETags listed in an If-None-Match header (weak validators compare equal, as for GET)."""
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+def load_multiplayer_session(session_id):
+    """Render a session from the database (for a process whose hub has not seen it yet), or None."""
+    session = MultiplayerSession.objects.filter(session_id=session_id).first()
+    if session is None:
+        return None
+    data = render_multiplayer_session(session)
+    snapshots.put(session.session_id, session.join_code, session.version, data)
+    return data
+
+
+def publish_multiplayer_session(session):
+    """Push the session's new state to its event-stream subscribers and the snapshot cache once the change commits."""
+    def publish():
+        # Rendered once per change: pushed to streams and cached for GetMultiplayerSessionView
+        data = render_multiplayer_session(session)
+        snapshots.put(session.session_id, session.join_code, session.version, data)
+        get_hub().publish(session.session_id, data, version=session.version)
+        if session.status in ("finished", "expired"):
+            # Final live standings; answers arriving after this are rejected
+            answer_buffer.close(session.session_id, session.status)
+
+    transaction.on_commit(publish)
+
+
 class GetMultiplayerSessionView(APIView):
     """Get the current status of a multiplayer session by session_id or join_code."""
     authentication_classes = [FirebaseAuthentication]
@@ -1260,16 +1429,12 @@ class GetMultiplayerSessionView(APIView):
 
             # Support both session_id (from URL) and join_code (from query param)
             join_code = request.query_params.get("join_code")
+            not_found = "Session not found"
             
             if join_code:
                 # Fetch by join_code (for by-code endpoint)
-                try:
-                    session = MultiplayerSession.objects.get(join_code=join_code.upper())
-                except MultiplayerSession.DoesNotExist:
-                    return Response(
-                        {"error": "Session not found with that join code"},
-                        status=status.HTTP_404_NOT_FOUND
-                    )
+                lookup = {"join_code": join_code.upper()}
+                not_found = "Session not found with that join code"
             elif session_id:
                 # Fetch by UUID (for UUID endpoint)
                 # Validate session_id format
@@ -1281,82 +1446,400 @@ class GetMultiplayerSessionView(APIView):
                         status=status.HTTP_400_BAD_REQUEST
                     )
 
-                # Fetch session by UUID
-                try:
-                    session = MultiplayerSession.objects.get(session_id=session_id)
-                except MultiplayerSession.DoesNotExist:
-                    return Response(
-                        {"error": "Session not found"},
-                        status=status.HTTP_404_NOT_FOUND
-                    )
+                lookup = {"session_id": session_id}
             else:
                 return Response(
                     {"error": "Either session_id (UUID) or join_code query parameter is required"},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Build player scores with display names
-            player_scores = {}
-            players_list = list(session.players) if session.players else []
-            for player_id in players_list:
-                display_name = _get_display_name(player_id) if firebase_auth else f"Player_{player_id[-4:]}"
-                if player_id in session.scores:
-                    score_info = session.scores[player_id]
-                    score_value = score_info.get("score") if isinstance(score_info, dict) else score_info
-                    player_scores[player_id] = {
-                        "display_name": display_name,
-                        "score": score_value,
-                        "correct_count": score_info.get("correct_count") if isinstance(score_info, dict) else None,
-                        "time_taken_seconds": score_info.get("time_taken_seconds") if isinstance(score_info, dict) else None,
-                        "submitted": True
-                    }
-                else:
-                    player_scores[player_id] = {
-                        "display_name": display_name,
-                        "score": None,
-                        "submitted": False
-                    }
+            # Conditional GET: the client's version from If-None-Match or ?since_version=
+            since_version = request.query_params.get("since_version")
+            if since_version is not None:
+                try:
+                    since_version = int(since_version)
+                except ValueError:
+                    return Response(
+                        {"error": "since_version must be an integer"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+            if_none_match = request.headers.get("If-None-Match")
+
+            # Optimization: Read only the session's version (one indexed integer), which
+            # answers an idle poll and says whether the cached snapshot is current
+            current = MultiplayerSession.objects.filter(**lookup).values_list("session_id", "version").first()
+            if current is None:
+                return Response({"error": not_found}, status=status.HTTP_404_NOT_FOUND)
+            etag = multiplayer_etag(*current)
+            if (if_none_match and etag in parse_etags(if_none_match)) or (
+                since_version is not None and since_version >= current[1]
+            ):
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+            # Optimization: Serve the snapshot rendered when the session last changed, if it is
+            # still this version of this session. A delta (since_version) is rendered from the
+            # database; large rooms never send deltas
+            cached = snapshots.get(**({"join_code": lookup["join_code"]} if join_code else {"session_id": session_id}))
+            if cached is not None:
+                version, data = cached
+                if (version, data["session_id"]) == (current[1], str(current[0])) and (
+                    since_version is None or data.get("players_truncated")
+                ):
+                    response_data = dict(data)
+                    if uid:
+                        response_data["stream_token"] = issue_stream_token(data["session_id"], uid)
+                    return Response(response_data, status=status.HTTP_200_OK, headers={"ETag": etag})
+
+            # Fetch the full session
+            try:
+                session = MultiplayerSession.objects.get(**lookup)
+            except MultiplayerSession.DoesNotExist:
+                return Response(
+                    {"error": not_found},
+                    status=status.HTTP_404_NOT_FOUND
+                )
 
-            response_data = {
-                "session_id": str(session.session_id),
-                "join_code": session.join_code,
-                "board_seed": session.board_seed,
-                "status": session.status,
-                "difficulty": session.difficulty,
-                "total_questions": session.total_questions,
-                "number_of_players": session.number_of_players,
-                "current_players": len(session.players),
-                "players": session.players,
-                "player_scores": player_scores,
-                "players_submitted": len(session.scores),
-                "created_at": session.created_at.isoformat(),
-                "start_time": session.start_time.isoformat() if session.start_time else None,
-            }
+            # With since_version, player_scores only carries players that changed since then
+            response_data = render_multiplayer_session(session, since_version=since_version)
+            if since_version is None:
+                # Fallback: Cache missed or was stale (first read, eviction, or a change made in another process)
+                snapshots.put(session.session_id, session.join_code, session.version, dict(response_data))
+            if uid:
+                # Lets this client open the session's event stream (see MultiplayerEventsView)
+                response_data["stream_token"] = issue_stream_token(session.session_id, uid)
+            return Response(
+                response_data,
+                status=status.HTTP_200_OK,
+                headers={"ETag": multiplayer_etag(session.session_id, session.version)},
+            )
 
-            # Include finished info if game is finished
-            if session.status == "finished":
-                response_data["finished_at"] = session.finished_at.isoformat() if session.finished_at else None
-                response_data["winners"] = session.winners
-                
-                # Add winner display names
-                if session.winners:
-                    winner_details = []
-                    for winner_id in session.winners:
-                        winner_display_name = _get_display_name(winner_id) if firebase_auth else None
-                        winner_score = session.scores.get(winner_id, {})
-                        winner_score_value = winner_score.get("score") if isinstance(winner_score, dict) else winner_score
-                        winner_details.append({
-                            "user_id": winner_id,
-                            "display_name": winner_display_name,
-                            "score": winner_score_value
-                        })
-                    response_data["winner_details"] = winner_details
+        except Exception as e:
+            logger.error(f"Unexpected error in GetMultiplayerSessionView: {str(e)}", exc_info=True)
+            return Response(
+                {"error": "An unexpected error occurred"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
 
-            return Response(response_data, status=status.HTTP_200_OK)
+
+class MultiplayerPlayersView(APIView):
+    """One page of a session's players, in join order or by score (rooms too large to inline)."""
+    authentication_classes = [FirebaseAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, session_id):
+        """
+        GET /api/multiplayer/<session_id>/players?order=joined|score&page=1&page_size=50
+
+        With order=score, submitted players carry their 1-based position in the standings.
+        """
+        try:
+            order = request.query_params.get("order", "joined")
+            if order not in ["joined", "score"]:
+                return Response(
+                    {"error": "Invalid order. Must be 'joined' or 'score'"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # Fallback: Default to page 1 if invalid (graceful degradation)
+            try:
+                page = max(1, int(request.query_params.get("page", 1)))
+            except (ValueError, TypeError):
+                page = 1
+            try:
+                page_size = int(request.query_params.get("page_size", PLAYERS_PAGE_SIZE))
+            except (ValueError, TypeError):
+                return Response(
+                    {"error": "page_size must be an integer"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if page_size < 1:
+                return Response(
+                    {"error": "page_size must be greater than 0"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            page_size = min(page_size, MAX_PLAYERS_PAGE_SIZE)
+
+            session = MultiplayerSession.objects.filter(session_id=session_id).first()
+            if session is None:
+                return Response({"error": "Session not found"}, status=status.HTTP_404_NOT_FOUND)
+
+            # Optimization: One LIMIT/OFFSET query on the roster or standings index per page
+            offset = (page - 1) * page_size
+            rows = (session.standings if order == "score" else session.roster)(limit=page_size, offset=offset)
+            names = display_names.resolve_many([player.user_id for player in rows])
+            players = []
+            for position, player in enumerate(rows, start=offset + 1):
+                entry = {"user_id": player.user_id, **render_player(player, names)}
+                if order == "score" and player.submitted:
+                    entry["position"] = position
+                players.append(entry)
+
+            return Response({
+                "session_id": str(session.session_id),
+                "order": order,
+                "page": page,
+                "page_size": page_size,
+                "total": session.player_count,
+                "has_next": offset + len(rows) < session.player_count,
+                "version": session.version,
+                "players": players,
+            }, status=status.HTTP_200_OK)
 
         except Exception as e:
-            logger.error(f"Unexpected error in GetMultiplayerSessionView: {str(e)}", exc_info=True)
+            logger.error(f"Unexpected error in MultiplayerPlayersView: {str(e)}", exc_info=True)
             return Response(
                 {"error": "An unexpected error occurred"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+
+
+class MatchmakingQueueView(APIView):
+    """Quick match: queue for a room of a given difficulty instead of sharing a join code."""
+    authentication_classes = [FirebaseAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """
+        POST /api/matchmaking/queue {"difficulty": "easy"|"medium"|"hard"}
+
+        Returns 202 with the queue status, or 200 with the session once a room has formed.
+        """
+        uid = getattr(request.user, "uid", None)
+        if not uid:
+            return Response({"error": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+        difficulty = request.data.get("difficulty", "easy")
+        if not isinstance(difficulty, str) or difficulty not in dict(DIFFICULTY_CHOICES):
+            return Response(
+                {"error": "Invalid difficulty. Must be 'easy', 'medium', or 'hard'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Optimization: Queueing is an in-memory O(1) operation; the database is only
+        # touched once, when a full room is handed off as a single transaction
+        return self._respond(uid, matchmaking.enqueue(uid, difficulty))
+
+    def get(self, request):
+        """GET /api/matchmaking/queue - poll the caller's queue status (also forms rooms whose wait is over)."""
+        uid = getattr(request.user, "uid", None)
+        if not uid:
+            return Response({"error": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+        ticket = matchmaking.status(uid)
+        if ticket is None:
+            return Response({"error": "Not in the matchmaking queue"}, status=status.HTTP_404_NOT_FOUND)
+        return self._respond(uid, ticket)
+
+    def delete(self, request):
+        """DELETE /api/matchmaking/queue - leave the queue (409 if a room is already being formed)."""
+        uid = getattr(request.user, "uid", None)
+        if not uid:
+            return Response({"error": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+        if matchmaking.cancel(uid):
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        ticket = matchmaking.status(uid, form=False)
+        if ticket is None:
+            return Response({"error": "Not in the matchmaking queue"}, status=status.HTTP_404_NOT_FOUND)
+        return self._respond(uid, ticket, http_status=status.HTTP_409_CONFLICT)
+
+    def _respond(self, uid, ticket, http_status=None):
+        if ticket["status"] != "matched":
+            return Response(ticket, status=http_status or status.HTTP_202_ACCEPTED)
+        data = load_multiplayer_session(ticket["session_id"])
+        if data is None:
+            return Response({"error": "Session not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            **ticket,
+            "session": data,
+            "stream_token": issue_stream_token(ticket["session_id"], uid),
+        }, status=http_status or status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@authentication_classes([])  # Public: never verifies a token, even if one is sent
+@permission_classes([AllowAny])
+def matchmaking_metrics(request):
+    """Queue depth, oldest wait, counters and time-to-match percentiles for this process's queues."""
+    return Response(matchmaking.metrics())
+
+class MultiplayerEventsView(View):
+    """
+    Server-Sent Events stream of a multiplayer session's state.
+
+    Replaces polling GetMultiplayerSessionView: the join, submit and create views
+    publish each change to the hub (see api/realtime.py) and every open stream
+    receives it. Clients authenticate with the stream_token returned by the
+    multiplayer endpoints and resume with Last-Event-ID (or ?version=) after a
+    reconnect. Under ASGI a waiting stream costs a coroutine, under WSGI a thread.
+    """
+
+    def get(self, request, session_id):
+        token = request.GET.get("token", "")
+        try:
+            uid = read_stream_token(token, session_id)
+        except SessionTokenError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_403_FORBIDDEN)
+
+        # Resume point: EventSource sends the last id it received on reconnect
+        last_version = request.headers.get("Last-Event-ID") or request.GET.get("version")
+        try:
+            last_version = int(last_version) if last_version else None
+        except ValueError:
+            last_version = None
+
+        def load():
+            return load_multiplayer_session(session_id)
+
+        stream = stream_session_async if isinstance(request, ASGIRequest) else stream_session
+        response = StreamingHttpResponse(
+            stream(
+                get_hub(),
+                str(session_id),
+                last_version,
+                load,
+                keepalive=settings.MULTIPLAYER_STREAM_KEEPALIVE_SECONDS,
+                max_duration=settings.MULTIPLAYER_STREAM_MAX_SECONDS,
+            ),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # don't let a proxy buffer the stream
+        logger.info(f"Event stream opened for session {session_id} by user {uid}")
+        return response
+
+
+
+class MultiplayerLiveView(View):
+    """
+    Server-Sent Events stream of a session's live standings ("standings" events).
+
+    Published at most once per MULTIPLAYER_ANSWER_FLUSH_SECONDS while players
+    report answers (see api/answers.py); authenticates and resumes like
+    MultiplayerEventsView, and ends once the game is over.
+    """
+
+    def get(self, request, session_id):
+        try:
+            read_stream_token(request.GET.get("token", ""), session_id)
+        except SessionTokenError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_403_FORBIDDEN)
+        last_version = request.headers.get("Last-Event-ID") or request.GET.get("version")
+        try:
+            last_version = int(last_version) if last_version else None
+        except ValueError:
+            last_version = None
+
+        def load():
+            return answer_buffer.live(session_id)
+
+        stream = stream_session_async if isinstance(request, ASGIRequest) else stream_session
+        response = StreamingHttpResponse(
+            stream(
+                get_hub(),
+                live_channel(session_id),
+                last_version,
+                load,
+                keepalive=settings.MULTIPLAYER_STREAM_KEEPALIVE_SECONDS,
+                max_duration=settings.MULTIPLAYER_STREAM_MAX_SECONDS,
+                event="standings",
+            ),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+class MultiplayerWaitView(View):
+    """
+    Long-poll for clients that cannot keep an event stream open.
+
+    GET multiplayer/<session_id>/wait?version=N&token=<stream_token> returns the
+    session state as soon as its version passes N (immediately if it already has),
+    or 304 after the timeout. Join and submit wake parked requests through the hub;
+    the hub is per process by default, so the session's indexed version column is
+    read before parking and again every MULTIPLAYER_WAIT_DB_CHECK_SECONDS while
+    parked, and changes handled by other workers are seen within that interval.
+    Under ASGI a parked request is a coroutine; under WSGI it holds a thread, so at
+    most MULTIPLAYER_WAIT_MAX_BLOCKING_WAITERS park at once and the rest get an
+    immediate 304 with Retry-After.
+    """
+
+    blocking_waiters = threading.BoundedSemaphore(settings.MULTIPLAYER_WAIT_MAX_BLOCKING_WAITERS)
+
+    async def get(self, request, session_id):
+        try:
+            read_stream_token(request.GET.get("token", ""), session_id)
+        except SessionTokenError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            version = int(request.GET["version"])
+            timeout = min(
+                float(request.GET.get("timeout", settings.MULTIPLAYER_WAIT_TIMEOUT_SECONDS)),
+                settings.MULTIPLAYER_WAIT_TIMEOUT_SECONDS,
+            )
+        except (KeyError, ValueError):
+            return JsonResponse({"error": "version is required and must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        hub = get_hub()
+        # Optimization: One indexed integer read says whether the client is already behind,
+        # including changes handled by another worker that this process's hub never saw
+        current = await sync_to_async(self._database_version)(session_id)
+        if current is None:
+            return JsonResponse({"error": "Session not found"}, status=status.HTTP_404_NOT_FOUND)
+        latest = hub.latest(session_id)
+        if latest is None or latest[0] < current:
+            # Fallback: This process has not published that version - render it from the database
+            data = await sync_to_async(load_multiplayer_session)(session_id)
+            if data is None:
+                return JsonResponse({"error": "Session not found"}, status=status.HTTP_404_NOT_FOUND)
+            hub.publish(session_id, data, version=data["version"])
+            latest = hub.latest(session_id)
+
+        if latest[0] <= version:
+            blocking = not isinstance(request, ASGIRequest)
+            if blocking and not self.blocking_waiters.acquire(blocking=False):
+                # All parking slots on this WSGI worker are taken: answer now, client retries
+                return self._not_modified(session_id, version, retry_after=2)
+            try:
+                latest = await self._wait(hub, session_id, version, timeout)
+            finally:
+                if blocking:
+                    self.blocking_waiters.release()
+            if latest is None:
+                return self._not_modified(session_id, version)
+
+        version, data = latest
+        return JsonResponse(data, headers={"ETag": multiplayer_etag(session_id, version)})
+
+    async def _wait(self, hub, session_id, version, timeout):
+        """Wait for a version above `version`: woken by the hub, or found in the database between checks."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            latest = await hub.wait_async(session_id, version, min(settings.MULTIPLAYER_WAIT_DB_CHECK_SECONDS, remaining))
+            if latest is not None:
+                return latest
+            # Changes made on another worker only reach this hub through a shared backend
+            latest = await sync_to_async(self._newer_in_database)(session_id, version)
+            if latest is not None:
+                return latest
+
+    @staticmethod
+    def _database_version(session_id):
+        return MultiplayerSession.objects.filter(session_id=session_id).values_list("version", flat=True).first()
+
+    def _newer_in_database(self, session_id, version):
+        if not MultiplayerSession.objects.filter(session_id=session_id, version__gt=version).exists():
+            return None
+        data = load_multiplayer_session(session_id)
+        if data is None:
+            return None
+        get_hub().publish(session_id, data, version=data["version"])
+        return get_hub().latest(session_id)
+
+    def _not_modified(self, session_id, version, retry_after=None):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        response["ETag"] = multiplayer_etag(session_id, version)
+        if retry_after:
+            response["Retry-After"] = str(retry_after)
+        return response
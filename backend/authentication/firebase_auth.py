@@ -1,16 +1,12 @@
-import firebase_admin
-from firebase_admin import auth, credentials
-from django.conf import settings
-
-
-if not firebase_admin._apps:
-    cred = credentials.Certificate("path/to/firebase-key.json")
-    firebase_admin.initialize_app(cred)
+from api.auth_backends import get_auth_backend
 
 
 def verify_firebase_token(id_token):
+    # Uses the shared, lazily initialized Firebase setup (see api.firebase)
     try:
-        decoded = auth.verify_id_token(id_token)
-        return decoded
+        backend = get_auth_backend()
+        if not backend.is_ready():
+            return None
+        return backend.verify_id_token(id_token)
     except Exception:
-        return None
\ No newline at end of file
+        return None
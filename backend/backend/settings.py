@@ -139,27 +139,100 @@ REST_FRAMEWORK = {
 }
 
 
-# Firebase Admin initialization (optional)
-# This attempts to initialize the Firebase Admin SDK using a service account
-# JSON file placed at the project root named `serviceAccountKey.json`.
-try:
-    import firebase_admin
-    from firebase_admin import credentials
-    from pathlib import Path as _Path
-
-    _sa_path = _Path(__file__).resolve().parent.parent / "serviceAccountKey.json"
-    if _sa_path.exists() and not firebase_admin._apps:
-        cred = credentials.Certificate(str(_sa_path))
-        firebase_admin.initialize_app(cred)
-except Exception:
-    # Defer failures to runtime; when firebase-admin is not installed or
-    # credentials are not present we allow the app to start so local
-    # development without Firebase remains possible.
-    pass
+import os
+
+# Firebase ID token verification cache
+# Verified claims are reused until the token expires; a revocation check interval
+# (seconds, 0 = off) forces periodic re-verification with check_revoked=True.
+FIREBASE_TOKEN_CACHE_SIZE = int(os.getenv("FIREBASE_TOKEN_CACHE_SIZE", "10000"))
+FIREBASE_TOKEN_REVOCATION_CHECK_SECONDS = int(os.getenv("FIREBASE_TOKEN_REVOCATION_CHECK_SECONDS", "0"))
+
+# Auth backend: "firebase" (production) or "local", which signs and verifies
+# Firebase-shaped tokens offline for tests and load generation. Processes that
+# share FIREBASE_LOCAL_KEY_PATH (e.g. the mint_local_tokens command and the
+# server) accept each other's local tokens.
+FIREBASE_AUTH_BACKEND = os.getenv("FIREBASE_AUTH_BACKEND", "firebase")
+FIREBASE_LOCAL_KEY_PATH = os.getenv("FIREBASE_LOCAL_KEY_PATH", "")
+
+# ID tokens are verified locally against Google's x509 signing certificates.
+# The key set is refreshed in the background this many seconds before the
+# certificates' max-age runs out. The URL can point at a local stand-in for tests.
+FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID", "")  # defaults to the Admin SDK app's project
+FIREBASE_CERTS_URL = os.getenv(
+    "FIREBASE_CERTS_URL",
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com",
+)
+FIREBASE_KEY_REFRESH_MARGIN_SECONDS = int(os.getenv("FIREBASE_KEY_REFRESH_MARGIN_SECONDS", "300"))
+
+# Display-name directory used by leaderboards and multiplayer views
+# Firebase names are reused for this long (seconds); unknown users are re-checked
+# after the shorter negative TTL. The per-process LRU keeps names for the local TTL,
+# which bounds how long other workers show an old name after a rename.
+DISPLAY_NAME_TTL_SECONDS = int(os.getenv("DISPLAY_NAME_TTL_SECONDS", "3600"))
+DISPLAY_NAME_NEGATIVE_TTL_SECONDS = int(os.getenv("DISPLAY_NAME_NEGATIVE_TTL_SECONDS", "600"))
+DISPLAY_NAME_LOCAL_TTL_SECONDS = int(os.getenv("DISPLAY_NAME_LOCAL_TTL_SECONDS", "60"))
+
+# Signed game-session tokens issued by start-game (see api/session_tokens.py)
+# are valid for this long (seconds); signed with SECRET_KEY
+GAME_SESSION_TOKEN_TTL_SECONDS = int(os.getenv("GAME_SESSION_TOKEN_TTL_SECONDS", "7200"))
+
+# Multiplayer push updates (Server-Sent Events, see api/realtime.py)
+# The hub is per process by default; point MULTIPLAYER_HUB_BACKEND at a
+# cross-process implementation when running several workers. Streams send a
+# keepalive comment this often and are recycled after the max duration.
+MULTIPLAYER_HUB_BACKEND = os.getenv("MULTIPLAYER_HUB_BACKEND", "api.realtime.InProcessHub")
+MULTIPLAYER_STREAM_KEEPALIVE_SECONDS = int(os.getenv("MULTIPLAYER_STREAM_KEEPALIVE_SECONDS", "15"))
+MULTIPLAYER_STREAM_MAX_SECONDS = int(os.getenv("MULTIPLAYER_STREAM_MAX_SECONDS", "300"))
+
+# Long-poll fallback (multiplayer/<id>/wait): longest a request is parked (seconds),
+# and how many requests may be parked at once on a WSGI worker, where each holds a thread
+MULTIPLAYER_WAIT_TIMEOUT_SECONDS = int(os.getenv("MULTIPLAYER_WAIT_TIMEOUT_SECONDS", "25"))
+MULTIPLAYER_WAIT_MAX_BLOCKING_WAITERS = int(os.getenv("MULTIPLAYER_WAIT_MAX_BLOCKING_WAITERS", "32"))
+# While parked, a waiter also re-reads the session's (indexed) version this often, so a
+# change handled by another worker is seen without a shared hub backend
+MULTIPLAYER_WAIT_DB_CHECK_SECONDS = float(os.getenv("MULTIPLAYER_WAIT_DB_CHECK_SECONDS", "2"))
+
+# Join codes (see api/join_codes.py): each worker reserves this many counter values
+# at a time, and a lobby still waiting after MULTIPLAYER_LOBBY_TTL_SECONDS has expired
+# (its code, like a finished session's, may be handed out again)
+JOIN_CODE_BLOCK_SIZE = int(os.getenv("JOIN_CODE_BLOCK_SIZE", "256"))
+MULTIPLAYER_LOBBY_TTL_SECONDS = int(os.getenv("MULTIPLAYER_LOBBY_TTL_SECONDS", "3600"))
+
+# Session reaper (manage.py reap_multiplayer_sessions, run from cron): lobbies
+# expire after MULTIPLAYER_LOBBY_TTL_SECONDS, active games are force-finished this
+# long after they started, and finished/expired sessions are archived after
+# MULTIPLAYER_ARCHIVE_AFTER_SECONDS, in batches of MULTIPLAYER_REAPER_BATCH_SIZE
+MULTIPLAYER_GAME_TTL_SECONDS = int(os.getenv("MULTIPLAYER_GAME_TTL_SECONDS", "1800"))
+MULTIPLAYER_ARCHIVE_AFTER_SECONDS = int(os.getenv("MULTIPLAYER_ARCHIVE_AFTER_SECONDS", str(7 * 24 * 3600)))
+MULTIPLAYER_REAPER_BATCH_SIZE = int(os.getenv("MULTIPLAYER_REAPER_BATCH_SIZE", "500"))
+
+# Large rooms: up to MULTIPLAYER_MAX_PLAYERS per session. Rooms with more than
+# MULTIPLAYER_SNAPSHOT_PLAYERS players get bounded snapshots (top standings and
+# first joiners); the full roster is paged through multiplayer/<id>/players
+MULTIPLAYER_MAX_PLAYERS = int(os.getenv("MULTIPLAYER_MAX_PLAYERS", "500"))
+MULTIPLAYER_SNAPSHOT_PLAYERS = int(os.getenv("MULTIPLAYER_SNAPSHOT_PLAYERS", "25"))
+
+# Rendered session snapshots (see api/snapshots.py) are cached in the default cache
+# for this long after their last change; use a shared backend with several workers
+MULTIPLAYER_SNAPSHOT_CACHE_SECONDS = int(os.getenv("MULTIPLAYER_SNAPSHOT_CACHE_SECONDS", "300"))
+
+# Per-question answers (see api/answers.py): buffered in process and written in
+# one INSERT per MULTIPLAYER_ANSWER_BATCH_SIZE answers or every
+# MULTIPLAYER_ANSWER_FLUSH_SECONDS, which is also how often live standings are pushed
+MULTIPLAYER_ANSWER_BATCH_SIZE = int(os.getenv("MULTIPLAYER_ANSWER_BATCH_SIZE", "500"))
+MULTIPLAYER_ANSWER_FLUSH_SECONDS = float(os.getenv("MULTIPLAYER_ANSWER_FLUSH_SECONDS", "0.5"))
+
+# Quick match (see api/matchmaking.py): queued players of one difficulty are put in
+# a room of MATCHMAKING_ROOM_SIZE as soon as that many wait, or of at least
+# MATCHMAKING_MIN_PLAYERS once the oldest has waited MATCHMAKING_MAX_WAIT_SECONDS.
+# Queues live in one process, so route matchmaking requests to a single worker
+MATCHMAKING_ROOM_SIZE = int(os.getenv("MATCHMAKING_ROOM_SIZE", "4"))
+MATCHMAKING_MIN_PLAYERS = int(os.getenv("MATCHMAKING_MIN_PLAYERS", "2"))
+MATCHMAKING_MAX_WAIT_SECONDS = float(os.getenv("MATCHMAKING_MAX_WAIT_SECONDS", "15"))
+MATCHMAKING_TOTAL_QUESTIONS = int(os.getenv("MATCHMAKING_TOTAL_QUESTIONS", "10"))
 
 
 # OpenTDB configuration
-import os
 
 OPEN_TDB_BASE_URL = os.getenv("OPEN_TDB_BASE_URL", "https://opentdb.com")
 OPEN_TDB_DEFAULT_AMOUNT = int(os.getenv("OPEN_TDB_DEFAULT_AMOUNT", "10"))
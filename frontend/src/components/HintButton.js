@@ -5,7 +5,10 @@ export default function HintButton({
   options, 
   answerIndex, 
   onHint, 
+  eliminated = [],
   sessionId, 
+  sessionToken,
+  questionIndex,
   allowedHints, 
   hintsUsed, 
   onHintUsed 
@@ -18,7 +21,8 @@ export default function HintButton({
       // Fallback to client-side hint if no session
       const wrongOptions = options
         .map((opt, i) => i)
-        .filter((i) => i !== answerIndex);
+        .filter((i) => i !== answerIndex && !eliminated.includes(i));
+      if (wrongOptions.length === 0) return;
       
       const removed = wrongOptions[Math.floor(Math.random() * wrongOptions.length)];
       onHint(removed);
@@ -34,23 +38,17 @@ export default function HintButton({
     setDisabled(true);
 
     try {
-      // Get incorrect answers (all options except the correct one)
-      const correctAnswer = options[answerIndex];
-      const incorrectAnswers = options.filter((opt, idx) => idx !== answerIndex);
-
-      // Call use-hint API
+      // Call use-hint API - the server picks the option to remove from its answer key;
+      // sending how many are already removed makes a second hint remove a different one
       const result = await apiPost(`/use-hint/${sessionId}/`, {
-        correct_answer: correctAnswer,
-        incorrect_answers: incorrectAnswers,
+        question_index: questionIndex,
+        eliminated: eliminated.length,
+        session_token: sessionToken,
       });
 
-      // Remove the hint from UI - API returns removed_answer
-      const removedAnswer = result.removed_answer;
-      if (removedAnswer) {
-        const removedIndex = options.findIndex(opt => opt === removedAnswer);
-        if (removedIndex !== -1) {
-          onHint(removedIndex);
-        }
+      // Remove the hint from UI - API returns removed_index into the shuffled options
+      if (Number.isInteger(result.removed_index)) {
+        onHint(result.removed_index);
       }
 
       // Update hint count
@@ -60,9 +58,9 @@ export default function HintButton({
     } catch (err) {
       console.error("Failed to use hint:", err);
       alert(err.message || "Failed to use hint");
-      setDisabled(false);
     } finally {
       setLoading(false);
+      setDisabled(false);
     }
   }
 
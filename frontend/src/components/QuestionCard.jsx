@@ -1,7 +1,17 @@
-import React, { useState, useMemo } from "react";
+import React, { useState, useMemo, useEffect } from "react";
+import HintButton from "./HintButton";
 
-export default function QuestionCard({ question, onAnswer, sessionId, allowedHints, hintsUsed, onHintUsed }) {
-  const [hiddenOption, setHiddenOption] = useState(null);
+export default function QuestionCard({ question, onAnswer, sessionId, sessionToken, allowedHints, hintsUsed, onHintUsed }) {
+  // Options removed by hints on this question, in the order they were removed
+  const [hiddenOptions, setHiddenOptions] = useState([]);
+
+  useEffect(() => {
+    setHiddenOptions([]);
+  }, [question]);
+
+  function hideOption(index) {
+    setHiddenOptions(prev => (prev.includes(index) ? prev : [...prev, index]));
+  }
 
   // Generate multiple choice options for questions that only have a correct answer
   const options = useMemo(() => {
@@ -81,7 +91,7 @@ export default function QuestionCard({ question, onAnswer, sessionId, allowedHin
 
       <div style={optionsGridStyle}>
         {options && options.length > 0 ? options.map((option, idx) => {
-          if (idx === hiddenOption) return null;
+          if (hiddenOptions.includes(idx)) return null;
 
           return (
             <button
@@ -102,8 +112,11 @@ export default function QuestionCard({ question, onAnswer, sessionId, allowedHin
       <HintButton
         options={question.options}
         answerIndex={question.answer}
-        onHint={setHiddenOption}
+        onHint={hideOption}
+        eliminated={hiddenOptions}
         sessionId={sessionId}
+        sessionToken={sessionToken}
+        questionIndex={question.index}
         allowedHints={allowedHints}
         hintsUsed={hintsUsed}
         onHintUsed={onHintUsed}
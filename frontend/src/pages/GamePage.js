@@ -21,6 +21,7 @@ export default function GamePage() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [sessionId, setSessionId] = useState(null);
+  const [sessionToken, setSessionToken] = useState(null);
   const [allowedHints, setAllowedHints] = useState(0);
   const [hintsUsed, setHintsUsed] = useState(0);
   const [startTime] = useState(Date.now());
@@ -63,6 +64,7 @@ export default function GamePage() {
         
         // Store session ID and hint info for score submission and hints
         setSessionId(gameData.session_id);
+        setSessionToken(gameData.session_token || null);
         setAllowedHints(gameData.allowed_hints || 0);
         setHintsUsed(gameData.hints_used || 0);
         
@@ -97,6 +99,7 @@ export default function GamePage() {
             options: q.shuffled_answers,
             answer: correctIndex,
             correct_answer: q.correct_answer,
+            index: idx,  // hints are requested by question index
           };
         });
         
@@ -163,6 +166,8 @@ export default function GamePage() {
         total_questions: questions.length,
         time_taken_seconds: timeTaken,
         categories: categories,
+        session_id: sessionId,
+        session_token: sessionToken,
       });
       
       // Navigate to results page with top-5 status
@@ -301,6 +306,7 @@ export default function GamePage() {
           question={currentQuestion}
           onAnswer={handleAnswer}
           sessionId={sessionId}
+          sessionToken={sessionToken}
           allowedHints={allowedHints}
           hintsUsed={hintsUsed}
           onHintUsed={() => setHintsUsed(prev => prev + 1)}
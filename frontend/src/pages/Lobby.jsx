@@ -1,13 +1,19 @@
-import { useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { useAuth } from "../context/AuthContext";
-import { createMultiplayerSession, joinMultiplayerSession } from "../services/multiplayerService";
+import {
+  createMultiplayerSession,
+  joinMultiplayerSession,
+  enterMatchmaking,
+  getMatchmakingStatus,
+  leaveMatchmaking,
+} from "../services/multiplayerService";
 import "../pages/Lobby.css";
 
 export default function Lobby() {
   const navigate = useNavigate();
   const { user, isAuthenticated } = useAuth();
-  const [view, setView] = useState("menu"); // "menu", "create", "join"
+  const [view, setView] = useState("menu"); // "menu", "create", "join", "quick"
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
   const [joinCode, setJoinCode] = useState("");
@@ -19,6 +25,13 @@ export default function Lobby() {
   const [createdJoinCode, setCreatedJoinCode] = useState("");
   const [createdSession, setCreatedSession] = useState(null);
 
+  // Quick match state
+  const [queueStatus, setQueueStatus] = useState(null);
+  const pollTimer = useRef(null);
+
+  // Stop polling the matchmaking queue when leaving the lobby
+  useEffect(() => () => clearTimeout(pollTimer.current), []);
+
   if (!isAuthenticated) {
     return (
       <div style={{ paddingTop: 100, textAlign: "center" }}>
@@ -86,6 +99,58 @@ export default function Lobby() {
     }
   }
 
+  function startMatchedGame(result) {
+    const session = { ...result.session, stream_token: result.stream_token };
+    sessionStorage.setItem('currentSession', JSON.stringify(session));
+    navigate(`/multiplayer-game/${session.session_id}`, {
+      state: { session, joinCode: session.join_code }
+    });
+  }
+
+  function handleQueueUpdate(result) {
+    if (result.status === "matched") {
+      startMatchedGame(result);
+      return;
+    }
+    setQueueStatus(result);
+    // Polling also lets the server form a smaller room once the wait is over
+    pollTimer.current = setTimeout(async () => {
+      try {
+        handleQueueUpdate(await getMatchmakingStatus());
+      } catch (err) {
+        setError(err.message || "Lost your place in the queue");
+        setQueueStatus(null);
+      }
+    }, 1000);
+  }
+
+  async function handleQuickMatch() {
+    setLoading(true);
+    setError("");
+    
+    try {
+      handleQueueUpdate(await enterMatchmaking(difficulty));
+    } catch (err) {
+      setError(err.message || "Failed to join the matchmaking queue");
+    }
+    setLoading(false);
+  }
+
+  async function handleLeaveQueue() {
+    clearTimeout(pollTimer.current);
+    try {
+      await leaveMatchmaking();
+      setQueueStatus(null);
+    } catch (err) {
+      // Fallback: A room was already being formed for us - pick it up
+      try {
+        handleQueueUpdate(await getMatchmakingStatus());
+      } catch (statusErr) {
+        setQueueStatus(null);
+      }
+    }
+  }
+
   function handleStartGame() {
     // This will be called when user clicks "Start Game" after creating room
     // Use the created session directly
@@ -129,6 +194,13 @@ export default function Lobby() {
               >
                 🔑 Join Room
               </button>
+
+              <button 
+                className="lobby-btn secondary"
+                onClick={() => setView("quick")}
+              >
+                ⚡ Quick Match
+              </button>
             </div>
 
             <button 
@@ -150,7 +222,7 @@ export default function Lobby() {
                 value={numberOfPlayers} 
                 onChange={(e) => setNumberOfPlayers(parseInt(e.target.value))}
               >
-                {[2, 3, 4, 5, 6, 7, 8, 9, 10].map(num => (
+                {[2, 3, 4, 5, 6, 7, 8, 9, 10, 25, 50, 100, 250, 500].map(num => (
                   <option key={num} value={num}>{num}</option>
                 ))}
               </select>
@@ -236,6 +308,63 @@ export default function Lobby() {
           </>
         )}
 
+        {view === "quick" && (
+          <>
+            <h2>Quick Match</h2>
+            
+            {!queueStatus ? (
+              <div className="form-group">
+                <label>Difficulty</label>
+                <select 
+                  value={difficulty} 
+                  onChange={(e) => setDifficulty(e.target.value)}
+                >
+                  <option value="easy">Easy</option>
+                  <option value="medium">Medium</option>
+                  <option value="hard">Hard</option>
+                </select>
+              </div>
+            ) : (
+              <p style={{ color: "#666" }}>
+                Looking for players ({queueStatus.queued} waiting for a {queueStatus.difficulty} game,
+                {" "}{Math.round(queueStatus.waited_seconds)}s)...
+              </p>
+            )}
+
+            {error && <div className="error-message">{error}</div>}
+
+            <div className="form-buttons">
+              {!queueStatus ? (
+                <button 
+                  className="lobby-btn primary"
+                  onClick={handleQuickMatch}
+                  disabled={loading}
+                >
+                  {loading ? "Joining queue..." : "Find a Game"}
+                </button>
+              ) : (
+                <button 
+                  className="lobby-btn secondary"
+                  onClick={handleLeaveQueue}
+                >
+                  Cancel
+                </button>
+              )}
+              
+              <button 
+                className="back-btn"
+                disabled={!!queueStatus}
+                onClick={() => {
+                  setView("menu");
+                  setError("");
+                }}
+              >
+                ← Back
+              </button>
+            </div>
+          </>
+        )}
+
         {view === "join" && (
           <>
             <h2>Join a Room</h2>
@@ -1,7 +1,12 @@
 import { useState, useEffect } from "react";
 import { useParams, useNavigate, useLocation } from "react-router-dom";
 import { useAuth } from "../context/AuthContext";
-import { getMultiplayerSessionById, submitMultiplayerScore } from "../services/multiplayerService";
+import {
+  getMultiplayerSessionById,
+  submitMultiplayerScore,
+  reportMultiplayerAnswer,
+  subscribeToLiveStandings,
+} from "../services/multiplayerService";
 import { startGame } from "../services/questionService";
 import QuestionCard from "../components/QuestionCard";
 import Loader from "../components/Loader";
@@ -21,6 +26,14 @@ export default function MultiplayerGame() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [startTime] = useState(Date.now());
+  const [liveStandings, setLiveStandings] = useState([]);
+
+  // Live standings while the game is in progress
+  const streamToken = session?.stream_token;
+  useEffect(() => {
+    if (!streamToken) return undefined;
+    return subscribeToLiveStandings(sessionId, streamToken, (data) => setLiveStandings(data.standings));
+  }, [sessionId, streamToken]);
 
   useEffect(() => {
     async function loadGame() {
@@ -72,6 +85,11 @@ export default function MultiplayerGame() {
     const currentQuestion = questions[currentIndex];
     const isCorrect = choiceIndex === currentQuestion.answer;
 
+    // Fire and forget: live standings only; the final score is submitted at the end
+    reportMultiplayerAnswer(sessionId, currentIndex, isCorrect).catch((err) => {
+      console.warn("Could not report answer:", err.message);
+    });
+
     if (isCorrect) {
       setScore((prev) => prev + 1);
       setCorrectCount((prev) => prev + 1);
@@ -180,6 +198,25 @@ export default function MultiplayerGame() {
           question={currentQuestion}
           onAnswer={handleAnswer}
         />
+
+        {liveStandings.length > 0 && (
+          <div style={{ marginTop: 20, borderTop: "1px solid #eee", paddingTop: 12 }}>
+            <h4 style={{ margin: "0 0 8px", color: "#5b9491" }}>Live standings</h4>
+            {liveStandings.slice(0, 5).map((entry) => (
+              <div
+                key={entry.user_id}
+                style={{
+                  display: "flex",
+                  justifyContent: "space-between",
+                  fontWeight: entry.user_id === user?.uid ? "bold" : "normal",
+                }}
+              >
+                <span>{entry.position}. {entry.user_id === user?.uid ? "You" : entry.display_name}</span>
+                <span>{entry.correct} correct ({entry.answered} answered)</span>
+              </div>
+            ))}
+          </div>
+        )}
       </div>
     </div>
   );
@@ -1,7 +1,7 @@
 import { useState, useEffect } from "react";
 import { useParams, useNavigate, useLocation } from "react-router-dom";
 import { useAuth } from "../context/AuthContext";
-import { getMultiplayerSessionById } from "../services/multiplayerService";
+import { getMultiplayerSessionById, getMultiplayerPlayers } from "../services/multiplayerService";
 
 export default function MultiplayerResults() {
   const { sessionId } = useParams();
@@ -11,6 +11,24 @@ export default function MultiplayerResults() {
 
   const [session, setSession] = useState(location.state?.session || null);
   const [loading, setLoading] = useState(!session);
+  // Large rooms only include the top of the standings; further pages are fetched on demand
+  const [morePlayers, setMorePlayers] = useState({});
+  const [nextPage, setNextPage] = useState(1);
+  const [hasMorePlayers, setHasMorePlayers] = useState(true);
+
+  async function loadMorePlayers() {
+    try {
+      const result = await getMultiplayerPlayers(sessionId, { order: "score", page: nextPage });
+      setMorePlayers((prev) => ({
+        ...prev,
+        ...Object.fromEntries(result.players.map(({ user_id, ...data }) => [user_id, data])),
+      }));
+      setNextPage(result.page + 1);
+      setHasMorePlayers(result.has_next);
+    } catch (err) {
+      console.error("Error loading players:", err);
+    }
+  }
 
   useEffect(() => {
     async function loadSession() {
@@ -46,7 +64,7 @@ export default function MultiplayerResults() {
 
   const currentUserId = user?.uid;
   const isWinner = session.winners?.includes(currentUserId);
-  const playerScores = Object.entries(session.player_scores || {})
+  const playerScores = Object.entries({ ...session.player_scores, ...morePlayers })
     .map(([userId, data]) => ({
       userId,
       ...data,
@@ -135,6 +153,15 @@ export default function MultiplayerResults() {
           ))}
         </div>
 
+        {session.players_truncated && (
+          <div style={{ textAlign: "center", marginBottom: 30, color: "#666" }}>
+            <p>Showing {playerScores.length} of {session.current_players} players</p>
+            {hasMorePlayers && playerScores.length < session.current_players && (
+              <button onClick={loadMorePlayers}>Show more players</button>
+            )}
+          </div>
+        )}
+
         <div style={{ display: "flex", gap: 15, justifyContent: "center" }}>
           <button
             onClick={() => navigate("/lobby")}
@@ -1,7 +1,7 @@
 import { useState, useEffect } from "react";
 import { useParams, useNavigate, useLocation } from "react-router-dom";
 import { useAuth } from "../context/AuthContext";
-import { getMultiplayerSession, getMultiplayerSessionById } from "../services/multiplayerService";
+import { getMultiplayerSession, getMultiplayerSessionById, subscribeToSession } from "../services/multiplayerService";
 import Loader from "../components/Loader";
 
 export default function MultiplayerWaiting() {
@@ -93,39 +93,43 @@ export default function MultiplayerWaiting() {
     loadSession();
   }, [sessionId, navigate, location.state, joinCode]);
 
-  // Poll for session updates
+  // Live session updates (pushed by the server; polls only if push is unavailable)
+  const liveSessionId = session?.session_id;
+  const streamToken = session?.stream_token;
+  const waitingForPlayers = Boolean(session) && session.status === "waiting";
+
   useEffect(() => {
-    if (!session || session.status === "active" || session.status === "finished") {
+    if (!waitingForPlayers || !liveSessionId) {
       return;
     }
 
-    const interval = setInterval(async () => {
-      try {
-        const sessionData = await getMultiplayerSession(joinCode);
-        setSession(sessionData);
-        
-            // If session is now active, navigate to game
-            if (sessionData.status === "active") {
-              navigate(`/multiplayer-game/${sessionData.session_id}`, {
-                state: { session: sessionData, joinCode }
-              });
-            }
-      } catch (err) {
-        console.error("Error polling session:", err);
-      }
-    }, 2000); // Poll every 2 seconds
+    return subscribeToSession(
+      liveSessionId,
+      streamToken,
+      (sessionData) => {
+        // Pushed state has no stream token; keep ours
+        setSession((prev) => ({ ...sessionData, stream_token: sessionData.stream_token || prev?.stream_token }));
 
-    return () => clearInterval(interval);
-  }, [session, joinCode, navigate]);
+        // If session is now active, navigate to game
+        if (sessionData.status === "active") {
+          navigate(`/multiplayer-game/${sessionData.session_id}`, {
+            state: { session: sessionData, joinCode }
+          });
+        }
+      },
+      (err) => console.error("Session stream error:", err)
+    );
+  }, [waitingForPlayers, liveSessionId, streamToken, joinCode, navigate]);
 
   if (loading) {
     return <Loader />;
   }
 
-  if (error || !session) {
+  if (error || !session || session.status === "expired") {
+    const message = session?.status === "expired" ? "This room expired before enough players joined" : error;
     return (
       <div style={{ paddingTop: 100, textAlign: "center" }}>
-        <div className="error-message">{error || "Session not found"}</div>
+        <div className="error-message">{message || "Session not found"}</div>
         <button onClick={() => navigate("/lobby")}>Back to Lobby</button>
       </div>
     );
@@ -221,6 +225,11 @@ export default function MultiplayerWaiting() {
                 )}
               </div>
             ))}
+            {session.players_truncated && (
+              <div style={{ padding: "10px 15px", color: "#666", textAlign: "center" }}>
+                and {session.current_players - session.players.length} more
+              </div>
+            )}
           </div>
         </div>
 
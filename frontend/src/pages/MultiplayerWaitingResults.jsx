@@ -1,6 +1,6 @@
 import { useState, useEffect } from "react";
 import { useParams, useNavigate, useLocation } from "react-router-dom";
-import { getMultiplayerSessionById } from "../services/multiplayerService";
+import { subscribeToSession } from "../services/multiplayerService";
 
 export default function MultiplayerWaitingResults() {
   const { sessionId } = useParams();
@@ -10,25 +10,27 @@ export default function MultiplayerWaitingResults() {
   const [session, setSession] = useState(location.state?.session || null);
   const [loading, setLoading] = useState(!session);
 
+  // Results are pushed when the last player submits (polls only if push is unavailable)
+  const streamToken = location.state?.session?.stream_token;
+
   useEffect(() => {
-    const interval = setInterval(async () => {
-      try {
-        const sessionData = await getMultiplayerSessionById(sessionId);
+    const unsubscribe = subscribeToSession(
+      sessionId,
+      streamToken,
+      (sessionData) => {
         setSession(sessionData);
-        
+
         if (sessionData.status === "finished") {
-          clearInterval(interval);
+          unsubscribe();
           navigate(`/multiplayer-results/${sessionId}`, {
             state: { session: sessionData }
           });
         }
-      } catch (err) {
-        console.error("Error polling session:", err);
-      }
-    }, 2000);
-
-    return () => clearInterval(interval);
-  }, [sessionId, navigate]);
+      },
+      (err) => console.error("Session stream error:", err)
+    );
+    return unsubscribe;
+  }, [sessionId, streamToken, navigate]);
 
   if (loading && !session) {
     return <div style={{ paddingTop: 100, textAlign: "center" }}>Loading...</div>;
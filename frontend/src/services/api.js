@@ -3,7 +3,7 @@
  */
 import { auth } from './firebase';
 
-const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000/api';
+export const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://127.0.0.1:8000/api';
 
 /**
  * Get Firebase ID token for authenticated requests
@@ -90,6 +90,11 @@ export async function apiRequest(url, options = {}) {
     }
   }
   
+  // No Content (e.g. DELETE) has no body to parse
+  if (response.status === 204) {
+    return null;
+  }
+  
   return response.json();
 }
 
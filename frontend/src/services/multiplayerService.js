@@ -1,12 +1,12 @@
 /**
  * Multiplayer game service - handles all multiplayer API calls
  */
-import { apiPost, apiGet } from './api';
+import { apiPost, apiGet, apiDelete, API_BASE_URL } from './api';
 
 /**
  * Create a new multiplayer session
  * @param {Object} options - Session options
- * @param {number} options.number_of_players - Target number of players (2-10)
+ * @param {number} options.number_of_players - Target number of players (2-500)
  * @param {string} options.difficulty - "easy", "medium", or "hard"
  * @param {number} options.total_questions - Number of questions (1-50)
  * @returns {Promise<Object>} Session data with join_code
@@ -54,6 +54,45 @@ export async function getMultiplayerSessionById(sessionId) {
   return await apiGet(`/multiplayer/${sessionId}`);
 }
 
+/**
+ * Get one page of a session's players (large rooms only inline the first players and the top standings)
+ * @param {string} sessionId - Session UUID
+ * @param {Object} [options]
+ * @param {string} [options.order] - "joined" (default) or "score"
+ * @param {number} [options.page] - 1-based page number
+ * @param {number} [options.page_size] - Players per page (max 200)
+ * @returns {Promise<Object>} { players, page, page_size, total, has_next }
+ */
+export async function getMultiplayerPlayers(sessionId, { order = 'joined', page = 1, page_size = 50 } = {}) {
+  return await apiGet(`/multiplayer/${sessionId}/players?order=${order}&page=${page}&page_size=${page_size}`);
+}
+
+/**
+ * Quick match: queue for a room of the given difficulty
+ * @param {string} difficulty - "easy", "medium", or "hard"
+ * @returns {Promise<Object>} { status: "queued", position, waited_seconds } or
+ *   { status: "matched", session_id, session, stream_token } once a room has formed
+ */
+export async function enterMatchmaking(difficulty) {
+  return await apiPost('/matchmaking/queue', { difficulty });
+}
+
+/**
+ * Poll the quick-match queue (same shape as enterMatchmaking)
+ * @returns {Promise<Object>}
+ */
+export async function getMatchmakingStatus() {
+  return await apiGet('/matchmaking/queue');
+}
+
+/**
+ * Leave the quick-match queue
+ * @returns {Promise<void>}
+ */
+export async function leaveMatchmaking() {
+  await apiDelete('/matchmaking/queue');
+}
+
 /**
  * Submit score for a multiplayer session
  * @param {string} sessionId - Session UUID
@@ -76,3 +115,139 @@ export async function submitMultiplayerScore(sessionId, scoreData) {
   return await apiPost('/multiplayer/submit', payload);
 }
 
+/**
+ * Report one answer as it is given (feeds the room's live standings)
+ * Retrying is safe: an answer already recorded is not counted twice.
+ * @param {string} sessionId - Session UUID
+ * @param {number} questionIndex - 0-based question index
+ * @param {boolean} correct - Whether the answer was correct
+ * @returns {Promise<Object>} { accepted, answered, correct }
+ */
+export async function reportMultiplayerAnswer(sessionId, questionIndex, correct) {
+  return await apiPost('/multiplayer/answer', {
+    session_id: sessionId,
+    question_index: questionIndex,
+    correct,
+  });
+}
+
+/**
+ * Subscribe to the live standings of a game in progress (Server-Sent Events)
+ * @param {string} sessionId - Session UUID
+ * @param {string} streamToken - stream_token returned by the multiplayer endpoints
+ * @param {Function} onUpdate - Called with { standings, questions, players_answering, status }
+ * @returns {Function} Unsubscribe function
+ */
+export function subscribeToLiveStandings(sessionId, streamToken, onUpdate) {
+  if (typeof EventSource === 'undefined' || !streamToken) {
+    return () => {}; // live standings are optional; the results page still shows the final ranking
+  }
+  const source = new EventSource(
+    `${API_BASE_URL}/multiplayer/${sessionId}/live?token=${encodeURIComponent(streamToken)}`
+  );
+  source.addEventListener('standings', (event) => {
+    const data = JSON.parse(event.data);
+    onUpdate(data);
+    if (isFinalStatus(data.status)) {
+      source.close();
+    }
+  });
+  source.addEventListener('gone', () => source.close());
+  return () => source.close();
+}
+
+/**
+ * Whether a session status can no longer change (a finished game, or a lobby that expired before it filled)
+ * @param {string} status - Session status
+ * @returns {boolean}
+ */
+export function isFinalStatus(status) {
+  return status === 'finished' || status === 'expired';
+}
+
+/**
+ * Subscribe to live updates of a multiplayer session (Server-Sent Events)
+ * The browser reconnects on its own and resumes from the last version it saw.
+ * Falls back to long-polling without EventSource, and to polling every 2 seconds without a stream token.
+ * @param {string} sessionId - Session UUID
+ * @param {string} streamToken - stream_token returned by the multiplayer endpoints
+ * @param {Function} onUpdate - Called with the full session data on every change
+ * @param {Function} [onError] - Called on connection errors
+ * @returns {Function} Unsubscribe function
+ */
+export function subscribeToSession(sessionId, streamToken, onUpdate, onError) {
+  if (typeof EventSource === 'undefined' && streamToken) {
+    return waitForSessionChanges(sessionId, streamToken, onUpdate, onError);
+  }
+  if (!streamToken) {
+    const interval = setInterval(async () => {
+      try {
+        onUpdate(await getMultiplayerSessionById(sessionId));
+      } catch (err) {
+        if (onError) onError(err);
+      }
+    }, 2000);
+    return () => clearInterval(interval);
+  }
+
+  const source = new EventSource(
+    `${API_BASE_URL}/multiplayer/${sessionId}/events?token=${encodeURIComponent(streamToken)}`
+  );
+  source.addEventListener('session', (event) => {
+    const sessionData = JSON.parse(event.data);
+    onUpdate(sessionData);
+    if (isFinalStatus(sessionData.status)) {
+      source.close(); // nothing changes after the game ends
+    }
+  });
+  source.addEventListener('gone', () => {
+    source.close();
+    if (onError) onError(new Error('Session not found'));
+  });
+  source.onerror = (err) => {
+    // Also fires when the server recycles the stream; EventSource reconnects by itself
+    if (onError) onError(err);
+  };
+  return () => source.close();
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+/**
+ * Long-poll a multiplayer session: one request per state change instead of one every 2 seconds
+ * @returns {Function} Unsubscribe function
+ */
+function waitForSessionChanges(sessionId, streamToken, onUpdate, onError) {
+  let stopped = false;
+  let version = 0;
+
+  (async () => {
+    while (!stopped) {
+      try {
+        const response = await fetch(
+          `${API_BASE_URL}/multiplayer/${sessionId}/wait?version=${version}&token=${encodeURIComponent(streamToken)}`
+        );
+        if (response.status === 200) {
+          const sessionData = await response.json();
+          version = sessionData.version;
+          if (!stopped) onUpdate(sessionData);
+          if (isFinalStatus(sessionData.status)) break;
+        } else if (response.status === 304) {
+          // Timed out without a change (or the server is busy and asks us to back off)
+          const retryAfter = Number(response.headers.get('Retry-After'));
+          if (retryAfter) await sleep(retryAfter * 1000);
+        } else {
+          throw new Error(`Waiting for session changes failed (${response.status})`);
+        }
+      } catch (err) {
+        if (onError) onError(err);
+        await sleep(2000);
+      }
+    }
+  })();
+
+  return () => {
+    stopped = true;
+  };
+}
+